@@ -0,0 +1,60 @@
+"""对比 HN 评论清理：BeautifulSoup、逐条正则清理和批量清理的每条耗时。
+
+运行：uv run python -m benchmarks.bench_comment_clean [--repeat 15]
+
+语料为 tests/fixtures/hn_comments.json，重复 repeat 次模拟 30 个故事各 15 条评论。
+"""
+
+import argparse
+import json
+import os
+import time
+
+from scripts.sources.hn import clean_html_text
+from scripts.html_extract import clean_comment_batch, clean_comment_html
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "fixtures", "hn_comments.json"
+)
+
+
+def measure(label, comments, clean, baseline=None):
+    started = time.perf_counter()
+    clean(comments)
+    seconds = time.perf_counter() - started
+    per_comment = seconds / len(comments) * 1e6
+    speedup = f"  {baseline / seconds:5.1f}x" if baseline else ""
+    print(f"{label:<14} {seconds * 1000:8.2f} ms  每条 {per_comment:7.1f} µs{speedup}")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+    with open(FIXTURE, encoding="utf-8") as f:
+        corpus = json.load(f)
+    comments = corpus * args.repeat
+    print(f"{len(comments)} 条评论")
+
+    baseline = measure(
+        "BeautifulSoup", comments, lambda texts: [clean_html_text(t) for t in texts]
+    )
+    measure(
+        "逐条正则", comments, lambda texts: [clean_comment_html(t) for t in texts], baseline
+    )
+    # 与 fetch_top_stories 一致，每个故事的评论作为一批
+    batch_size = 15
+    measure(
+        "按故事批量",
+        comments,
+        lambda texts: [
+            clean_comment_batch(texts[start : start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ],
+        baseline,
+    )
+
+
+if __name__ == "__main__":
+    main()
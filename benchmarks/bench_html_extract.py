@@ -0,0 +1,73 @@
+"""对比 30 篇文章在线程中解析与交给进程池解析的耗时和 CPU 利用率。
+
+运行：uv run python -m benchmarks.bench_html_extract [--stories 30] [--kb 200]
+
+CPU 利用率 = (主进程 + 子进程 CPU 时间) / 墙钟时间，大于 1 说明用上了多个核心。
+"""
+
+import argparse
+import os
+import resource
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts import html_extract
+
+
+def make_page(index, size_kb):
+    paragraph = (
+        f"<p>Story {index}: <a href='/x'>link</a> <em>emphasis</em> "
+        + "lorem ipsum dolor sit amet " * 12
+        + "</p>\n"
+    )
+    boilerplate = "<div class='sidebar'><ul>" + "<li><a href='#'>item</a></li>" * 50 + "</ul></div>"
+    body = paragraph * max(1, size_kb * 1024 // len(paragraph))
+    return (
+        "<html><head><meta charset='utf-8'><script>var tracking = 1;</script></head>"
+        f"<body><nav>menu</nav>{boilerplate}<article>{body}</article><footer>f</footer></body></html>"
+    ).encode()
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def run(label, pages, extract):
+    started_cpu = cpu_seconds()
+    started = time.perf_counter()
+    # 与 fetch_top_stories 一样使用 5 个 I/O 线程
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        texts = list(executor.map(extract, pages))
+    wall = time.perf_counter() - started
+    if label == "进程池":
+        # 子进程退出并被回收后，RUSAGE_CHILDREN 才包含它们的 CPU 时间
+        html_extract.get_pool().shutdown(wait=True)
+        html_extract.shutdown_pool()
+    cpu = cpu_seconds() - started_cpu
+    print(f"{label:<6} 墙钟 {wall:6.2f} s  CPU {cpu:6.2f} s  利用率 {cpu / wall:4.2f}")
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stories", type=int, default=30)
+    parser.add_argument("--kb", type=int, default=200)
+    args = parser.parse_args()
+    pages = [make_page(index, args.kb) for index in range(args.stories)]
+    print(f"{args.stories} 篇页面，每篇约 {args.kb} KB，CPU 核心数 {os.cpu_count()}")
+
+    inline = run("线程内", pages, html_extract.extract_article_text)
+    pool = html_extract.get_pool()
+    if pool is None:
+        print("进程池已关闭（单核机器或 HTML_EXTRACT_WORKERS=0），可设置 HTML_EXTRACT_WORKERS=4 强制开启")
+        return
+    # 预先启动全部子进程，不把 spawn 的启动时间算进解析耗时
+    list(pool.map(int, range(pool._max_workers * 4)))
+    pooled = run("进程池", pages, html_extract.extract_article)
+    assert inline == pooled
+
+
+if __name__ == "__main__":
+    main()
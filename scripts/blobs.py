@@ -0,0 +1,59 @@
+"""按内容寻址的压缩文本存储。
+
+文本以 sha256 作为地址，zlib 压缩后写入 <root>/<前两位>/<完整哈希>；
+相同内容只保存一份，索引文件中只需要记录哈希。
+"""
+
+import hashlib
+import os
+import tempfile
+import zlib
+
+
+class BlobStore:
+    def __init__(self, root="cache/article_blobs"):
+        self.root = root
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, text):
+        """保存文本并返回其哈希；内容已存在时不重复写入。"""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再替换，并发写入同一内容时读者不会看到半截文件
+            with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(path), suffix=".tmp", delete=False
+            ) as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(f.name, path)
+        return digest
+
+    def get(self, digest):
+        """读取文本，不存在或已损坏时返回 None。"""
+        if not digest:
+            return None
+        try:
+            with open(self._path(digest), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            print(f"读取文章内容 {digest[:12]} 失败: {e}")
+            return None
+
+    def prune(self, keep):
+        """删除不在 keep 中的内容，返回删除的数量。"""
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name not in keep:
+                    try:
+                        os.remove(os.path.join(directory, name))
+                        removed += 1
+                    except OSError as e:
+                        print(f"删除文章内容 {name[:12]} 失败: {e}")
+        return removed
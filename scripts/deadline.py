@@ -0,0 +1,54 @@
+"""整次运行的时间预算。
+
+抓取函数和模型调用在发出请求前向这里查询剩余时间：请求超时不会超过剩余预算，
+预算耗尽后新的请求直接放弃，已完成的结果照常渲染。
+"""
+
+import time
+from threading import Lock
+
+
+class DeadlineExceeded(Exception):
+    """运行时间预算已经用完。"""
+
+
+_deadline = None
+_lock = Lock()
+
+
+def start_run_deadline(seconds):
+    """从现在开始计时；seconds 为 None 或 0 时不限时。"""
+    global _deadline
+    with _lock:
+        _deadline = time.monotonic() + seconds if seconds else None
+
+
+def clear_run_deadline():
+    start_run_deadline(None)
+
+
+def remaining():
+    """剩余秒数；未设置时限时返回 None。"""
+    with _lock:
+        deadline = _deadline
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired():
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check_deadline(task=""):
+    """预算耗尽时抛出 DeadlineExceeded，供长流程在步骤之间协作式取消。"""
+    if expired():
+        raise DeadlineExceeded(f"超出运行时限，放弃{task or '剩余任务'}")
+
+
+def request_timeout(default, task=""):
+    """返回不超过剩余预算的请求超时时间，预算耗尽时抛出 DeadlineExceeded。"""
+    check_deadline(task)
+    left = remaining()
+    return default if left is None else max(0.1, min(default, left))
@@ -0,0 +1,153 @@
+"""按域名统计文章抓取结果，决定超时时间和是否跳过。
+
+每个域名保留最近若干次抓取的时间、结果和耗时，保存在 cache/domain_stats.json 中跨运行累积：
+响应稳定的域名使用按 p90 延迟收紧的超时；最近几次都没有取得正文的域名（付费墙、
+反爬、长期超时）直接跳过，每隔一段时间再放行一次探测请求。
+"""
+
+import json
+import os
+import time
+from threading import Lock
+from urllib.parse import urlsplit
+
+# 抓取结果：取得正文、响应正常但没有正文、请求超时、其他错误
+OUTCOMES = ("content", "empty", "timeout", "error")
+
+DEFAULT_TIMEOUT = 10
+MIN_TIMEOUT = 3
+# 超时取 p90 延迟的倍数，留出正常波动的余量
+TIMEOUT_P90_FACTOR = 2
+# 每个域名保留的最近抓取次数，以及用于计算延迟的最少成功样本
+HISTORY_SIZE = 20
+MIN_LATENCY_SAMPLES = 5
+# 最近连续这么多次没有取得正文时跳过该域名
+SKIP_AFTER_FAILURES = 4
+# 被跳过的域名每隔这么久放行一次探测
+PROBE_INTERVAL_HOURS = 72
+MAX_AGE_DAYS = 60
+# 已知的付费墙网站始终跳过，不发请求，也不参与探测
+BLOCKED_DOMAINS = ("nytimes.com", "wsj.com", "bloomberg.com", "ft.com")
+
+
+def domain_of(url):
+    """链接的主机名，去掉 www. 前缀；无法解析时返回空字符串。"""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainPolicy:
+    def __init__(
+        self,
+        stats_file="cache/domain_stats.json",
+        now=time.time,
+        blocked_domains=BLOCKED_DOMAINS,
+    ):
+        self.stats_file = stats_file
+        self.now = now
+        self.blocked_domains = tuple(blocked_domains)
+        self.domains = self._load()
+        self._lock = Lock()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.stats_file):
+                with open(self.stats_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                cutoff = self.now() - MAX_AGE_DAYS * 86400
+                domains = {}
+                for domain, attempts in (data if isinstance(data, dict) else {}).items():
+                    recent = [
+                        (float(at), outcome, seconds)
+                        for at, outcome, seconds in attempts
+                        if at >= cutoff and outcome in OUTCOMES
+                    ]
+                    if recent:
+                        domains[domain] = recent[-HISTORY_SIZE:]
+                return domains
+        except (OSError, json.JSONDecodeError, TypeError, ValueError) as e:
+            print(f"加载域名抓取统计失败: {e}")
+        return {}
+
+    def record(self, url, outcome, seconds=None):
+        """记录一次抓取；seconds 为从发出请求到收到响应的耗时。"""
+        domain = domain_of(url)
+        if not domain:
+            return
+        with self._lock:
+            attempts = self.domains.setdefault(domain, [])
+            attempts.append((self.now(), outcome, seconds))
+            del attempts[:-HISTORY_SIZE]
+
+    def _attempts(self, domain):
+        with self._lock:
+            return list(self.domains.get(domain, ()))
+
+    def stats(self, domain):
+        """域名的尝试次数、正文获取率、成功率和 p50/p90 延迟。"""
+        attempts = self._attempts(domain)
+        latencies = sorted(
+            seconds
+            for _, outcome, seconds in attempts
+            if outcome in ("content", "empty") and seconds is not None
+        )
+        total = len(attempts)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+        return {
+            "attempts": total,
+            "content_rate": (
+                sum(outcome == "content" for _, outcome, _ in attempts) / total if total else None
+            ),
+            "success_rate": (
+                sum(outcome in ("content", "empty") for _, outcome, _ in attempts) / total
+                if total
+                else None
+            ),
+            "latency_samples": len(latencies),
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+        }
+
+    def timeout_for(self, url, default=DEFAULT_TIMEOUT):
+        """样本足够时按 p90 延迟收紧超时，不超过 default。"""
+        stats = self.stats(domain_of(url))
+        if stats["latency_samples"] < MIN_LATENCY_SAMPLES:
+            return default
+        return max(MIN_TIMEOUT, min(default, stats["p90"] * TIMEOUT_P90_FACTOR))
+
+    def is_blocked(self, url):
+        """链接属于 blocked_domains 中的域名或其子域名。"""
+        domain = domain_of(url)
+        return any(
+            domain == blocked or domain.endswith("." + blocked)
+            for blocked in self.blocked_domains
+        )
+
+    def should_skip(self, url):
+        """已知付费墙网站始终跳过；其他网站最近连续多次没有取得正文，
+        且距离上次尝试未满探测间隔时跳过。"""
+        if self.is_blocked(url):
+            return True
+        attempts = self._attempts(domain_of(url))[-SKIP_AFTER_FAILURES:]
+        if len(attempts) < SKIP_AFTER_FAILURES:
+            return False
+        if any(outcome == "content" for _, outcome, _ in attempts):
+            return False
+        return self.now() - attempts[-1][0] < PROBE_INTERVAL_HOURS * 3600
+
+    def save(self):
+        try:
+            stats_directory = os.path.dirname(self.stats_file)
+            if stats_directory:
+                os.makedirs(stats_directory, exist_ok=True)
+            with self._lock:
+                data = {domain: list(attempts) for domain, attempts in self.domains.items()}
+            with open(self.stats_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"保存域名抓取统计失败: {e}")
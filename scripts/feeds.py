@@ -0,0 +1,234 @@
+"""按主题输出 JSON Feed 与 Atom 订阅源。
+
+上一次生成的 JSON Feed 就是订阅源的状态：每次只把 id 未出现过的条目加到最前面，
+已有条目保持不变，超过 FEED_MAX_ITEMS 的旧条目被丢弃。没有新条目时不改写文件，
+静态托管返回的 ETag / Last-Modified 保持不变，阅读器的条件请求会得到 304。
+"""
+
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timezone
+
+from scripts.llm import is_summary_available
+from scripts.publish import write_if_changed
+from scripts.settings import getenv
+
+FEED_DIR = "public/feeds"
+FEED_MAX_ITEMS = 50
+JSON_FEED_VERSION = "https://jsonfeed.org/version/1.1"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+FEED_AUTHOR = "LiveNews"
+
+
+def site_url():
+    """站点的绝对地址：优先使用 SITE_URL，在 GitHub Actions 中按仓库推断 Pages 地址。"""
+    url = getenv("SITE_URL")
+    if not url:
+        repository = getenv("GITHUB_REPOSITORY", "")
+        owner, _, name = repository.partition("/")
+        if not (owner and name):
+            return None
+        url = f"https://{owner.lower()}.github.io/{name}/"
+    return url if url.endswith("/") else url + "/"
+
+
+def _timestamp(value, default):
+    """把 datetime、ISO 日期字符串等转换为带时区的 RFC 3339 时间。"""
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, date):
+        moment = datetime(value.year, value.month, value.day)
+    elif isinstance(value, str) and value:
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return default
+    else:
+        return default
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return moment.isoformat(timespec="seconds")
+
+
+def _hn_items(stories, now):
+    for story in stories or []:
+        if not (
+            is_summary_available(story.get("article_summary"))
+            and is_summary_available(story.get("comments_summary"))
+        ):
+            continue
+        yield {
+            "id": story["comments_url"],
+            "url": story["url"],
+            "external_url": story["comments_url"],
+            "title": story["title"],
+            "content_text": (
+                f"文章摘要：{story['article_summary']}\n\n评论摘要：{story['comments_summary']}"
+            ),
+            "date_published": _timestamp(story.get("time"), now),
+            "authors": [{"name": story.get("author", "匿名")}],
+        }
+
+
+def _arxiv_items(papers, now):
+    for paper in papers or []:
+        if not paper.get("translation_available"):
+            continue
+        # 去掉版本号，论文修订后不会作为新条目重复出现
+        base_id = re.sub(r"v\d+$", "", paper["id"])
+        yield {
+            "id": f"https://arxiv.org/abs/{base_id}",
+            "url": paper["url"],
+            "title": paper["title"],
+            "content_text": paper["summary_zh"],
+            "date_published": _timestamp(paper.get("published"), now),
+            "authors": [{"name": author} for author in paper.get("authors", [])],
+            "tags": paper.get("categories", []),
+        }
+
+
+def _sec_items(filings, now):
+    for filing in filings or []:
+        yield {
+            "id": filing["url"],
+            "url": filing["url"],
+            "title": f"{filing['ticker']} {filing['form']}：{filing.get('description') or filing['company']}",
+            "content_text": f"{filing['company']} 于 {filing['date']} 提交 {filing['form']}",
+            "date_published": _timestamp(filing.get("date"), now),
+            "tags": [filing["ticker"], filing["form"]],
+        }
+
+
+def _polymarket_items(markets, now):
+    for market in markets or []:
+        probabilities = "；".join(
+            f"{outcome['label']} {outcome['probability']:.0f}%"
+            for outcome in market.get("outcomes", [])
+        )
+        yield {
+            "id": market["url"],
+            "url": market["url"],
+            "title": market["question"],
+            "content_text": "\n\n".join(
+                text for text in (market.get("summary_zh"), f"首次收录时概率：{probabilities}") if text
+            ),
+            "date_published": now,
+            "tags": market.get("topics", []),
+        }
+
+
+# 订阅源名称 -> (标题, 生成条目的函数, generate_html 中对应的参数)
+FEEDS = {
+    "hn": ("Hacker News 热门摘要", _hn_items, ("stories",)),
+    "arxiv": ("arXiv 论文中文摘要", _arxiv_items, ("arxiv_papers", "arxiv_ai_papers")),
+    "sec": ("SEC EDGAR 自选股公告", _sec_items, ("sec_filings",)),
+    "polymarket": ("Polymarket 金融与 AI 预测市场", _polymarket_items, ("polymarket_markets",)),
+}
+
+
+def _load_feed(path):
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                feed = json.load(f)
+            if isinstance(feed.get("items"), list):
+                return feed
+    except (OSError, json.JSONDecodeError, AttributeError) as e:
+        print(f"加载订阅源 {path} 失败: {e}")
+    return {"items": []}
+
+
+def merge_items(existing, candidates, limit=FEED_MAX_ITEMS):
+    """把 id 未出现过的候选条目加到最前面，返回 (合并后的条目, 新条目数)。"""
+    seen = {item["id"] for item in existing}
+    new_items = []
+    for item in candidates:
+        if item["id"] not in seen:
+            seen.add(item["id"])
+            new_items.append(item)
+    return (new_items + existing)[:limit], len(new_items)
+
+
+def _atom_document(name, title, items, updated, base_url=None):
+    ET.register_namespace("", ATOM_NAMESPACE)
+
+    def child(parent, tag, text=None, **attributes):
+        element = ET.SubElement(parent, f"{{{ATOM_NAMESPACE}}}{tag}", attributes)
+        element.text = text
+        return element
+
+    feed = ET.Element(f"{{{ATOM_NAMESPACE}}}feed")
+    child(feed, "id", f"tag:livenews,2026:feeds/{name}")
+    child(feed, "title", title)
+    child(feed, "updated", updated)
+    # 条目可能没有作者（SEC、Polymarket），RFC 4287 要求 feed 级别的 author
+    child(child(feed, "author"), "name", FEED_AUTHOR)
+    if base_url:
+        child(feed, "link", rel="alternate", href=base_url)
+        child(feed, "link", rel="self", href=f"{base_url}feeds/{name}.xml")
+    for item in items:
+        entry = child(feed, "entry")
+        child(entry, "id", item["id"])
+        child(entry, "title", item["title"])
+        child(entry, "updated", item["date_published"])
+        child(entry, "published", item["date_published"])
+        child(entry, "link", rel="alternate", href=item["url"])
+        for author in item.get("authors", []):
+            child(child(entry, "author"), "name", author["name"])
+        for tag in item.get("tags", []):
+            child(entry, "category", term=tag)
+        child(entry, "content", item["content_text"], type="text")
+    return ET.tostring(feed, encoding="unicode", xml_declaration=True)
+
+
+def write_feed(name, title, candidates, feed_dir=FEED_DIR, now=None, base_url=None):
+    """增量更新一个订阅源，返回新增条目数；没有新条目时不写文件。
+
+    base_url 为站点绝对地址，未知时省略 home_page_url、feed_url 和 Atom 链接。
+    """
+    now = now or datetime.now(timezone.utc).isoformat(timespec="seconds")
+    json_path = os.path.join(feed_dir, f"{name}.json")
+    atom_path = os.path.join(feed_dir, f"{name}.xml")
+    previous = _load_feed(json_path)
+    items, added = merge_items(previous["items"], candidates)
+    feed = {"version": JSON_FEED_VERSION, "title": title}
+    if base_url:
+        feed["home_page_url"] = base_url
+        feed["feed_url"] = f"{base_url}feeds/{name}.json"
+    feed["authors"] = [{"name": FEED_AUTHOR}]
+    # 没有新条目且订阅源信息未变时不改写文件
+    unchanged = {**previous, "items": []} == {**feed, "items": []}
+    if not added and unchanged and os.path.exists(atom_path):
+        return 0
+
+    feed["items"] = items
+    write_if_changed(
+        json_path,
+        json.dumps(
+            feed,
+            ensure_ascii=False,
+            indent=1,
+        ),
+    )
+    write_if_changed(atom_path, _atom_document(name, title, items, now, base_url))
+    return added
+
+
+def write_feeds(sources, feed_dir=FEED_DIR):
+    """按 FEEDS 生成全部订阅源，sources 为 generate_html 收到的各来源数据。"""
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    base_url = site_url()
+    for name, (title, build_items, fields) in FEEDS.items():
+        try:
+            candidates = [
+                item
+                for field in fields
+                for item in build_items(sources.get(field), now)
+            ]
+            added = write_feed(name, title, candidates, feed_dir, now, base_url)
+            if added:
+                print(f"订阅源 {name} 新增 {added} 条")
+        except Exception as e:
+            print(f"生成订阅源 {name} 时出错: {e}")
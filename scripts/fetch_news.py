@@ -1,443 +1,64 @@
+import argparse
 import concurrent.futures
+import contextlib
 import json
 import os
-import re
 import shutil
+import sys
 import time
-import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
-from threading import Lock
-
-import pytz
-import requests
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
-from jinja2 import Template
-from openai import OpenAI
-
-# 加载环境变量
-load_dotenv(override=True)
-
-# OpenAI 配置
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-
-HN_STORY_LIMIT = 30
-GITHUB_TRENDING_LIMIT = 20
-PRODUCT_HUNT_LIMIT = 20
-ARXIV_PAPER_LIMIT = 15
-ARXIV_AI_PAPER_LIMIT = 10
-LOBSTERS_STORY_LIMIT = 15
-GITHUB_RELEASE_LIMIT = 10
-SEC_FILING_LIMIT = 10
-POLYMARKET_LIMIT = 10
-POLYMARKET_CONTRACT_LIMIT = 3
-POLYMARKET_CRYPTO_MAX_SHARE = 0.2
-POLYMARKET_TAGS = {
-    "120": "金融",
-    "225": "宏观经济",
-    "21": "加密市场",
-    "439": "AI",
-}
-ARXIV_SEARCH_QUERY = " OR ".join(
-    f"cat:{category}"
-    for category in (
-        "q-fin.CP",
-        "q-fin.GN",
-        "q-fin.MF",
-        "q-fin.PM",
-        "q-fin.PR",
-        "q-fin.RM",
-        "q-fin.ST",
-        "q-fin.TR",
-    )
+
+from scripts.deadline import (
+    clear_run_deadline,
+    expired as deadline_expired,
+    start_run_deadline,
 )
-ARXIV_AI_SEARCH_QUERY = "cat:cs.AI OR cat:cs.LG OR cat:cs.CL"
-BLS_SERIES = {
-    "CUSR0000SA0": "美国 CPI 同比",
-    "LNS14000000": "美国失业率",
-    "CES0000000001": "美国非农就业月增量",
-}
-SEC_WATCHLIST = {
-    "AAPL": "0000320193",
-    "MSFT": "0000789019",
-    "NVDA": "0001045810",
-}
-REQUEST_HEADERS = {
-    "User-Agent": "Mozilla/5.0 (compatible; LiveNews/1.0; +https://github.com/wayhome/livenews)"
-}
-GITHUB_API_HEADERS = {
-    **REQUEST_HEADERS,
-    "Accept": "application/vnd.github+json",
-    "X-GitHub-Api-Version": "2022-11-28",
-}
-if os.getenv("GITHUB_TOKEN"):
-    GITHUB_API_HEADERS["Authorization"] = f"Bearer {os.environ['GITHUB_TOKEN']}"
-SEC_REQUEST_HEADERS = {
-    "User-Agent": os.getenv("SEC_USER_AGENT")
-    or "livenews/1.0 wayhome@users.noreply.github.com",
-    "Accept-Encoding": "gzip, deflate",
+from scripts.feeds import write_feeds
+from scripts.llm import set_llm_enabled
+from scripts.publish import hashed_asset, write_if_changed, write_manifest
+from scripts.settings import getenv
+from scripts.sources.arxiv import (
+    ARXIV_AI_PAPER_LIMIT,
+    ARXIV_AI_SEARCH_QUERY,
+    ARXIV_SEARCH_QUERY,
+    ArxivPaperIndex,
+    ArxivTranslationCache,
+    harvest_arxiv_papers,
+    translate_arxiv_papers,
+)
+from scripts.sources.bls import fetch_bls_market_indicators
+from scripts.sources.common import DateTimeEncoder
+from scripts.sources.github import fetch_github_releases, fetch_github_trending
+from scripts.sources.hn import cross_link_stories, fetch_top_stories
+from scripts.sources.lobsters import fetch_lobsters
+from scripts.sources.polymarket import fetch_polymarket_markets
+from scripts.sources.product_hunt import fetch_product_hunt
+from scripts.sources.sec import fetch_sec_filings
+from scripts.sources.treasury import fetch_treasury_yields
+
+# 来源结果缓存有效期（小时）；未列出的来源每次运行都重新抓取
+SOURCE_CACHE_TTL_HOURS = {
+    "bls": 12,  # 月度数据
+    "treasury": 4,  # 工作日日终数据
+    "arxiv": 6,  # 列表每天更新一次
+    "sec": 4,  # 公告每季度只有几次
 }
+# 不保存最后可用结果的来源：HN 有独立的故事缓存，且抓取失败时整次运行终止
+SOURCE_FALLBACK_EXCLUDED = {"hn"}
 
-# 确保 API 基础 URL 格式正确
-if OPENAI_API_BASE and not (
-    OPENAI_API_BASE.startswith("http://") or OPENAI_API_BASE.startswith("https://")
-):
-    OPENAI_API_BASE = "https://" + OPENAI_API_BASE
-
-# 初始化 OpenAI 客户端
-try:
-    client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_API_BASE)
-except Exception as e:
-    print(f"初始化 OpenAI 客户端时出错: {e}")
-    raise
-
-
-# 创建一个自定义的JSON编码器来处理datetime对象
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
 
+class SourceCache:
+    """按来源保存最近一次成功的解析结果。
 
-def _process_html_content(response):
-    """处理 HTML 响应内容"""
-    content_type = response.headers.get("content-type", "").lower()
-    if "text/html" not in content_type:
-        print(f"跳过非HTML内容: (Content-Type: {content_type})")
-        return None
-
-    soup = BeautifulSoup(response.text, "html.parser")
+    结果在有效期内时跳过网络请求；抓取失败时作为“最后可用数据”兜底展示。
+    """
 
-    # 移除不需要的元素
-    for element in soup(
-        ["script", "style", "nav", "header", "footer", "iframe", "noscript"]
+    def __init__(
+        self, cache_file="cache/source_cache.json", ttl_hours=None, read_only=False
     ):
-        element.decompose()
-
-    # 尝试找到主要内容
-    main_content = None
-    content_candidates = soup.select(
-        "article, main, .article-content, .post-content, .entry-content"
-    )
-    if content_candidates:
-        main_content = content_candidates[0]
-
-    if not main_content:
-        main_content = soup.find("body")
-
-    if not main_content:
-        main_content = soup
-
-    # 获取文本
-    text = main_content.get_text(separator="\n", strip=True)
-
-    # 清理文本
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    text = "\n".join(lines)
-
-    if len(text) < 50:
-        print("跳过内容过短的文章")
-        return None
-
-    return text[:5000]
-
-
-def get_article_content(url):
-    """获取文章内容"""
-    try:
-        # 跳过已知的无法访问的网站
-        blocked_domains = ["nytimes.com", "wsj.com", "bloomberg.com", "ft.com"]
-        if any(domain in url.lower() for domain in blocked_domains):
-            print(f"跳过付费墙网站: {url}")
-            return None
-
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-        }
-
-        response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
-        response.raise_for_status()
-        return _process_html_content(response)
-
-    except requests.exceptions.SSLError:
-        print(f"SSL错误，尝试不验证证书: {url}")
-        try:
-            response = requests.get(url, headers=headers, timeout=10, verify=False)
-            response.raise_for_status()
-            return _process_html_content(response)
-        except Exception as e:
-            print(f"二次尝试仍然失败: {e}")
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"获取文章内容失败: {e}")
-        return None
-    except Exception as e:
-        print(f"处理文章内容时出错: {e}")
-        return None
-
-
-def get_summary(
-    text,
-    prompt="请用中文简明扼要地总结以下内容，限制在100字以内。",
-    max_retries=3,
-    story_id=None,
-    index=None,
-):
-    """使用 OpenAI 生成摘要"""
-    if not text or not text.strip():
-        return "暂无内容"
-
-    story_info = f"[故事 {index}/{story_id}] " if story_id and index else ""
-
-    for attempt in range(max_retries):
-        try:
-            print(f"{story_info}正在生成摘要，第 {attempt + 1} 次尝试...")
-
-            response = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": text},
-                ],
-                temperature=0.7,
-                max_tokens=3000,
-                timeout=30,  # 设置超时时间
-            )
-            return response.choices[0].message.content
-
-        except ValueError as e:
-            print(f"{story_info}配置错误: {e}")
-            return "摘要生成失败（配置错误）"
-
-        except requests.exceptions.ConnectionError as e:
-            print(f"{story_info}连接错误 (尝试 {attempt + 1}/{max_retries}):")
-            print(f"  - 错误详情: {str(e)}")
-
-        except requests.exceptions.Timeout as e:
-            print(f"{story_info}请求超时 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
-
-        except requests.exceptions.RequestException as e:
-            print(f"{story_info}请求错误 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
-
-        except Exception as e:
-            print(f"{story_info}未预期的错误 (尝试 {attempt + 1}/{max_retries}):")
-            print(f"  - 错误类型: {type(e).__name__}")
-            print(f"  - 错误详情: {str(e)}")
-            import traceback
-
-            traceback.print_exc()
-
-        if attempt < max_retries - 1:
-            sleep_time = (attempt + 1) * 5  # 递增等待时间
-            print(f"{story_info}等待 {sleep_time} 秒后重试...")
-            time.sleep(sleep_time)
-        else:
-            print(f"{story_info}已达到最大重试次数")
-            return "摘要生成失败（网络错误）"
-
-
-def fetch_hn_item(item_id):
-    """获取 HN 单个项目的详细信息"""
-    try:
-        response = requests.get(
-            f"https://hacker-news.firebaseio.com/v0/item/{item_id}.json"
-        )
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"获取项目 {item_id} 时出错: {e}")
-        return None
-
-
-def clean_html_text(html_text):
-    """清理HTML文本，返回纯文本"""
-    if not html_text:
-        return ""
-    try:
-        # 使用BeautifulSoup清理HTML
-        soup = BeautifulSoup(html_text, "html.parser")
-        # 获取纯文本
-        text = soup.get_text()
-        # 清理空白字符
-        text = " ".join(text.split())
-        return text
-    except Exception as e:
-        print(f"清理HTML文本时出错: {e}")
-        return html_text
-
-
-def fetch_github_trending(limit=GITHUB_TRENDING_LIMIT):
-    """获取 GitHub 每日 Trending 仓库。"""
-    try:
-        response = requests.get(
-            "https://github.com/trending?since=daily",
-            headers=REQUEST_HEADERS,
-            timeout=20,
-        )
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        repositories = []
-
-        for article in soup.select("article.Box-row")[:limit]:
-            link = article.select_one("h2 a[href]")
-            if not link:
-                continue
-
-            path = link.get("href", "").strip()
-            name = re.sub(r"\s*/\s*", "/", " ".join(link.stripped_strings))
-            description = article.select_one("p")
-            language = article.select_one('[itemprop="programmingLanguage"]')
-            stars = article.select_one('a[href$="/stargazers"]')
-            forks = article.select_one('a[href$="/forks"]')
-            stars_today = article.find(string=re.compile(r"stars? today"))
-
-            repositories.append(
-                {
-                    "name": name,
-                    "url": f"https://github.com{path}",
-                    "description": (
-                        description.get_text(" ", strip=True)
-                        if description
-                        else "暂无描述"
-                    ),
-                    "language": (
-                        language.get_text(" ", strip=True) if language else "未标注"
-                    ),
-                    "stars": stars.get_text(" ", strip=True) if stars else "0",
-                    "forks": forks.get_text(" ", strip=True) if forks else "0",
-                    "stars_today": (
-                        stars_today.strip() if stars_today else "暂无今日增长数据"
-                    ),
-                }
-            )
-
-        return repositories
-    except Exception as e:
-        print(f"获取 GitHub Trending 时出错: {e}")
-        return []
-
-
-def fetch_lobsters(limit=LOBSTERS_STORY_LIMIT):
-    """获取 Lobsters 热门技术讨论。"""
-    try:
-        response = requests.get(
-            "https://lobste.rs/hottest.json",
-            headers=REQUEST_HEADERS,
-            timeout=20,
-        )
-        response.raise_for_status()
-        stories = []
-        for story in response.json()[:limit]:
-            submitter = story.get("submitter_user") or story.get("submitter") or "匿名"
-            if isinstance(submitter, dict):
-                submitter = submitter.get("username", "匿名")
-            stories.append({
-                "title": story.get("title", "无标题"),
-                "url": story.get("url") or story.get("comments_url", "https://lobste.rs"),
-                "comments_url": story.get("comments_url", "https://lobste.rs"),
-                "score": story.get("score", 0),
-                "comment_count": story.get("comment_count", 0),
-                "submitter": submitter,
-                "tags": story.get("tags", []),
-                "created_at": story.get("created_at", "")[:10],
-            })
-        return stories
-    except Exception as e:
-        print(f"获取 Lobsters 时出错: {e}")
-        return []
-
-
-def fetch_github_releases(repositories, limit=GITHUB_RELEASE_LIMIT):
-    """获取 Trending 仓库的最新正式版本。"""
-    releases = []
-    for repository in repositories[:limit]:
-        try:
-            response = requests.get(
-                f"https://api.github.com/repos/{repository['name']}/releases/latest",
-                headers=GITHUB_API_HEADERS,
-                timeout=20,
-            )
-            if response.status_code == 404:
-                continue
-            response.raise_for_status()
-            release = response.json()
-            releases.append(
-                {
-                    "repository": repository["name"],
-                    "name": release.get("name") or release.get("tag_name", "未命名版本"),
-                    "tag": release.get("tag_name", ""),
-                    "url": release.get("html_url", repository["url"]),
-                    "published": release.get("published_at", "")[:10],
-                    "prerelease": release.get("prerelease", False),
-                }
-            )
-        except Exception as e:
-            print(f"获取 {repository['name']} 最新版本时出错: {e}")
-    return releases
-
-
-def fetch_product_hunt(limit=PRODUCT_HUNT_LIMIT):
-    """从 Product Hunt 官方 Atom feed 获取热门产品。"""
-    try:
-        response = requests.get(
-            "https://www.producthunt.com/feed",
-            headers=REQUEST_HEADERS,
-            timeout=20,
-        )
-        response.raise_for_status()
-        root = ET.fromstring(response.content)
-        namespace = {"atom": "http://www.w3.org/2005/Atom"}
-        products = []
-
-        for entry in root.findall("atom:entry", namespace)[:limit]:
-            title = entry.findtext("atom:title", default="无标题", namespaces=namespace)
-            author = entry.findtext(
-                "atom:author/atom:name", default="匿名", namespaces=namespace
-            )
-            published = entry.findtext(
-                "atom:published", default="", namespaces=namespace
-            )
-            content = entry.findtext("atom:content", default="", namespaces=namespace)
-            content_soup = BeautifulSoup(content, "html.parser")
-            description = content_soup.find("p")
-            alternate_link = entry.find("atom:link[@rel='alternate']", namespace)
-
-            products.append(
-                {
-                    "name": title.strip(),
-                    "url": (
-                        alternate_link.get("href", "https://www.producthunt.com")
-                        if alternate_link is not None
-                        else "https://www.producthunt.com"
-                    ),
-                    "description": (
-                        description.get_text(" ", strip=True)
-                        if description
-                        else "暂无描述"
-                    ),
-                    "maker": author.strip(),
-                    "published": published[:10],
-                }
-            )
-
-        return products
-    except Exception as e:
-        print(f"获取 Product Hunt 时出错: {e}")
-        return []
-
-
-class ArxivTranslationCache:
-    """持久化 arXiv 中文摘要，避免重复调用翻译模型。"""
-
-    def __init__(self, cache_file="public/arxiv_translation_cache.json"):
         self.cache_file = cache_file
+        self.ttl_hours = ttl_hours if ttl_hours is not None else _source_cache_ttls()
+        self.read_only = read_only
         self.cache = self._load()
 
     def _load(self):
@@ -447,830 +68,74 @@ class ArxivTranslationCache:
                     data = json.load(f)
                     return data if isinstance(data, dict) else {}
         except (OSError, json.JSONDecodeError) as e:
-            print(f"加载 arXiv 翻译缓存失败: {e}")
+            print(f"加载来源结果缓存失败: {e}")
         return {}
 
-    def get(self, paper_id, updated):
-        cached = self.cache.get(paper_id)
-        if cached and cached.get("updated") == updated:
-            return cached.get("summary_zh")
-        return None
-
-    def set(self, paper_id, updated, summary_zh):
-        self.cache[paper_id] = {
-            "updated": updated,
-            "summary_zh": summary_zh,
+    def get(self, name):
+        """返回仍在有效期内的来源结果，没有或已过期时返回 None。"""
+        ttl = self.ttl_hours.get(name)
+        cached = self.cache.get(name)
+        if not ttl or not cached:
+            return None
+        try:
+            cache_time = datetime.fromisoformat(cached["cache_time"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if datetime.now() - cache_time > timedelta(hours=ttl):
+            return None
+        return cached.get("fields")
+
+    def get_last_good(self, name):
+        """返回最近一次成功的结果及其时间，不考虑有效期。"""
+        cached = self.cache.get(name)
+        if not cached or not cached.get("fields"):
+            return None, None
+        return cached["fields"], cached.get("cache_time")
+
+    def set(self, name, fields):
+        if self.read_only or name in SOURCE_FALLBACK_EXCLUDED:
+            return
+        self.cache[name] = {
+            "cache_time": datetime.now().isoformat(),
+            "fields": fields,
         }
         try:
             cache_directory = os.path.dirname(self.cache_file)
             if cache_directory:
                 os.makedirs(cache_directory, exist_ok=True)
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except OSError as e:
-            print(f"保存 arXiv 翻译缓存失败: {e}")
-
-
-def fetch_arxiv_papers(
-    limit=ARXIV_PAPER_LIMIT,
-    cache=None,
-    search_query=ARXIV_SEARCH_QUERY,
-):
-    """获取最新 arXiv 论文并将摘要翻译为中文。"""
-    cache = cache or ArxivTranslationCache()
-    try:
-        response = requests.get(
-            "https://export.arxiv.org/api/query",
-            params={
-                "search_query": search_query,
-                "start": 0,
-                "max_results": limit,
-                "sortBy": "submittedDate",
-                "sortOrder": "descending",
-            },
-            headers=REQUEST_HEADERS,
-            timeout=30,
-        )
-        response.raise_for_status()
-        root = ET.fromstring(response.content)
-        namespace = {
-            "atom": "http://www.w3.org/2005/Atom",
-            "arxiv": "http://arxiv.org/schemas/atom",
-        }
-        papers = []
-
-        for entry in root.findall("atom:entry", namespace):
-            entry_id = entry.findtext("atom:id", default="", namespaces=namespace)
-            paper_id = entry_id.rstrip("/").split("/")[-1]
-            updated = entry.findtext("atom:updated", default="", namespaces=namespace)
-            abstract = " ".join(
-                entry.findtext("atom:summary", default="", namespaces=namespace).split()
-            )
-            summary_zh = cache.get(paper_id, updated)
-            translation_available = bool(summary_zh)
-            if not summary_zh:
-                translated_summary = get_summary(
-                    abstract,
-                    prompt=(
-                        "请将以下 arXiv 论文摘要准确、完整地翻译成简体中文。"
-                        "保留金融、数学和机器学习术语的含义，不要添加评论或改写成提纲。"
-                    ),
-                    story_id=paper_id,
-                )
-                translation_available = bool(
-                    translated_summary
-                    and not translated_summary.startswith("摘要生成失败")
-                )
-                summary_zh = translated_summary if translation_available else abstract
-                if translation_available:
-                    cache.set(paper_id, updated, summary_zh)
-
-            alternate_url = entry_id
-            pdf_url = ""
-            for link in entry.findall("atom:link", namespace):
-                if link.get("rel") == "alternate":
-                    alternate_url = link.get("href", alternate_url)
-                elif link.get("title") == "pdf":
-                    pdf_url = link.get("href", "")
-
-            primary = entry.find("arxiv:primary_category", namespace)
-            papers.append(
-                {
-                    "id": paper_id,
-                    "title": " ".join(
-                        entry.findtext(
-                            "atom:title", default="无标题", namespaces=namespace
-                        ).split()
-                    ),
-                    "url": alternate_url,
-                    "html_url": f"https://arxiv.org/html/{paper_id}",
-                    "pdf_url": pdf_url,
-                    "authors": [
-                        author.findtext(
-                            "atom:name", default="匿名", namespaces=namespace
-                        ).strip()
-                        for author in entry.findall("atom:author", namespace)
-                    ],
-                    "categories": [
-                        category.get("term", "")
-                        for category in entry.findall("atom:category", namespace)
-                    ],
-                    "primary_category": (
-                        primary.get("term", "") if primary is not None else ""
-                    ),
-                    "published": entry.findtext(
-                        "atom:published", default="", namespaces=namespace
-                    )[:10],
-                    "updated": updated,
-                    "summary_zh": summary_zh,
-                    "translation_available": translation_available,
-                }
-            )
-
-        return papers
-    except Exception as e:
-        print(f"获取 arXiv 论文时出错: {e}")
-        return []
-
-
-def fetch_arxiv_ai_papers(limit=ARXIV_AI_PAPER_LIMIT, cache=None):
-    """获取 AI、机器学习和自然语言处理的最新论文。"""
-    return fetch_arxiv_papers(
-        limit=limit,
-        cache=cache,
-        search_query=ARXIV_AI_SEARCH_QUERY,
-    )
-
-
-def _bls_period_key(observation):
-    return int(observation.get("year", 0)), int(observation.get("period", "M00")[1:])
-
-
-def fetch_bls_market_indicators():
-    """从 BLS Public Data API 获取月度 CPI、失业率和非农就业。"""
-    try:
-        current_year = datetime.now().year
-        response = requests.post(
-            "https://api.bls.gov/publicAPI/v2/timeseries/data/",
-            json={
-                "seriesid": list(BLS_SERIES),
-                "startyear": str(current_year - 1),
-                "endyear": str(current_year),
-            },
-            headers={**REQUEST_HEADERS, "Content-Type": "application/json"},
-            timeout=30,
-        )
-        response.raise_for_status()
-        payload = response.json()
-        if payload.get("status") != "REQUEST_SUCCEEDED":
-            raise ValueError("; ".join(payload.get("message", [])) or "BLS 请求失败")
-
-        indicators = []
-        for series in payload.get("Results", {}).get("series", []):
-            series_id = series.get("seriesID")
-            observations = sorted(
-                (
-                    item
-                    for item in series.get("data", [])
-                    if item.get("period", "").startswith("M")
-                    and item.get("period") != "M13"
-                ),
-                key=_bls_period_key,
-                reverse=True,
-            )
-            if not observations:
-                continue
-            latest = observations[0]
-            value = float(latest["value"])
-            display_value = f"{value:.1f}"
-            unit = "%"
-            detail = "最新公布值"
-
-            if series_id == "CUSR0000SA0":
-                previous_year = next(
-                    (
-                        item
-                        for item in observations[1:]
-                        if int(item["year"]) == int(latest["year"]) - 1
-                        and item["period"] == latest["period"]
-                    ),
-                    None,
-                )
-                if not previous_year:
-                    continue
-                value = (value / float(previous_year["value"]) - 1) * 100
-                display_value = f"{value:.1f}"
-                detail = "同比涨幅"
-            elif series_id == "CES0000000001":
-                if len(observations) < 2:
-                    continue
-                value -= float(observations[1]["value"])
-                display_value = f"{value:+.0f}"
-                unit = "千人"
-                detail = "较上月变化"
-
-            indicators.append(
-                {
-                    "id": series_id,
-                    "name": BLS_SERIES.get(series_id, series_id),
-                    "value": display_value,
-                    "unit": unit,
-                    "date": f"{latest['year']}-{latest['period'][1:]}",
-                    "detail": detail,
-                    "url": f"https://data.bls.gov/timeseries/{series_id}",
-                }
-            )
-        return indicators
-    except Exception as e:
-        print(f"获取 BLS 市场敏感指标时出错: {e}")
-        return []
-
-
-def fetch_treasury_yields():
-    """从美国财政部获取最新 2 年、10 年期收益率和期限利差。"""
-    try:
-        response = requests.get(
-            "https://home.treasury.gov/resource-center/data-chart-center/interest-rates/pages/xml",
-            params={
-                "data": "daily_treasury_yield_curve",
-                "field_tdr_date_value": datetime.now().year,
-            },
-            headers=REQUEST_HEADERS,
-            timeout=30,
-        )
-        response.raise_for_status()
-        root = ET.fromstring(response.content)
-        namespace = {
-            "atom": "http://www.w3.org/2005/Atom",
-            "d": "http://schemas.microsoft.com/ado/2007/08/dataservices",
-            "m": "http://schemas.microsoft.com/ado/2007/08/dataservices/metadata",
-        }
-        rows = []
-        for entry in root.findall("atom:entry", namespace):
-            properties = entry.find("atom:content/m:properties", namespace)
-            if properties is None:
-                continue
-            date = properties.findtext("d:NEW_DATE", default="", namespaces=namespace)[:10]
-            two_year = properties.findtext("d:BC_2YEAR", default="", namespaces=namespace)
-            ten_year = properties.findtext("d:BC_10YEAR", default="", namespaces=namespace)
-            if date and two_year and ten_year:
-                rows.append((date, float(two_year), float(ten_year)))
-        if not rows:
-            return []
-        date, two_year, ten_year = max(rows, key=lambda row: row[0])
-        source_url = "https://home.treasury.gov/resource-center/data-chart-center/interest-rates/TextView"
-        return [
-            {"name": "2 年期美债收益率", "value": f"{two_year:.2f}", "unit": "%", "date": date, "detail": "政策利率预期", "url": source_url},
-            {"name": "10 年期美债收益率", "value": f"{ten_year:.2f}", "unit": "%", "date": date, "detail": "长期折现率", "url": source_url},
-            {"name": "10Y−2Y 期限利差", "value": f"{ten_year - two_year:+.2f}", "unit": "百分点", "date": date, "detail": "收益率曲线斜率", "url": source_url},
-        ]
-    except Exception as e:
-        print(f"获取美国国债收益率时出错: {e}")
-        return []
-
-
-def fetch_sec_filings(limit=SEC_FILING_LIMIT):
-    """获取自选美股公司的最新 10-K、10-Q 和 8-K 公告。"""
-    filings = []
-    for index, (ticker, cik) in enumerate(SEC_WATCHLIST.items()):
-        try:
-            if index:
-                time.sleep(0.11)
-            response = requests.get(
-                f"https://data.sec.gov/submissions/CIK{cik}.json",
-                headers=SEC_REQUEST_HEADERS,
-                timeout=20,
-            )
-            response.raise_for_status()
-            recent = response.json().get("filings", {}).get("recent", {})
-            for index, form in enumerate(recent.get("form", [])):
-                if form not in {"8-K", "10-K", "10-Q"}:
-                    continue
-                accession = recent["accessionNumber"][index]
-                document = recent["primaryDocument"][index]
-                accession_path = accession.replace("-", "")
-                filings.append(
-                    {
-                        "ticker": ticker,
-                        "company": response.json().get("name", ticker),
-                        "form": form,
-                        "date": recent["filingDate"][index],
-                        "description": recent.get("primaryDocDescription", [""] * len(recent["form"]))[index],
-                        "url": (
-                            "https://www.sec.gov/Archives/edgar/data/"
-                            f"{int(cik)}/{accession_path}/{document}"
-                        ),
-                    }
-                )
-        except Exception as e:
-            print(f"获取 SEC 公告 {ticker} 时出错: {e}")
-    return sorted(filings, key=lambda filing: filing["date"], reverse=True)[:limit]
-
-
-def _json_list(value):
-    if isinstance(value, list):
-        return value
-    try:
-        return json.loads(value or "[]")
-    except (TypeError, json.JSONDecodeError):
-        return []
-
-
-def _safe_float(value):
-    try:
-        return float(value or 0)
-    except (TypeError, ValueError):
-        return 0.0
-
-
-def _polymarket_outcomes(market):
-    names = _json_list(market.get("outcomes"))
-    prices = _json_list(market.get("outcomePrices"))
-    labels = {"yes": "会", "no": "不会"}
-    return [
-        {
-            "name": str(name),
-            "label": labels.get(str(name).lower(), str(name)),
-            "probability": round(_safe_float(price) * 100, 1),
-        }
-        for name, price in zip(names, prices)
-    ]
-
-
-def _select_polymarket_contracts(event):
-    """选择最有信息量的具体合约，避免只展示事件标题中的填空。"""
-    contracts = []
-    seen_questions = set()
-    for market in event.get("markets", []):
-        if not market.get("active", True) or market.get("closed", False):
-            continue
-        question = " ".join(str(market.get("question") or "").split())
-        outcomes = _polymarket_outcomes(market)
-        if not question or not outcomes or question in seen_questions:
-            continue
-        seen_questions.add(question)
-        yes_probability = next(
-            (
-                outcome["probability"]
-                for outcome in outcomes
-                if outcome["name"].lower() == "yes"
-            ),
-            None,
-        )
-        contracts.append(
-            {
-                "question": question,
-                "outcomes": outcomes,
-                "volume_24h": round(_safe_float(market.get("volume24hr"))),
-                "distance_from_even": (
-                    abs(yes_probability - 50) if yes_probability is not None else 50
-                ),
-            }
-        )
-
-    contracts.sort(
-        key=lambda contract: (
-            contract["distance_from_even"],
-            -contract["volume_24h"],
-        )
-    )
-    for contract in contracts:
-        contract.pop("distance_from_even", None)
-    return contracts[:POLYMARKET_CONTRACT_LIMIT]
-
-
-def _select_polymarket_events(markets, limit):
-    """优先覆盖金融、宏观和 AI，并限制加密事件占比。"""
-    ranked = sorted(markets, key=lambda market: market["volume_24h"], reverse=True)
-    crypto_limit = max(1, int(limit * POLYMARKET_CRYPTO_MAX_SHARE))
-    selected = []
-    selected_ids = set()
-    crypto_count = 0
-
-    def add(market):
-        nonlocal crypto_count
-        market_id = market["id"]
-        is_crypto = "加密市场" in market["topics"]
-        if market_id in selected_ids or (is_crypto and crypto_count >= crypto_limit):
-            return False
-        selected.append(market)
-        selected_ids.add(market_id)
-        crypto_count += int(is_crypto)
-        return True
-
-    for topic in ("金融", "宏观经济", "AI"):
-        for market in ranked:
-            if topic in market["topics"] and add(market):
-                break
-
-    for market in ranked:
-        if len(selected) >= limit:
-            break
-        add(market)
-    return selected[:limit]
-
-
-def _summarize_polymarket_events(markets):
-    """一次模型调用批量生成事件说明，失败时保留确定性说明。"""
-    source = json.dumps(
-        [
-            {
-                "index": index,
-                "event": market["question"],
-                "contracts": [
-                    contract["question"] for contract in market["contracts"]
-                ],
-                "end_date": market["end_date"],
-            }
-            for index, market in enumerate(markets)
-        ],
-        ensure_ascii=False,
-    )
-    raw_summaries = get_summary(
-        source,
-        prompt=(
-            "请逐项把以下 Polymarket 事件改写成一句不超过60字的简体中文说明。"
-            "必须明确标的、判断条件和日期；只根据输入翻译和概括，不补充事实、"
-            "不预测结果、不复述概率。严格返回 JSON 数组，格式为"
-            '[{"index":0,"summary":"中文说明"}]，不要输出代码块或其他文字。'
-        ),
-        max_retries=1,
-    )
-    summaries = {}
-    try:
-        for item in json.loads(raw_summaries):
-            index = int(item.get("index", -1))
-            summary = " ".join(str(item.get("summary") or "").split())
-            if 0 <= index < len(markets) and summary:
-                summaries[index] = summary
-    except (TypeError, ValueError, json.JSONDecodeError):
-        pass
-
-    fallback = "以下为该事件中交易活跃、概率较具参考性的具体合约。"
-    for index, market in enumerate(markets):
-        market["summary_zh"] = summaries.get(index, fallback)
-
-
-def fetch_polymarket_markets(limit=POLYMARKET_LIMIT):
-    """获取 Polymarket 金融、宏观、加密市场和 AI 活跃事件。"""
-    events = {}
-    for tag_id, topic in POLYMARKET_TAGS.items():
-        try:
-            response = requests.get(
-                "https://gamma-api.polymarket.com/events",
-                params={
-                    "active": "true",
-                    "closed": "false",
-                    "limit": limit,
-                    "order": "volume24hr",
-                    "ascending": "false",
-                    "tag_id": tag_id,
-                },
-                headers=REQUEST_HEADERS,
-                timeout=20,
-            )
-            response.raise_for_status()
-            for event in response.json():
-                event_id = str(event.get("id") or event.get("slug", ""))
-                if not event_id:
-                    continue
-                if event_id in events:
-                    events[event_id]["topics"].add(topic)
-                else:
-                    events[event_id] = {"data": event, "topics": {topic}}
-        except Exception as e:
-            print(f"获取 Polymarket {topic} 事件时出错: {e}")
-
-    markets = []
-    for item in events.values():
-        try:
-            event = item["data"]
-            active_markets = [
-                market
-                for market in event.get("markets", [])
-                if market.get("active", True) and not market.get("closed", False)
-            ]
-            contracts = _select_polymarket_contracts(event)
-            if not contracts:
-                continue
-            markets.append(
-                {
-                    "id": str(event.get("id") or event.get("slug", "")),
-                    "question": event.get("title", "未命名事件"),
-                    "url": f"https://polymarket.com/event/{event.get('slug', '')}",
-                    "topics": sorted(item["topics"]),
-                    "contracts": contracts,
-                    "outcomes": contracts[0]["outcomes"],
-                    "volume_24h": round(_safe_float(event.get("volume24hr"))),
-                    "liquidity": round(_safe_float(event.get("liquidity"))),
-                    "end_date": (event.get("endDate") or "")[:10],
-                }
-            )
-        except Exception as e:
-            print(f"处理 Polymarket 事件时出错: {e}")
-    selected = _select_polymarket_events(markets, limit)
-    if selected:
-        _summarize_polymarket_events(selected)
-    return selected
-
-
-class StoryCache:
-    def __init__(self, cache_file="public/story_cache.json", max_age_hours=24):
-        self.cache_file = cache_file
-        self.max_age_hours = max_age_hours
-        self.cache = self._load_cache()
-        self._clean_expired()  # 初始化时清理过期缓存
-
-    def _clean_expired(self):
-        """清理所有过期的缓存条目"""
-        now = datetime.now()
-        expired_keys = []
-
-        for story_id, story in self.cache.items():
-            try:
-                cache_time = datetime.fromisoformat(story["cache_time"])
-                if now - cache_time > timedelta(hours=self.max_age_hours):
-                    expired_keys.append(story_id)
-            except Exception as e:
-                print(f"检查缓存条目 {story_id} 时出错: {e}")
-                expired_keys.append(story_id)  # 错误的条目也清理掉
-
-        # 删除过期条目
-        if expired_keys:
-            print(f"清理 {len(expired_keys)} 个过期缓存条目...")
-            for key in expired_keys:
-                del self.cache[key]
-            self._save_cache()
-
-    def _load_cache(self):
-        """加载缓存文件"""
-        try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    try:
-                        return json.load(f)
-                    except json.JSONDecodeError as e:
-                        print(f"缓存文件格式错误: {e}，将创建新缓存")
-                        # 备份损坏的缓存文件
-                        backup_file = f"{self.cache_file}.bak"
-                        try:
-                            os.rename(self.cache_file, backup_file)
-                            print(f"已将损坏的缓存文件备份为: {backup_file}")
-                        except Exception as rename_err:
-                            print(f"备份损坏的缓存文件失败: {rename_err}")
-            return {}
-        except Exception as e:
-            print(f"加载缓存文件失败: {e}")
-            return {}
-
-    def _save_cache(self):
-        """保存缓存文件"""
-        try:
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
             with open(self.cache_file, "w", encoding="utf-8") as f:
                 json.dump(
                     self.cache, f, ensure_ascii=False, indent=2, cls=DateTimeEncoder
                 )
-        except Exception as e:
-            print(f"保存缓存文件失败: {e}")
-
-    def get(self, story_id):
-        """获取缓存的故事，如果评论数量增加且原数量小于20，返回需要更新摘要的标志"""
-        if str(story_id) not in self.cache:
-            return None
-
-        story = self.cache[str(story_id)]
-        try:
-            cache_time = datetime.fromisoformat(story["cache_time"])
-
-            # 检查缓存是否过期
-            if datetime.now() - cache_time > timedelta(hours=self.max_age_hours):
-                del self.cache[str(story_id)]
-                self._save_cache()
-                return None
-
-            # 转换时间格式
-            if "data" in story and isinstance(story["data"].get("time"), str):
-                story["data"]["time"] = datetime.fromisoformat(story["data"]["time"])
-
-            # 添加一个标志，表示是否需要更新评论摘要
-            story["needs_comment_update"] = False
-
-            return story
-        except Exception as e:
-            print(f"处理缓存数据出错: {e}")
-            return None
-
-    def set(
-        self,
-        story_id,
-        story_data,
-        article_content=None,
-        article_summary=None,
-        comments_summary=None,
-        comments_count=0,  # 新增参数：评论数量
-    ):
-        """缓存故事数据"""
-        # 设置新数据前先清理过期缓存
-        if len(self.cache) > 100:  # 如果缓存条目过多，触发清理
-            self._clean_expired()
-
-        # 确保story_data中的时间是字符串格式
-        if isinstance(story_data.get("time"), datetime):
-            story_data["time"] = story_data["time"].isoformat()
-
-        self.cache[str(story_id)] = {
-            "data": story_data,
-            "article_content": article_content,
-            "article_summary": article_summary,
-            "comments_summary": comments_summary,
-            "comments_count": comments_count,  # 保存评论数量
-            "cache_time": datetime.now().isoformat(),
-        }
-        self._save_cache()
-
-
-def fetch_top_stories():
-    """获取 HN 热门故事"""
-    try:
-        print("\n=== 环境信息 ===")
-        print(f"OpenAI API Base: {OPENAI_API_BASE}")
-        print(f"OpenAI Model: {OPENAI_MODEL}")
-        print(f"API Key 长度: {len(OPENAI_API_KEY) if OPENAI_API_KEY else 0}")
-        print("================\n")
-
-        if not OPENAI_API_KEY:
-            raise ValueError("未设置 OPENAI_API_KEY")
-
-        # 初始化缓存
-        cache = StoryCache()
-
-        print("开始获取热门故事...")
-        response = requests.get("https://hacker-news.firebaseio.com/v0/topstories.json")
-        response.raise_for_status()
-        story_ids = response.json()[:HN_STORY_LIMIT]
-        print(f"成功获取到 {len(story_ids)} 个故事ID")
-
-        comments_prompt = """请分析以下评论，总结出主要的不同观点和讨论要点。
-要求：
-1. 识别并区分不同的观点立场
-2. 保留重要的论据和例子
-3. 注意捕捉评论之间的讨论关系
-4. 如果有争议，请指出争议的焦点
-5. 用中文输出，限制在500字以内
-6. 分点列出不同观点，使用"•"作为列表符号
-
-格式示例：
-主要讨论点：[概括讨论的核心主题]
-
-不同观点：
-• [第一种观点]
-• [第二种观点]
-• [其他重要观点]
-
-补充讨论：[其他值得注意的讨论点]"""
-
-        # 使用并发处理提高效率
-        stories = []
-        story_lock = Lock()  # 用于保护stories列表的线程锁
-
-        # 定义处理单个故事的函数
-        def process_story(story_id, index):
-            try:
-                print(
-                    f"正在处理第 {index}/{len(story_ids)} 个故事 (ID: {story_id})..."
-                )
-
-                # 获取故事数据（无论是否缓存）
-                story = fetch_hn_item(story_id)
-                if not story:
-                    return None
-
-                # 获取当前评论数量
-                current_comments_count = len(story.get("kids", []))
-
-                # 检查缓存
-                cached_data = cache.get(story_id)
-
-                # 判断是否需要更新评论摘要
-                need_update_comments = False
-
-                if cached_data:
-                    # 检查评论数量是否增加且原数量小于20
-                    cached_comments_count = cached_data.get("comments_count", 0)
-                    if (
-                        cached_comments_count < 20
-                        and current_comments_count > cached_comments_count
-                    ):
-                        print(
-                            f"评论数量从 {cached_comments_count} 增加到 {current_comments_count}，将重新生成摘要"
-                        )
-                        need_update_comments = True
-                    else:
-                        print(f"使用缓存的故事数据 (ID: {story_id})")
-                        # 确保缓存中取出的数据格式正确
-                        story_data = cached_data["data"]
-                        if isinstance(story_data.get("time"), str):
-                            story_data["time"] = datetime.fromisoformat(
-                                story_data["time"]
-                            )
-                        return story_data
-
-                # 获取文章内容并生成摘要
-                article_content = None
-                article_summary = "无法获取文章内容"
-
-                # 如果有缓存且只需更新评论，复用文章内容和摘要
-                if cached_data and need_update_comments:
-                    article_content = cached_data.get("article_content")
-                    article_summary = cached_data["data"].get(
-                        "article_summary", "无法获取文章内容"
-                    )
-                # 否则获取新的文章内容和摘要
-                elif "url" in story:
-                    print(f"[故事 {index}/{story_id}] 获取文章内容: {story['url']}")
-                    article_content = get_article_content(story["url"])
-                    if article_content:
-                        article_summary = get_summary(
-                            article_content,
-                            "请用中文简明扼要地总结这篇文章的主要内容，限制在200字以内。",
-                            story_id=story_id,
-                            index=index,
-                        )
-
-                # 获取评论文本 - 如果缓存需要更新或无缓存
-                comments_summary = "暂无评论"
-                if need_update_comments or not cached_data:
-                    print(f"[故事 {index}/{story_id}] 获取评论内容...")
-                    comments_texts = []
-                    if "kids" in story:
-                        for comment_id in story["kids"][:15]:
-                            comment = fetch_hn_item(comment_id)
-                            if (
-                                comment
-                                and not comment.get("deleted")
-                                and not comment.get("dead")
-                            ):
-                                clean_text = clean_html_text(comment.get("text", ""))
-                                if clean_text:
-                                    author = comment.get("by", "匿名")
-                                    comments_texts.append(f"[{author}]: {clean_text}")
-
-                    comments_text = "\n\n---\n\n".join(comments_texts)
-                    if comments_text:
-                        comments_summary = get_summary(
-                            comments_text,
-                            comments_prompt,
-                            story_id=story_id,
-                            index=index,
-                        )
-                else:
-                    # 使用缓存的评论摘要
-                    comments_summary = cached_data["data"].get(
-                        "comments_summary", "暂无评论"
-                    )
-
-                story_data = {
-                    "title": story.get("title", "无标题"),
-                    "url": story.get(
-                        "url", f"https://news.ycombinator.com/item?id={story_id}"
-                    ),
-                    "author": story.get("by", "匿名"),
-                    "score": story.get("score", 0),
-                    "time": datetime.fromtimestamp(story.get("time", 0)).isoformat(),
-                    "comments_count": current_comments_count,
-                    "article_summary": article_summary,
-                    "comments_summary": comments_summary,
-                    "comments_url": f"https://news.ycombinator.com/item?id={story_id}",
-                }
-
-                # 缓存新数据，包括文章内容和摘要
-                cache.set(
-                    story_id,
-                    story_data,
-                    article_content=article_content,
-                    article_summary=article_summary,
-                    comments_summary=comments_summary,
-                    comments_count=current_comments_count,  # 保存当前评论数量
-                )
+        except OSError as e:
+            print(f"保存来源结果缓存失败: {e}")
 
-                # 转换时间格式以适应模板
-                story_data["time"] = datetime.fromisoformat(story_data["time"])
-                return story_data
 
-            except Exception as e:
-                print(f"处理故事 {story_id} 时出错: {e}")
-                return None
-
-        # 使用线程池并发处理故事
-        max_workers = 5  # 最大并发数
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_story = {
-                executor.submit(process_story, story_id, i + 1): (story_id, i + 1)
-                for i, story_id in enumerate(story_ids)
-            }
+def _restore_last_good(name, fields, source_cache):
+    """抓取失败或未完成时，用最后一次成功的结果补齐为空的字段，返回补齐所用数据的时间。"""
+    last_good, cache_time = source_cache.get_last_good(name)
+    if not last_good:
+        return None
+    restored = [key for key, value in last_good.items() if value and not fields.get(key)]
+    if not restored:
+        return None
+    for key in restored:
+        fields[key] = last_good[key]
+    print(f"{SOURCES[name][0]} 本次抓取失败，展示 {cache_time[:16]} 的数据")
+    return cache_time
 
-            # 处理结果
-            for future in concurrent.futures.as_completed(future_to_story):
-                story_id, index = future_to_story[future]
-                try:
-                    story_data = future.result()
-                    if story_data:
-                        with story_lock:
-                            stories.append(story_data)
-                except Exception as e:
-                    print(f"获取故事 {story_id} 的结果时出错: {e}")
-
-        # 按原始顺序排序故事
-        stories.sort(
-            key=lambda x: story_ids.index(int(x["comments_url"].split("=")[-1]))
-        )
 
-        return stories
-    except Exception as e:
-        print(f"获取热门故事时出错: {e}")
-        return []
+def _source_cache_ttls():
+    """读取来源缓存有效期，可用 SOURCE_CACHE_TTLS=bls=24,sec=2 覆盖默认值。"""
+    ttls = dict(SOURCE_CACHE_TTL_HOURS)
+    for item in os.getenv("SOURCE_CACHE_TTLS", "").split(","):
+        name, _, hours = item.strip().partition("=")
+        try:
+            ttls[name] = float(hours)
+        except ValueError:
+            if item.strip():
+                print(f"忽略无效的来源缓存有效期配置: {item}")
+    return ttls
 
 
 def generate_html(
@@ -1284,8 +149,13 @@ def generate_html(
     macro_indicators=None,
     sec_filings=None,
     polymarket_markets=None,
+    partial_sources=None,
+    stale_sources=None,
 ):
     """生成按主题分组的单页 HTML。"""
+    import pytz
+    from jinja2 import Template
+
     try:
         with open("templates/index.html") as f:
             template = Template(f.read(), autoescape=True)
@@ -1298,6 +168,12 @@ def generate_html(
         if os.path.isdir(old_pages_dir):
             shutil.rmtree(old_pages_dir)
 
+        static_dir = os.path.join("templates", "static")
+        assets = {
+            name: hashed_asset(os.path.join(static_dir, name))
+            for name in sorted(os.listdir(static_dir))
+        }
+
         html_content = template.render(
             stories=stories,
             github_repositories=github_repositories or [],
@@ -1309,60 +185,434 @@ def generate_html(
             macro_indicators=macro_indicators or [],
             sec_filings=sec_filings or [],
             polymarket_markets=polymarket_markets or [],
+            partial_sources=partial_sources or [],
+            stale_sources=stale_sources or {},
             update_time=current_time,
+            assets=assets,
         )
-        with open("public/index.html", "w", encoding="utf-8") as f:
-            f.write(html_content)
+        write_if_changed("public/index.html", html_content)
         print("成功生成多来源单页")
+
+        write_feeds(
+            {
+                "stories": stories,
+                "arxiv_papers": arxiv_papers,
+                "arxiv_ai_papers": arxiv_ai_papers,
+                "sec_filings": sec_filings,
+                "polymarket_markets": polymarket_markets,
+            }
+        )
+        write_manifest("public", assets.values())
     except Exception as e:
         print(f"生成HTML时出错: {e}")
         raise
 
 
-def main():
-    print("开始执行程序...")
+def _source_hn():
     stories = fetch_top_stories()
     if not stories:
         raise RuntimeError("未获取到任何故事，请检查网络连接和API状态")
+    return {"stories": stories}
+
 
-    print("正在获取 GitHub Trending...")
+def _source_trending():
     github_repositories = fetch_github_trending()
-    print("正在获取 Lobsters...")
-    lobsters_stories = fetch_lobsters()
     print("正在获取 GitHub Releases...")
-    github_releases = fetch_github_releases(github_repositories)
-    print("正在获取 Product Hunt...")
-    product_hunt_products = fetch_product_hunt()
-    print("正在获取并翻译 arXiv 金融论文...")
+    return {
+        "github_repositories": github_repositories,
+        "github_releases": fetch_github_releases(github_repositories),
+    }
+
+
+def _source_arxiv():
+    """金融论文的翻译与 AI 论文的抓取并行，两次 arXiv 请求仍间隔三秒。"""
     translation_cache = ArxivTranslationCache()
-    arxiv_papers = fetch_arxiv_papers(cache=translation_cache)
-    time.sleep(3)
-    print("正在获取并翻译 arXiv AI 论文...")
-    arxiv_ai_papers = fetch_arxiv_ai_papers(cache=translation_cache)
-    print("正在获取宏观指标、SEC 公告和预测市场...")
-    macro_indicators = fetch_bls_market_indicators() + fetch_treasury_yields()
-    sec_filings = fetch_sec_filings()
-    polymarket_markets = fetch_polymarket_markets()
+    paper_index = ArxivPaperIndex()
+    arxiv_papers = harvest_arxiv_papers(
+        paper_index, ARXIV_SEARCH_QUERY, cache=translation_cache, translate=False
+    )
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        finance_translation = executor.submit(
+            translate_arxiv_papers, arxiv_papers, translation_cache
+        )
+        time.sleep(3)  # arXiv 要求请求间隔至少三秒
+        print("正在获取 arXiv AI 论文...")
+        arxiv_ai_papers = harvest_arxiv_papers(
+            paper_index,
+            ARXIV_AI_SEARCH_QUERY,
+            limit=ARXIV_AI_PAPER_LIMIT,
+            cache=translation_cache,
+            translate=False,
+        )
+        # 等金融论文翻译完成，两类都收录的论文可直接命中缓存
+        finance_translation.result()
+    translate_arxiv_papers(arxiv_ai_papers, translation_cache)
+    # 渲染用的论文就是索引中的对象，译文随索引一起保存
+    paper_index.save()
+    return {"arxiv_papers": arxiv_papers, "arxiv_ai_papers": arxiv_ai_papers}
+
+
+# 来源名称 -> (展示名称, 抓取函数)；抓取函数返回 generate_html 所需的字段
+SOURCES = {
+    "hn": ("Hacker News", _source_hn),
+    "trending": ("GitHub Trending", _source_trending),
+    "lobsters": ("Lobsters", lambda: {"lobsters_stories": fetch_lobsters()}),
+    "producthunt": (
+        "Product Hunt",
+        lambda: {"product_hunt_products": fetch_product_hunt()},
+    ),
+    "arxiv": ("arXiv 论文", _source_arxiv),
+    "bls": ("BLS 宏观指标", lambda: {"bls_indicators": fetch_bls_market_indicators()}),
+    "treasury": ("美国国债收益率", lambda: {"treasury_yields": fetch_treasury_yields()}),
+    "sec": ("SEC 公告", lambda: {"sec_filings": fetch_sec_filings()}),
+    "polymarket": (
+        "Polymarket 预测市场",
+        lambda: {"polymarket_markets": fetch_polymarket_markets()},
+    ),
+}
+
+# 整次运行的默认时间预算（秒），可用 RUN_DEADLINE_SECONDS 或 --deadline 覆盖
+RUN_DEADLINE_SECONDS = 40 * 60
+
+# 常驻模式下各来源的刷新间隔（秒），按数据源的更新频率设置
+SOURCE_REFRESH_INTERVALS = {
+    "hn": 6 * 3600,
+    "trending": 6 * 3600,
+    "lobsters": 2 * 3600,
+    "producthunt": 6 * 3600,
+    "arxiv": 12 * 3600,
+    "bls": 24 * 3600,
+    "treasury": 6 * 3600,
+    "sec": 3 * 3600,
+    "polymarket": 5 * 60,
+}
+
+
+def _count_items(fields):
+    return sum(len(value) for value in fields.values() if isinstance(value, list))
+
+
+def fetch_source(name, source_cache=None, metrics=None):
+    """抓取单个来源，返回用于渲染页面的字段。
+
+    来源结果仍在缓存有效期内时直接复用，跳过整个抓取和解析过程。超出运行时限时
+    不再开始抓取，在指标中标记为 partial。抓取失败（抛出异常或所有字段为空）或
+    未完成时，为空的字段用最后一次成功的结果补齐，并在指标中记录 stale_since；
+    成功的抓取即使个别字段为空（如当天没有 SEC 公告）也照常保存。
+    """
+    label, fetch = SOURCES[name]
+    started = time.monotonic()
+    fields = source_cache.get(name) if source_cache else None
+    cached = fields is not None
+    partial = False
+    if cached:
+        print(f"正在获取 {label}...（使用缓存结果）")
+    elif deadline_expired():
+        print(f"超出运行时限，跳过 {label}")
+        fields = {}
+        partial = True
+    else:
+        print(f"正在获取 {label}...")
+        try:
+            fields = fetch()
+        except Exception as e:
+            if name in SOURCE_FALLBACK_EXCLUDED:
+                raise
+            print(f"获取 {label} 时出错: {e}")
+            fields = {}
+        # 抓取过程中耗尽预算的来源可能只完成了一部分
+        partial = deadline_expired()
+    stale_since = None
+    if not cached and source_cache:
+        if partial or not _count_items(fields):
+            stale_since = _restore_last_good(name, fields, source_cache)
+        else:
+            source_cache.set(name, fields)
+    if metrics is not None:
+        metrics[name] = {
+            "cached": cached,
+            "partial": partial,
+            "stale_since": stale_since,
+            "seconds": round(time.monotonic() - started, 3),
+            "items": _count_items(fields),
+        }
+    return fields
+
+
+def write_run_metrics(metrics, metrics_file="cache/metrics.json"):
+    """记录本次运行各来源的耗时、条目数以及是否来自缓存。"""
+    try:
+        os.makedirs(os.path.dirname(metrics_file), exist_ok=True)
+        with open(metrics_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {"generated_at": datetime.now().isoformat(), "sources": metrics},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+    except OSError as e:
+        print(f"保存运行指标失败: {e}")
 
+
+def _source_notices(metrics):
+    """从运行指标整理页面提示：未完成的来源，以及展示旧数据的来源及其时间。"""
+    partial_sources = [
+        SOURCES[name][0] for name, item in metrics.items() if item.get("partial")
+    ]
+    stale_sources = {
+        SOURCES[name][0]: item["stale_since"][:16].replace("T", " ")
+        for name, item in metrics.items()
+        if item.get("stale_since")
+    }
+    return partial_sources, stale_sources
+
+
+def render_results(results, partial_sources=None, stale_sources=None):
+    """把各来源的最新结果渲染为页面。
+
+    partial_sources 为未能在时限内完成的来源，stale_sources 为展示旧数据的来源。
+    """
+    stories = results.get("stories", [])
+    lobsters_stories = results.get("lobsters_stories", [])
+    cross_link_stories(stories, lobsters_stories)
     print("正在生成 HTML...")
     generate_html(
         stories,
-        github_repositories,
-        product_hunt_products,
-        arxiv_papers,
-        lobsters_stories,
-        github_releases,
-        arxiv_ai_papers,
-        macro_indicators,
-        sec_filings,
-        polymarket_markets,
+        github_repositories=results.get("github_repositories"),
+        product_hunt_products=results.get("product_hunt_products"),
+        arxiv_papers=results.get("arxiv_papers"),
+        lobsters_stories=lobsters_stories,
+        github_releases=results.get("github_releases"),
+        arxiv_ai_papers=results.get("arxiv_ai_papers"),
+        macro_indicators=(
+            results.get("bls_indicators", []) + results.get("treasury_yields", [])
+        ),
+        sec_filings=results.get("sec_filings"),
+        polymarket_markets=results.get("polymarket_markets"),
+        partial_sources=partial_sources,
+        stale_sources=stale_sources,
     )
     if not os.path.isfile("public/index.html") or os.path.getsize(
         "public/index.html"
     ) == 0:
         raise RuntimeError("HTML 生成失败：public/index.html 不存在或为空")
+
+
+def run_daemon(intervals=None, max_cycles=None, deadline=None, read_only_cache=False):
+    """常驻运行，只刷新到期的来源，并在有来源更新时重新渲染页面。
+
+    Hacker News 首次成功之前不会生成页面，避免发布空的技术社区 Tab。
+    deadline 为每轮刷新的时间预算（秒）；read_only_cache 为真时（--no-llm）
+    只读取来源缓存，不把含占位摘要的结果写入。
+    """
+    intervals = {**SOURCE_REFRESH_INTERVALS, **(intervals or {})}
+    source_cache = SourceCache(read_only=read_only_cache)
+    results = {}
+    metrics = {}
+    next_due = {name: 0.0 for name in SOURCES}
+    cycles = 0
+    print("进入常驻模式，各来源刷新间隔（秒）: " + ", ".join(
+        f"{name}={intervals[name]}" for name in SOURCES
+    ))
+    while max_cycles is None or cycles < max_cycles:
+        cycles += 1
+        refreshed = []
+        start_run_deadline(deadline)
+        for name in SOURCES:
+            if next_due[name] > time.monotonic():
+                continue
+            try:
+                results.update(fetch_source(name, source_cache, metrics))
+                refreshed.append(name)
+            except Exception as e:
+                print(f"刷新来源 {name} 时出错: {e}")
+            next_due[name] = time.monotonic() + intervals[name]
+
+        # metrics 保留每个来源最近一次刷新的结果
+        if refreshed:
+            write_run_metrics(metrics)
+        if refreshed and "stories" in results:
+            print(f"已刷新: {', '.join(refreshed)}")
+            partial_sources, stale_sources = _source_notices(metrics)
+            try:
+                render_results(
+                    results,
+                    partial_sources=partial_sources,
+                    stale_sources=stale_sources,
+                )
+            except Exception as e:
+                print(f"重新渲染页面时出错: {e}")
+        clear_run_deadline()
+
+        wait = max(1.0, min(next_due.values()) - time.monotonic())
+        if max_cycles is None or cycles < max_cycles:
+            print(f"下一次刷新在 {wait:.0f} 秒后")
+            time.sleep(wait)
+
+
+def save_snapshot(results, snapshot_file):
+    """把各来源结果保存为快照，便于之后不联网重新渲染。"""
+    snapshot_directory = os.path.dirname(snapshot_file)
+    if snapshot_directory:
+        os.makedirs(snapshot_directory, exist_ok=True)
+    with open(snapshot_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2, cls=DateTimeEncoder)
+    print(f"已保存快照: {snapshot_file}")
+
+
+def load_snapshot(snapshot_file):
+    """读取快照，并恢复模板需要的 datetime 字段。"""
+    with open(snapshot_file, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    for story in results.get("stories", []):
+        if isinstance(story.get("time"), str):
+            story["time"] = datetime.fromisoformat(story["time"])
+    print(f"已加载快照: {snapshot_file}")
+    return results
+
+
+def _parse_sources(value):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(
+            f"未知来源: {', '.join(unknown) or value}；可选: {', '.join(SOURCES)}"
+        )
+    return names
+
+
+def _parse_interval(value):
+    name, _, seconds = value.partition("=")
+    if name not in SOURCES or not seconds.isdigit():
+        raise argparse.ArgumentTypeError(f"无效的刷新间隔: {value}")
+    return name, int(seconds)
+
+
+def _run_deadline_seconds(value):
+    if value is not None:
+        return value
+    try:
+        return float(getenv("RUN_DEADLINE_SECONDS", RUN_DEADLINE_SECONDS))
+    except ValueError:
+        return RUN_DEADLINE_SECONDS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="抓取各来源并生成 LiveNews 页面")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常驻运行，按各来源的刷新间隔增量更新页面",
+    )
+    parser.add_argument(
+        "--interval",
+        action="append",
+        type=_parse_interval,
+        default=[],
+        metavar="SOURCE=SECONDS",
+        help="覆盖某个来源在常驻模式下的刷新间隔，可重复指定",
+    )
+    parser.add_argument(
+        "--sources",
+        type=_parse_sources,
+        metavar="NAME[,NAME...]",
+        help=f"只抓取指定来源，可选: {', '.join(SOURCES)}",
+    )
+    parser.add_argument(
+        "--no-llm",
+        action="store_true",
+        help="不调用模型，使用缓存摘要或占位摘要",
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        help="从快照加载来源结果；配合 --sources 时只重新抓取指定来源",
+    )
+    parser.add_argument(
+        "--save-snapshot",
+        metavar="PATH",
+        help="把本次的来源结果保存为快照",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help=f"整次运行的时间预算，0 表示不限时（默认 {RUN_DEADLINE_SECONDS} 秒）",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile",
+        metavar="DIR",
+        help="按阶段记录 CPU 和内存剖析，报告和折叠栈写入 DIR（默认 profile/）",
+    )
+    return parser.parse_args(argv or [])
+
+
+def _profile_stage(profiler, name):
+    return profiler.stage(name) if profiler else contextlib.nullcontext()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.no_llm:
+        print("已关闭模型调用，将使用缓存摘要或占位摘要")
+        set_llm_enabled(False)
+    deadline = _run_deadline_seconds(args.deadline)
+    if args.daemon:
+        if args.profile:
+            print("常驻模式不支持 --profile，已忽略")
+        run_daemon(
+            intervals=dict(args.interval), deadline=deadline, read_only_cache=args.no_llm
+        )
+        return
+
+    print("开始执行程序...")
+    profiler = None
+    if args.profile:
+        from scripts.profiling import StageProfiler
+
+        profiler = StageProfiler(args.profile)
+        profiler.start()
+    try:
+        _run_once(args, deadline, profiler)
+    finally:
+        if profiler:
+            profiler.stop()
+
+
+def _run_once(args, deadline, profiler=None):
+    results = load_snapshot(args.snapshot) if args.snapshot else {}
+    if args.sources:
+        source_names = args.sources
+    else:
+        source_names = [] if args.snapshot else list(SOURCES)
+    metrics = {}
+    # 跳过模型时的结果不完整，不能写入来源缓存
+    source_cache = SourceCache(read_only=args.no_llm)
+    start_run_deadline(deadline)
+    try:
+        for name in source_names:
+            with _profile_stage(profiler, f"fetch:{name}"):
+                results.update(fetch_source(name, source_cache, metrics))
+    finally:
+        clear_run_deadline()
+    if args.save_snapshot:
+        save_snapshot(results, args.save_snapshot)
+    partial_sources, stale_sources = _source_notices(metrics)
+    if partial_sources:
+        print(f"以下来源未能在时限内完成: {', '.join(partial_sources)}")
+    # 先写运行指标，发布清单中记录的是本次的指标文件
+    write_run_metrics(metrics)
+    with _profile_stage(profiler, "render"):
+        render_results(
+            results, partial_sources=partial_sources, stale_sources=stale_sources
+        )
+    cached_sources = [name for name, item in metrics.items() if item["cached"]]
+    if cached_sources:
+        print(f"以下来源使用了缓存结果: {', '.join(cached_sources)}")
     print("程序执行完成！")
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
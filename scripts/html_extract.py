@@ -0,0 +1,170 @@
+"""文章正文提取与 HN 评论清理。
+
+BeautifulSoup 解析是纯 CPU 工作，在抓取线程池中执行会因 GIL 互相排队，
+也拖慢同一进程里的网络请求。较大的页面把原始字节交给进程池解析，
+下载仍由 I/O 线程负责；小页面在当前线程解析，省去进程间传输的开销。
+
+HN 评论只包含 <p>、<a>、<i>、<pre>、<code> 等少量标签和实体，
+用正则去标签再 html.unescape 即可得到与 BeautifulSoup 相同的文本。
+"""
+
+import atexit
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+
+from scripts.settings import getenv
+
+# 超过该字节数的页面才交给进程池
+POOL_MIN_BYTES = 32 * 1024
+# 单次摘要调用和缓存保存的正文长度上限
+ARTICLE_TEXT_LIMIT = 5000
+# 提取正文的长度上限：超过 ARTICLE_TEXT_LIMIT 的部分只交给 llm.summarize_long 分块摘要
+ARTICLE_EXTRACT_LIMIT = 40000
+
+_pool = None
+_pool_lock = Lock()
+
+# 完整的开始/结束标签，属性值中的引号和 > 也能正确跳过
+_TAG_RE = re.compile(r"""</?[a-zA-Z][^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*>""")
+# 批量清理时连接各条评论的分隔符，HN 评论中不会出现
+_BATCH_SEPARATOR = "\x00"
+
+
+def declared_charset(content_type):
+    """Content-Type 中显式声明的字符集；未声明时交给 BeautifulSoup 按 meta 标签识别。"""
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type or "", re.IGNORECASE)
+    return match.group(1) if match else None
+
+
+def extract_article_text(body, encoding=None):
+    """从 HTML 字节中提取正文，过短时返回 None；在子进程中执行时只依赖参数。"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(body, "html.parser", from_encoding=encoding)
+
+    # 移除不需要的元素
+    for element in soup(
+        ["script", "style", "nav", "header", "footer", "iframe", "noscript"]
+    ):
+        element.decompose()
+
+    # 尝试找到主要内容
+    main_content = None
+    content_candidates = soup.select(
+        "article, main, .article-content, .post-content, .entry-content"
+    )
+    if content_candidates:
+        main_content = content_candidates[0]
+
+    if not main_content:
+        main_content = soup.find("body")
+
+    if not main_content:
+        main_content = soup
+
+    # 获取文本
+    text = main_content.get_text(separator="\n", strip=True)
+
+    # 清理文本
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    text = "\n".join(lines)
+
+    if len(text) < 50:
+        print("跳过内容过短的文章")
+        return None
+
+    return text[:ARTICLE_EXTRACT_LIMIT]
+
+
+def _pool_workers():
+    """默认给主进程留一个核心；单核机器或 HTML_EXTRACT_WORKERS=0 时关闭进程池。"""
+    default = min(4, (os.cpu_count() or 1) - 1)
+    try:
+        return int(getenv("HTML_EXTRACT_WORKERS", default))
+    except ValueError:
+        return default
+
+
+def get_pool():
+    """返回共享的解析进程池，首次调用时创建；关闭时返回 None。"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = _pool_workers()
+            if workers <= 0:
+                return None
+            import multiprocessing
+
+            # spawn 不继承父进程的线程和锁，在线程池中创建也安全
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(shutdown_pool)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def extract_article(body, encoding=None, timeout=None):
+    """提取正文：大页面交给进程池，进程池不可用时退回当前线程。"""
+    pool = get_pool() if len(body) >= POOL_MIN_BYTES else None
+    if pool is not None:
+        try:
+            return pool.submit(extract_article_text, body, encoding).result(timeout)
+        except BrokenProcessPool as e:
+            print(f"HTML 解析进程池不可用，改为在线程中解析: {e}")
+            shutdown_pool()
+    return extract_article_text(body, encoding)
+
+
+def _clean_comment_fallback(text):
+    from bs4 import BeautifulSoup
+
+    return " ".join(BeautifulSoup(text, "html.parser").get_text().split())
+
+
+def _strip_tags(text):
+    """去掉标签；剩下的 < 说明不是 HN 的规范输出（注释、残缺标签等），返回 None。"""
+    stripped = _TAG_RE.sub("", text)
+    return None if "<" in stripped else stripped
+
+
+def clean_comment_html(text):
+    """把一条 HN 评论 HTML 转为纯文本，空白折叠为单个空格。"""
+    if not text:
+        return ""
+    stripped = _strip_tags(text)
+    if stripped is None:
+        return _clean_comment_fallback(text)
+    return " ".join(html.unescape(stripped).split())
+
+
+def clean_comment_batch(texts):
+    """批量清理评论：整批只做一次去标签和实体解码，再按条折叠空白。
+
+    结果与逐条调用 clean_comment_html 相同；包含分隔符、非常规标记，或标签跨越
+    分隔符（去标签后分隔符数量变化）的批次逐条处理。
+    """
+    texts = [text or "" for text in texts]
+    joined = _BATCH_SEPARATOR.join(texts)
+    stripped = _strip_tags(joined)
+    if (
+        stripped is None
+        or joined.count(_BATCH_SEPARATOR) != len(texts) - 1
+        or stripped.count(_BATCH_SEPARATOR) != len(texts) - 1
+    ):
+        return [clean_comment_html(text) for text in texts]
+    return [
+        " ".join(item.split())
+        for item in html.unescape(stripped).split(_BATCH_SEPARATOR)
+    ]
@@ -0,0 +1,690 @@
+"""OpenAI 兼容模型调用。
+
+配置和客户端在第一次调用模型时才初始化，只需抓取数据或渲染模板时不会导入 openai。
+"""
+
+import concurrent.futures
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from threading import Lock
+
+import requests
+
+from scripts import deadline
+from scripts.settings import getenv
+
+# --no-llm 模式下代替模型输出的占位摘要
+LLM_DISABLED_SUMMARY = "摘要已跳过（未调用模型）"
+
+# 按任务划分的模型调用参数；model 为 None 时使用 OPENAI_MODEL，
+# 也可以用 OPENAI_MODEL_<配置名> 环境变量为单个任务指定模型
+MODEL_PROFILES = {
+    "default": {
+        "model": None,
+        "max_tokens": 3000,
+        "timeout": 30,
+        "temperature": 0.7,
+        "max_retries": 3,
+        "retry_delay": 2,  # 指数退避的基础等待秒数
+    },
+    # 200 字以内的文章摘要
+    "article": {"max_tokens": 600, "timeout": 20, "temperature": 0.3},
+    # 500 字以内的评论观点归纳
+    "comments": {"max_tokens": 1500, "timeout": 45, "temperature": 0.5},
+    # arXiv 摘要全文翻译，需要忠实原文
+    "translation": {"max_tokens": 1500, "timeout": 45, "temperature": 0.2, "max_retries": 2},
+    # 多篇摘要合并为一次调用的 JSON 批量翻译
+    "translation_batch": {"max_tokens": 6000, "timeout": 90, "temperature": 0.2, "max_retries": 2},
+    # 长文本分块摘要的 map 阶段，只需提炼要点
+    "chunk": {"max_tokens": 500, "timeout": 30, "temperature": 0.3},
+    # Polymarket 批量 JSON 说明，失败时有确定性兜底，不值得重试
+    "polymarket": {"max_tokens": 2000, "timeout": 30, "temperature": 0.2, "max_retries": 1},
+}
+
+# 单次重试等待的上限（秒），Retry-After 也不会超过该值
+MAX_RETRY_DELAY = 30
+
+# 估算超过该 token 数的输入走分块摘要，每块不超过 MAP_REDUCE_CHUNK_TOKENS
+MAP_REDUCE_THRESHOLD_TOKENS = 6000
+MAP_REDUCE_CHUNK_TOKENS = 3000
+MAP_REDUCE_WORKERS = 4
+# 文章正文单次调用的 token 上限，约等于 html_extract.ARTICLE_TEXT_LIMIT 个英文字符
+ARTICLE_CALL_TOKENS = 1500
+
+# 每个端点保留最近多少次调用用于统计延迟和错误率
+ENDPOINT_STATS_WINDOW = 50
+# 至少有这么多次成功调用后才根据 p90 延迟发起对冲请求
+HEDGE_MIN_SAMPLES = 5
+CHUNK_PROMPT = (
+    "以下是一段较长内容中的一部分。请用中文提炼这部分的要点、观点和关键论据，"
+    "保留人名、数字和具体例子，不要添加评论，限制在200字以内。"
+)
+
+_client = None
+_client_lock = Lock()
+_router = None
+_router_lock = Lock()
+_llm_enabled = True
+
+
+class CircuitBreaker:
+    """模型服务熔断器。
+
+    连续失败达到阈值后进入 open 状态，所有调用立即失败；冷却时间过后进入
+    half-open 状态，只放行少量探测请求，探测成功即恢复，失败则重新熔断。
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60, half_open_max_calls=1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self._lock = Lock()
+
+    def allow(self):
+        """当前是否允许发出请求。"""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self.half_open_calls = 0
+                print("模型服务熔断冷却结束，发送探测请求")
+            if self.state == "half_open":
+                if self.half_open_calls >= self.half_open_max_calls:
+                    return False
+                self.half_open_calls += 1
+            return True
+
+    def release(self):
+        """放行的请求没有真正到达模型服务（配置错误、超出运行时限）时归还探测名额。"""
+        with self._lock:
+            if self.state == "half_open" and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print("模型服务已恢复，关闭熔断")
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (
+                self.state == "closed" and self.failures >= self.failure_threshold
+            ):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                print(
+                    f"模型服务连续失败 {self.failures} 次，熔断 {self.reset_timeout} 秒"
+                )
+
+
+# 主端点（OPENAI_API_BASE）的熔断器，备用端点各自持有一个
+model_circuit = CircuitBreaker()
+
+
+class ModelUnavailable(Exception):
+    """所有端点都处于熔断状态。"""
+
+
+class ModelEndpoint:
+    """一个 OpenAI 兼容端点，记录最近调用的成败，以及按任务配置分开的延迟。
+
+    不同任务的输出长度相差很大，短标题翻译的延迟不能作为长文摘要是否过慢的依据。
+    """
+
+    def __init__(self, name, api_base, api_key, model=None):
+        self.name = name
+        self.api_base = api_base
+        self.api_key = api_key
+        self.model = model  # 为 None 时使用任务配置中的模型
+        self._circuit = CircuitBreaker()
+        self.latencies = {}  # 任务配置名 -> 最近成功调用的耗时
+        self.outcomes = deque(maxlen=ENDPOINT_STATS_WINDOW)
+        self._client = None
+        self._lock = Lock()
+
+    @property
+    def circuit(self):
+        return self._circuit
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                self._client = OpenAI(
+                    api_key=self.api_key, base_url=self.api_base, max_retries=0
+                )
+            return self._client
+
+    def record_success(self, seconds, profile="default"):
+        with self._lock:
+            self.latencies.setdefault(
+                profile, deque(maxlen=ENDPOINT_STATS_WINDOW)
+            ).append(seconds)
+            self.outcomes.append(True)
+        self.circuit.record_success()
+
+    def record_failure(self):
+        with self._lock:
+            self.outcomes.append(False)
+        self.circuit.record_failure()
+
+    def error_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def latency_p90(self, profile="default"):
+        """该任务配置最近成功调用的 p90 延迟（秒），样本不足时返回 None。"""
+        with self._lock:
+            latencies = self.latencies.get(profile, ())
+            if len(latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+
+class PrimaryEndpoint(ModelEndpoint):
+    """OPENAI_API_BASE 对应的主端点，沿用共享客户端和 model_circuit。"""
+
+    def __init__(self):
+        config = get_openai_config()
+        super().__init__("default", config["api_base"], config["api_key"])
+
+    @property
+    def circuit(self):
+        return model_circuit
+
+    def client(self):
+        return get_client()
+
+
+class ModelRouter:
+    """在多个端点之间路由模型调用。
+
+    按配置顺序选择端点，近期错误率过半的端点排到后面；调用失败时切换到下一个端点。
+    开启对冲时，若首选端点超过自己的 p90 延迟仍未返回，再向下一个端点发出同样的请求，
+    采用先返回的结果。
+    """
+
+    def __init__(self, endpoints, hedge=False):
+        self.endpoints = list(endpoints)
+        self.hedge = hedge
+
+    def ordered(self):
+        return sorted(
+            self.endpoints,
+            key=lambda endpoint: (
+                len(endpoint.outcomes) >= HEDGE_MIN_SAMPLES and endpoint.error_rate() > 0.5,
+                self.endpoints.index(endpoint),
+            ),
+        )
+
+    def _call(self, endpoint, request, profile="default"):
+        started = time.monotonic()
+        try:
+            response = endpoint.client().chat.completions.create(
+                **{**request, "model": endpoint.model or request["model"]}
+            )
+        except (deadline.DeadlineExceeded, ValueError):
+            endpoint.circuit.release()
+            raise
+        except Exception:
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - started, profile)
+        return response
+
+    def _start(self, endpoint, request, profile):
+        """在独立线程中立即发出请求，等待时间从请求真正开始时计算，不会在线程池中排队。"""
+        future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(self._call(endpoint, request, profile))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="llm-hedge", daemon=True).start()
+        return future
+
+    def _hedged(self, endpoint, backups, request, tried, story_info="", profile="default"):
+        threshold = endpoint.latency_p90(profile)
+        if threshold is None or not backups:
+            return self._call(endpoint, request, profile)
+
+        first = self._start(endpoint, request, profile)
+        try:
+            return first.result(timeout=threshold)
+        except concurrent.futures.TimeoutError:
+            pass
+
+        backup = next((item for item in backups if item.circuit.allow()), None)
+        if backup is None:
+            return first.result()
+        tried.add(backup.name)
+        print(
+            f"{story_info}{endpoint.name} 超过 p90 延迟 {threshold:.1f} 秒，"
+            f"向 {backup.name} 发出对冲请求"
+        )
+        # 落后的请求无法取消，完成后仍会计入该端点的统计
+        futures = [first, self._start(backup, request, profile)]
+        error = None
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+        raise error
+
+    def complete(self, request, story_info="", profile="default"):
+        """发出一次 chat completion 请求；所有端点都失败时抛出最后一个错误。"""
+        endpoints = self.ordered()
+        tried = set()
+        error = None
+        for position, endpoint in enumerate(endpoints):
+            if endpoint.name in tried or not endpoint.circuit.allow():
+                continue
+            tried.add(endpoint.name)
+            try:
+                if self.hedge:
+                    backups = [
+                        item for item in endpoints[position + 1 :] if item.name not in tried
+                    ]
+                    return self._hedged(
+                        endpoint, backups, request, tried, story_info, profile
+                    )
+                return self._call(endpoint, request, profile)
+            except (deadline.DeadlineExceeded, ValueError):
+                raise
+            except Exception as e:
+                error = e
+                if len(self.endpoints) > 1:
+                    print(f"{story_info}模型端点 {endpoint.name} 调用失败: {e}")
+        if error is None:
+            raise ModelUnavailable()
+        raise error
+
+    def stats(self):
+        """各端点的调用次数、错误率和 p90 延迟，便于在日志中比较。"""
+        return [
+            {
+                "name": endpoint.name,
+                "calls": len(endpoint.outcomes),
+                "error_rate": endpoint.error_rate(),
+                "latency_p90": {
+                    profile: endpoint.latency_p90(profile) for profile in endpoint.latencies
+                },
+                "circuit": endpoint.circuit.state,
+            }
+            for endpoint in self.endpoints
+        ]
+
+
+def _retry_after_seconds(error):
+    """从限流或服务端错误的响应头中读取 Retry-After（秒）。"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base_delay, retry_after=None):
+    """计算第 attempt 次失败后的等待时间：优先遵守 Retry-After，否则指数退避加抖动。"""
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_DELAY)
+    delay = min(base_delay * 2**attempt, MAX_RETRY_DELAY)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def set_llm_enabled(enabled):
+    """开启或关闭模型调用；关闭后 get_summary 直接返回占位摘要。"""
+    global _llm_enabled
+    _llm_enabled = bool(enabled)
+
+
+def llm_enabled():
+    return _llm_enabled
+
+
+def is_summary_available(summary):
+    """判断摘要是否为模型真实输出，而不是失败提示或占位文本。"""
+    return bool(
+        summary
+        and not summary.startswith("摘要生成失败")
+        and summary != LLM_DISABLED_SUMMARY
+    )
+
+
+@functools.cache
+def get_openai_config():
+    """读取 OpenAI 配置，并确保 API 基础 URL 带有协议前缀。"""
+    api_base = getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+    if api_base and not api_base.startswith(("http://", "https://")):
+        api_base = "https://" + api_base
+    return {
+        "api_key": getenv("OPENAI_API_KEY"),
+        "api_base": api_base,
+        "model": getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+    }
+
+
+def get_client():
+    """返回共享的 OpenAI 客户端，首次调用时创建。"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+
+            config = get_openai_config()
+            try:
+                # 重试由 get_summary 统一负责，关闭 SDK 自带的重试
+                _client = OpenAI(
+                    api_key=config["api_key"],
+                    base_url=config["api_base"],
+                    max_retries=0,
+                )
+            except Exception as e:
+                print(f"初始化 OpenAI 客户端时出错: {e}")
+                raise
+        return _client
+
+
+def _backup_endpoints():
+    """读取 OPENAI_BACKUP_ENDPOINTS 中列出的备用端点。
+
+    每个名称 NAME 对应 OPENAI_NAME_API_BASE、OPENAI_NAME_API_KEY 和可选的 OPENAI_NAME_MODEL。
+    """
+    endpoints = []
+    for name in getenv("OPENAI_BACKUP_ENDPOINTS", "").split(","):
+        name = name.strip()
+        if not name:
+            continue
+        prefix = f"OPENAI_{name.upper()}_"
+        api_base = getenv(prefix + "API_BASE")
+        api_key = getenv(prefix + "API_KEY")
+        if not api_base or not api_key:
+            print(f"备用模型端点 {name} 缺少 {prefix}API_BASE 或 {prefix}API_KEY，已忽略")
+            continue
+        if not api_base.startswith(("http://", "https://")):
+            api_base = "https://" + api_base
+        endpoints.append(ModelEndpoint(name, api_base, api_key, getenv(prefix + "MODEL")))
+    return endpoints
+
+
+def get_router():
+    """返回共享的模型路由器，首次调用时按环境变量创建。"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            hedge = getenv("OPENAI_HEDGE_REQUESTS", "0").lower() in ("1", "true", "yes")
+            _router = ModelRouter([PrimaryEndpoint(), *_backup_endpoints()], hedge=hedge)
+            if len(_router.endpoints) > 1:
+                names = ", ".join(endpoint.name for endpoint in _router.endpoints)
+                print(f"模型端点: {names}{'（对冲请求已开启）' if hedge else ''}")
+        return _router
+
+
+def get_model_profile(name="default"):
+    """返回合并了默认值和环境变量覆盖的任务配置。"""
+    if name not in MODEL_PROFILES:
+        raise ValueError(f"未知的模型配置: {name}")
+    profile = {**MODEL_PROFILES["default"], **MODEL_PROFILES[name]}
+    profile["model"] = (
+        getenv(f"OPENAI_MODEL_{name.upper()}")
+        or profile["model"]
+        or get_openai_config()["model"]
+    )
+    return profile
+
+
+def get_summary(
+    text,
+    prompt="请用中文简明扼要地总结以下内容，限制在100字以内。",
+    max_retries=None,
+    story_id=None,
+    index=None,
+    profile="default",
+):
+    """使用 OpenAI 生成摘要，profile 决定模型、输出上限、超时和重试策略。"""
+    if not text or not text.strip():
+        return "暂无内容"
+    if not _llm_enabled:
+        return LLM_DISABLED_SUMMARY
+
+    settings = get_model_profile(profile)
+    if max_retries is None:
+        max_retries = settings["max_retries"]
+    story_info = f"[故事 {index}/{story_id}] " if story_id and index else ""
+
+    for attempt in range(max_retries):
+        if deadline.expired():
+            print(f"{story_info}超出运行时限，放弃生成摘要")
+            return "摘要生成失败（超出运行时限）"
+
+        retry_after = None
+        try:
+            print(f"{story_info}正在生成摘要，第 {attempt + 1} 次尝试...")
+
+            response = get_router().complete(
+                {
+                    "model": settings["model"],
+                    "messages": [
+                        {"role": "system", "content": prompt},
+                        {"role": "user", "content": text},
+                    ],
+                    "temperature": settings["temperature"],
+                    "max_tokens": settings["max_tokens"],
+                    "timeout": deadline.request_timeout(settings["timeout"]),
+                },
+                story_info,
+                profile,
+            )
+            return response.choices[0].message.content
+
+        except ModelUnavailable:
+            print(f"{story_info}模型服务处于熔断状态，跳过本次调用")
+            return "摘要生成失败（模型服务暂不可用）"
+
+        except deadline.DeadlineExceeded:
+            print(f"{story_info}超出运行时限，放弃生成摘要")
+            return "摘要生成失败（超出运行时限）"
+
+        except ValueError as e:
+            print(f"{story_info}配置错误: {e}")
+            return "摘要生成失败（配置错误）"
+
+        except requests.exceptions.ConnectionError as e:
+            print(f"{story_info}连接错误 (尝试 {attempt + 1}/{max_retries}):")
+            print(f"  - 错误详情: {str(e)}")
+
+        except requests.exceptions.Timeout as e:
+            print(f"{story_info}请求超时 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
+
+        except requests.exceptions.RequestException as e:
+            print(f"{story_info}请求错误 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
+
+        except Exception as e:
+            retry_after = _retry_after_seconds(e)
+            print(f"{story_info}未预期的错误 (尝试 {attempt + 1}/{max_retries}):")
+            print(f"  - 错误类型: {type(e).__name__}")
+            print(f"  - 错误详情: {str(e)}")
+            import traceback
+
+            traceback.print_exc()
+
+        if attempt < max_retries - 1:
+            sleep_time = backoff_delay(attempt, settings["retry_delay"], retry_after)
+            left = deadline.remaining()
+            if left is not None and sleep_time >= left:
+                print(f"{story_info}剩余运行时间不足以等待重试，放弃生成摘要")
+                return "摘要生成失败（超出运行时限）"
+            print(f"{story_info}等待 {sleep_time:.1f} 秒后重试...")
+            time.sleep(sleep_time)
+        else:
+            print(f"{story_info}已达到最大重试次数")
+            return "摘要生成失败（网络错误）"
+
+
+_CJK_RE = re.compile(r"[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+def estimate_tokens(text):
+    """粗略估算 token 数：中日韩字符按 1 个计，其余按 4 个字符 1 个计。"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def split_into_chunks(text, max_tokens=MAP_REDUCE_CHUNK_TOKENS):
+    """按段落把文本装进不超过 max_tokens 的块；过长的段落再按行、按字符切分。"""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            while estimate_tokens(line) > max_tokens:
+                # 按最坏情况（每个字符 1 个 token）切分
+                pieces.append(line[:max_tokens])
+                line = line[max_tokens:]
+            pieces.append(line)
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        # 块内段落以空行连接，每个分隔符按 1 个 token 计
+        tokens = estimate_tokens(piece) + 1
+        if current and current_tokens + tokens > max_tokens + 1:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        if piece.strip():
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class ChunkSummaryCache:
+    """按内容哈希缓存分块摘要，未变化的块不会重复调用模型。"""
+
+    def __init__(self, cache_file="cache/chunk_summary_cache.json", max_age_days=7):
+        self.cache_file = cache_file
+        self.max_age_days = max_age_days
+        self.cache = self._load()
+        self._lock = Lock()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+                return {
+                    key: entry
+                    for key, entry in (data if isinstance(data, dict) else {}).items()
+                    if entry.get("cache_time", "") >= cutoff
+                }
+        except (OSError, json.JSONDecodeError, AttributeError) as e:
+            print(f"加载分块摘要缓存失败: {e}")
+        return {}
+
+    @staticmethod
+    def key(chunk, prompt, profile):
+        return hashlib.sha256(f"{profile}\0{prompt}\0{chunk}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        return entry.get("summary") if entry else None
+
+    def set(self, key, summary):
+        with self._lock:
+            self.cache[key] = {"summary": summary, "cache_time": datetime.now().isoformat()}
+
+    def save(self):
+        try:
+            cache_directory = os.path.dirname(self.cache_file)
+            if cache_directory:
+                os.makedirs(cache_directory, exist_ok=True)
+            with self._lock:
+                data = dict(self.cache)
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"保存分块摘要缓存失败: {e}")
+
+
+def summarize_long(
+    text,
+    prompt,
+    story_id=None,
+    index=None,
+    profile="default",
+    cache=None,
+    threshold_tokens=MAP_REDUCE_THRESHOLD_TOKENS,
+    chunk_tokens=MAP_REDUCE_CHUNK_TOKENS,
+    max_workers=MAP_REDUCE_WORKERS,
+):
+    """对长文本做 map-reduce 摘要：分块并行提炼要点，再用 prompt 汇总为最终摘要。
+
+    短文本直接调用 get_summary。分块摘要按内容哈希缓存，失败的分块被跳过；
+    所有分块都失败时返回最后一个失败提示。
+    """
+    if not text or estimate_tokens(text) <= threshold_tokens:
+        return get_summary(text, prompt, story_id=story_id, index=index, profile=profile)
+
+    chunks = split_into_chunks(text, chunk_tokens)
+    story_info = f"[故事 {index}/{story_id}] " if story_id and index else ""
+    print(f"{story_info}内容较长，分为 {len(chunks)} 块摘要后汇总")
+
+    def summarize_chunk(chunk):
+        key = ChunkSummaryCache.key(chunk, CHUNK_PROMPT, "chunk")
+        cached = cache.get(key) if cache else None
+        if cached:
+            return cached
+        summary = get_summary(
+            chunk, CHUNK_PROMPT, story_id=story_id, index=index, profile="chunk"
+        )
+        if cache and is_summary_available(summary):
+            cache.set(key, summary)
+        return summary
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        partials = list(executor.map(summarize_chunk, chunks))
+
+    available = [summary for summary in partials if is_summary_available(summary)]
+    if not available:
+        return partials[-1]
+    combined = "\n\n".join(
+        f"[第 {number} 部分要点]\n{summary}"
+        for number, summary in enumerate(available, 1)
+    )
+    return get_summary(combined, prompt, story_id=story_id, index=index, profile=profile)
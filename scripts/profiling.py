@@ -0,0 +1,141 @@
+"""按阶段的 CPU 与内存剖析，供 --profile 使用。
+
+每个阶段用 cProfile 记录主线程的函数耗时，用 tracemalloc 记录峰值内存和新增分配最多的代码行；
+后台采样线程定期抓取所有线程的调用栈（抓取和摘要大多在线程池中执行），
+写成 flamegraph.pl、speedscope 等工具可以读取的折叠栈文件。
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+
+class StackSampler:
+    """后台线程按固定间隔采样所有线程的调用栈，按“阶段;栈帧...”累计次数。"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stage = "idle"
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stage = self.stage
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                    stack.append(f"{module}:{code.co_name}")
+                    frame = frame.f_back
+                self.counts[";".join([stage, *reversed(stack)])] += 1
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class StageProfiler:
+    """收集各阶段的剖析结果，运行结束后写入 output_dir。"""
+
+    def __init__(self, output_dir="profile", top=20, sample_interval=0.005):
+        self.output_dir = output_dir
+        self.top = top
+        self.stages = []
+        self.sampler = StackSampler(sample_interval)
+        self._started_tracemalloc = False
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        self.sampler.start()
+
+    @contextmanager
+    def stage(self, name):
+        """剖析一个阶段；阶段之间不能嵌套。"""
+        self.sampler.stage = name
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            self.sampler.stage = "idle"
+            self.stages.append(
+                {
+                    "name": name,
+                    "seconds": seconds,
+                    "peak_bytes": peak,
+                    "profile": profile,
+                    "allocations": after.compare_to(before, "lineno")[: self.top],
+                }
+            )
+
+    def stop(self):
+        """停止采样并写出报告，返回报告文件路径。"""
+        self.sampler.stop()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        self.sampler.write_collapsed(os.path.join(self.output_dir, "stacks.collapsed"))
+        report_file = os.path.join(self.output_dir, "report.txt")
+        with open(report_file, "w", encoding="utf-8") as f:
+            f.write(self._summary())
+            for stage in self.stages:
+                f.write(self._stage_report(stage))
+        for stage in self.stages:
+            file_name = stage["name"].replace(":", "_") + ".prof"
+            stage["profile"].dump_stats(os.path.join(self.output_dir, file_name))
+        print(f"剖析报告已写入 {self.output_dir}/")
+        return report_file
+
+    def _summary(self):
+        lines = ["阶段汇总（耗时从高到低）", ""]
+        for stage in sorted(self.stages, key=lambda item: -item["seconds"]):
+            lines.append(
+                f"{stage['name']:<24} {stage['seconds']:>9.3f} s"
+                f"  峰值内存 {stage['peak_bytes'] / 1024 / 1024:>8.2f} MiB"
+            )
+        return "\n".join(lines) + "\n"
+
+    def _stage_report(self, stage):
+        output = io.StringIO()
+        output.write(f"\n{'=' * 80}\n阶段 {stage['name']}: {stage['seconds']:.3f} s\n\n")
+        output.write(f"主线程耗时最多的函数（累计时间前 {self.top}）:\n")
+        stats = pstats.Stats(stage["profile"], stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        output.write(f"新增内存最多的代码行（前 {self.top}）:\n")
+        for difference in stage["allocations"]:
+            output.write(f"  {difference}\n")
+        return output.getvalue()
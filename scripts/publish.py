@@ -0,0 +1,122 @@
+"""发布目录的内容哈希清单与静态资源。
+
+public/manifest.json 记录每个输出文件的 sha256 和大小：内容不变的文件不会被重写，
+部署前后对比两份清单即可得到新增、修改和删除的文件。样式等静态资源以内容哈希命名
+（static/site.3f2a9c1d0b.css），内容变化时文件名随之变化，可以放心设置长期缓存。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+MANIFEST_FILE = "manifest.json"
+STATIC_DIR = "static"
+ASSET_HASH_LENGTH = 10
+# 支持 _headers 的静态托管（Cloudflare Pages、Netlify）据此为哈希资源设置长期缓存；
+# GitHub Pages 忽略该文件
+HEADERS_FILE = "_headers"
+HEADERS_RULES = f"/{STATIC_DIR}/*\n  Cache-Control: public, max-age=31536000, immutable\n"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_if_changed(path, content):
+    """内容与现有文件不同时才写入（先写临时文件再替换），返回是否写入。"""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory or ".", suffix=".tmp", delete=False) as f:
+        f.write(data)
+    os.replace(f.name, path)
+    return True
+
+
+def hashed_asset(source, output_dir="public"):
+    """把静态资源以内容哈希命名复制到 output_dir/static，返回页面中引用的相对路径。"""
+    with open(source, "rb") as f:
+        data = f.read()
+    stem, extension = os.path.splitext(os.path.basename(source))
+    digest = hashlib.sha256(data).hexdigest()[:ASSET_HASH_LENGTH]
+    relative = f"{STATIC_DIR}/{stem}.{digest}{extension}"
+    write_if_changed(os.path.join(output_dir, relative), data)
+    return relative
+
+
+def load_manifest(output_dir="public"):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if isinstance(manifest.get("files"), dict):
+            return manifest
+    except (OSError, json.JSONDecodeError, AttributeError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"加载发布清单失败: {e}")
+    return {"files": {}, "assets": []}
+
+
+def _prune_assets(output_dir, keep):
+    """删除不再被引用的哈希资源；上一次发布的资源保留一轮，已打开的旧页面仍能加载。"""
+    static_dir = os.path.join(output_dir, STATIC_DIR)
+    if not os.path.isdir(static_dir):
+        return
+    for name in os.listdir(static_dir):
+        relative = f"{STATIC_DIR}/{name}"
+        if relative not in keep:
+            try:
+                os.remove(os.path.join(static_dir, name))
+            except OSError as e:
+                print(f"删除旧静态资源 {relative} 失败: {e}")
+
+
+def write_manifest(output_dir="public", assets=()):
+    """清理旧资源并重写清单，打印相对上一次清单的变更；返回 (新增, 修改, 删除) 路径列表。"""
+    previous = load_manifest(output_dir)
+    _prune_assets(output_dir, set(assets) | set(previous.get("assets", [])))
+    write_if_changed(os.path.join(output_dir, HEADERS_FILE), HEADERS_RULES)
+
+    files = {}
+    for directory, _, names in os.walk(output_dir):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, output_dir).replace(os.sep, "/")
+            if relative == MANIFEST_FILE or name.endswith(".tmp"):
+                continue
+            files[relative] = {
+                "sha256": file_digest(path),
+                "size": os.path.getsize(path),
+            }
+
+    old_files = previous["files"]
+    added = sorted(path for path in files if path not in old_files)
+    modified = sorted(
+        path
+        for path in files
+        if path in old_files and files[path]["sha256"] != old_files[path]["sha256"]
+    )
+    removed = sorted(path for path in old_files if path not in files)
+    write_if_changed(
+        os.path.join(output_dir, MANIFEST_FILE),
+        json.dumps(
+            {"assets": sorted(assets), "files": dict(sorted(files.items()))},
+            ensure_ascii=False,
+            indent=1,
+        ),
+    )
+    print(
+        f"发布清单: {len(files)} 个文件，新增 {len(added)}，修改 {len(modified)}，删除 {len(removed)}"
+    )
+    return added, modified, removed
@@ -0,0 +1,17 @@
+"""运行配置：首次读取时才加载 .env，导入模块本身没有副作用。"""
+
+import functools
+import os
+
+
+@functools.cache
+def load_environment():
+    """加载 .env 中的配置，整个进程只执行一次。"""
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+
+
+def getenv(name, default=None):
+    load_environment()
+    return os.getenv(name, default)
@@ -0,0 +1,5 @@
+"""各数据来源的抓取函数，每个来源一个模块。
+
+来源模块只依赖 requests 和 scripts.sources.common，可以单独导入；
+scripts.fetch_news 负责把它们组装成 SOURCES、处理缓存和渲染页面。
+"""
@@ -0,0 +1,474 @@
+"""arXiv 金融与 AI 论文：增量抓取、论文索引和摘要翻译。"""
+
+import concurrent.futures
+import json
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+
+import requests
+
+from scripts.deadline import request_timeout
+from scripts.llm import get_summary, is_summary_available
+from scripts.sources.common import ATOM_ENTRY_TAG, REQUEST_HEADERS, iter_xml_elements
+
+ARXIV_PAPER_LIMIT = 15
+ARXIV_AI_PAPER_LIMIT = 10
+ARXIV_SEARCH_QUERY = " OR ".join(
+    f"cat:{category}"
+    for category in (
+        "q-fin.CP",
+        "q-fin.GN",
+        "q-fin.MF",
+        "q-fin.PM",
+        "q-fin.PR",
+        "q-fin.RM",
+        "q-fin.ST",
+        "q-fin.TR",
+    )
+)
+ARXIV_AI_SEARCH_QUERY = "cat:cs.AI OR cat:cs.LG OR cat:cs.CL"
+ARXIV_TRANSLATION_BATCH_SIZE = 5
+# 论文索引保留的天数和每个检索式最多保留的论文数（页面只展示最新的十几篇）
+ARXIV_INDEX_WINDOW_DAYS = 14
+ARXIV_INDEX_MAX_PAPERS = 200
+# 增量抓取向前重叠的小时数，以及分页请求的每页条数和页数上限
+ARXIV_HARVEST_OVERLAP_HOURS = 6
+ARXIV_HARVEST_MAX_RESULTS = 200  # 每页论文数
+ARXIV_HARVEST_MAX_PAGES = 10
+ARXIV_TRANSLATION_PROMPT = (
+    "请将以下 arXiv 论文摘要准确、完整地翻译成简体中文。"
+    "保留金融、数学和机器学习术语的含义，不要添加评论或改写成提纲。"
+)
+
+
+class ArxivTranslationCache:
+    """持久化 arXiv 中文摘要，避免重复调用翻译模型。"""
+
+    def __init__(self, cache_file="cache/arxiv_translation_cache.json"):
+        self.cache_file = cache_file
+        self.cache = self._load()
+        self._lock = Lock()  # 翻译批次会并发写入
+
+    def _load(self):
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                    return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"加载 arXiv 翻译缓存失败: {e}")
+        return {}
+
+    def get(self, paper_id, updated):
+        cached = self.cache.get(paper_id)
+        if cached and cached.get("updated") == updated:
+            return cached.get("summary_zh")
+        return None
+
+    def set(self, paper_id, updated, summary_zh):
+        with self._lock:
+            self.cache[paper_id] = {
+                "updated": updated,
+                "summary_zh": summary_zh,
+            }
+            try:
+                cache_directory = os.path.dirname(self.cache_file)
+                if cache_directory:
+                    os.makedirs(cache_directory, exist_ok=True)
+                with open(self.cache_file, "w", encoding="utf-8") as f:
+                    json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                print(f"保存 arXiv 翻译缓存失败: {e}")
+
+
+class ArxivPaperIndex:
+    """按检索式保存已抓取的 arXiv 论文，以及每个检索式上次增量抓取的时间。
+
+    页面从索引渲染，每次运行只向 arXiv 请求上次抓取以来的新投稿；
+    超出窗口期或超出条数上限的旧论文会被清理，索引大小保持稳定。
+    """
+
+    def __init__(
+        self,
+        index_file="cache/arxiv_index.json",
+        window_days=ARXIV_INDEX_WINDOW_DAYS,
+        max_papers=ARXIV_INDEX_MAX_PAPERS,
+    ):
+        self.index_file = index_file
+        self.window_days = window_days
+        self.max_papers = max_papers
+        self.index = self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    return {}
+                # 旧索引以带版本号的 ID 为键，同一论文的多个版本只保留最新的一个
+                for entry in data.values():
+                    stored = entry.get("papers", {})
+                    entry["papers"] = {}
+                    for paper in stored.values():
+                        self._store(entry["papers"], paper)
+                return data
+        except (OSError, json.JSONDecodeError, AttributeError) as e:
+            print(f"加载 arXiv 论文索引失败: {e}")
+        return {}
+
+    @staticmethod
+    def _store(stored, paper):
+        """以不带版本号的 ID 保存论文，同一论文以 updated 较新的版本为准。"""
+        key = arxiv_base_id(paper["id"])
+        existing = stored.get(key)
+        if existing:
+            if existing.get("updated", "") > paper.get("updated", ""):
+                return
+            # 版本未变且已有译文时保留索引中的记录
+            if existing.get("updated") == paper.get("updated") and existing.get(
+                "translation_available"
+            ):
+                return
+        stored[key] = paper
+
+    def last_harvested(self, query):
+        """返回检索式上次成功抓取的 UTC 时间，从未抓取过时返回 None。"""
+        value = self.index.get(query, {}).get("last_harvested")
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    def merge(self, query, papers, harvested_at, harvested_until=None):
+        """按论文 ID 合并新抓取的论文，清理窗口期以外和超出条数上限的旧论文。
+
+        harvested_until 为下次增量抓取的起点，默认 harvested_at；本次没有取完查询区间时
+        传入实际取到的最早投稿时间，更早的部分不再补抓。
+        """
+        entry = self.index.setdefault(query, {"papers": {}})
+        stored = entry.setdefault("papers", {})
+        for paper in papers:
+            self._store(stored, paper)
+        cutoff = (harvested_at - timedelta(days=self.window_days)).strftime("%Y-%m-%d")
+        newest = sorted(
+            stored,
+            key=lambda paper_id: (stored[paper_id].get("published", ""), paper_id),
+            reverse=True,
+        )
+        for paper_id in newest[self.max_papers :]:
+            del stored[paper_id]
+        for paper_id in [
+            paper_id
+            for paper_id, paper in stored.items()
+            if paper.get("published", "") < cutoff
+        ]:
+            del stored[paper_id]
+        entry["last_harvested"] = (harvested_until or harvested_at).isoformat()
+
+    def papers(self, query, limit=None):
+        """按投稿日期从新到旧返回索引中的论文。"""
+        papers = sorted(
+            self.index.get(query, {}).get("papers", {}).values(),
+            key=lambda paper: (paper.get("published", ""), paper["id"]),
+            reverse=True,
+        )
+        return papers[:limit] if limit else papers
+
+    def save(self):
+        try:
+            index_directory = os.path.dirname(self.index_file)
+            if index_directory:
+                os.makedirs(index_directory, exist_ok=True)
+            with open(self.index_file, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"保存 arXiv 论文索引失败: {e}")
+
+
+def _parse_arxiv_feed(response, cache, limit=None):
+    """流式解析 arXiv Atom 响应，已缓存的译文直接填入 summary_zh。"""
+    namespace = {
+        "atom": "http://www.w3.org/2005/Atom",
+        "arxiv": "http://arxiv.org/schemas/atom",
+    }
+    papers = []
+
+    for entry in iter_xml_elements(response, ATOM_ENTRY_TAG, limit):
+        entry_id = entry.findtext("atom:id", default="", namespaces=namespace)
+        paper_id = entry_id.rstrip("/").split("/")[-1]
+        updated = entry.findtext("atom:updated", default="", namespaces=namespace)
+        published = entry.findtext("atom:published", default="", namespaces=namespace)
+        abstract = " ".join(
+            entry.findtext("atom:summary", default="", namespaces=namespace).split()
+        )
+        # 未翻译的论文暂时以英文摘要作为 summary_zh，由翻译阶段替换
+        summary_zh = cache.get(paper_id, updated)
+        translation_available = bool(summary_zh)
+        if not summary_zh:
+            summary_zh = abstract
+
+        alternate_url = entry_id
+        pdf_url = ""
+        for link in entry.findall("atom:link", namespace):
+            if link.get("rel") == "alternate":
+                alternate_url = link.get("href", alternate_url)
+            elif link.get("title") == "pdf":
+                pdf_url = link.get("href", "")
+
+        primary = entry.find("arxiv:primary_category", namespace)
+        papers.append(
+            {
+                "id": paper_id,
+                "title": " ".join(
+                    entry.findtext(
+                        "atom:title", default="无标题", namespaces=namespace
+                    ).split()
+                ),
+                "url": alternate_url,
+                "html_url": f"https://arxiv.org/html/{paper_id}",
+                "pdf_url": pdf_url,
+                "authors": [
+                    author.findtext(
+                        "atom:name", default="匿名", namespaces=namespace
+                    ).strip()
+                    for author in entry.findall("atom:author", namespace)
+                ],
+                "categories": [
+                    category.get("term", "")
+                    for category in entry.findall("atom:category", namespace)
+                ],
+                "primary_category": (
+                    primary.get("term", "") if primary is not None else ""
+                ),
+                "published": published[:10],
+                "submitted": published,
+                "updated": updated,
+                "summary_zh": summary_zh,
+                "translation_available": translation_available,
+            }
+        )
+
+    return papers
+
+
+def arxiv_base_id(paper_id):
+    """去掉 arXiv ID 的版本号后缀，例如 2610.00001v2 -> 2610.00001。"""
+    return re.sub(r"v\d+$", "", paper_id)
+
+
+def _request_arxiv_papers(search_query, max_results, cache, start=0):
+    response = requests.get(
+        "https://export.arxiv.org/api/query",
+        params={
+            "search_query": search_query,
+            "start": start,
+            "max_results": max_results,
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+        },
+        headers=REQUEST_HEADERS,
+        timeout=request_timeout(30),
+        stream=True,
+    )
+    response.raise_for_status()
+    return _parse_arxiv_feed(response, cache, max_results)
+
+
+def fetch_arxiv_papers(
+    limit=ARXIV_PAPER_LIMIT,
+    cache=None,
+    search_query=ARXIV_SEARCH_QUERY,
+    translate=True,
+):
+    """获取最新 arXiv 论文并将摘要翻译为中文。
+
+    translate=False 时只解析并填入已缓存的译文，翻译交给 translate_arxiv_papers。
+    """
+    cache = cache or ArxivTranslationCache()
+    try:
+        papers = _request_arxiv_papers(search_query, limit, cache)
+        if translate:
+            translate_arxiv_papers(papers, cache)
+        return papers
+    except Exception as e:
+        print(f"获取 arXiv 论文时出错: {e}")
+        return []
+
+
+def _oldest_submission(papers):
+    """返回论文中最早的投稿时间（UTC），没有可解析的时间时返回 None。"""
+    times = []
+    for paper in papers:
+        try:
+            times.append(datetime.fromisoformat(paper.get("submitted", "")))
+        except ValueError:
+            continue
+    return min(times, default=None)
+
+
+def harvest_arxiv_papers(
+    index,
+    search_query=ARXIV_SEARCH_QUERY,
+    limit=ARXIV_PAPER_LIMIT,
+    cache=None,
+    translate=True,
+):
+    """增量抓取 arXiv 新投稿并合并进索引，返回索引中最新的 limit 篇论文。
+
+    首次抓取请求最新的投稿；之后只请求上次抓取时间（向前重叠几小时，
+    以覆盖 arXiv 延迟公布的投稿）到现在的 submittedDate 区间。区间超过页数上限时
+    抓取时间推进到已取到的最早投稿，每次运行的请求数保持不变。
+    抓取失败时不更新抓取时间，直接返回索引中已有的论文。
+    """
+    cache = cache or ArxivTranslationCache()
+    now = datetime.now(timezone.utc)
+    last_harvested = index.last_harvested(search_query)
+    query = search_query
+    if last_harvested:
+        since = last_harvested - timedelta(hours=ARXIV_HARVEST_OVERLAP_HOURS)
+        query = (
+            f"({search_query}) AND "
+            f"submittedDate:[{since:%Y%m%d%H%M} TO {now:%Y%m%d%H%M}]"
+        )
+    try:
+        new_papers = []
+        harvested_until = None
+        for page in range(ARXIV_HARVEST_MAX_PAGES if last_harvested else 1):
+            if page:
+                time.sleep(3)  # arXiv 要求请求间隔至少三秒
+            batch = _request_arxiv_papers(
+                query, ARXIV_HARVEST_MAX_RESULTS, cache, start=page * ARXIV_HARVEST_MAX_RESULTS
+            )
+            new_papers.extend(batch)
+            if len(batch) < ARXIV_HARVEST_MAX_RESULTS:
+                break
+        else:
+            # 首次抓取只取最新一页；增量区间超过页数上限时放弃更早的投稿，
+            # 下次从已取到的最早投稿继续，区间不会逐次扩大
+            if last_harvested:
+                harvested_until = _oldest_submission(new_papers) or last_harvested
+                print(
+                    f"arXiv 增量区间超过 {ARXIV_HARVEST_MAX_PAGES} 页，"
+                    f"只保留 {harvested_until:%Y-%m-%d %H:%M} 之后的投稿"
+                )
+        print(f"arXiv 增量抓取到 {len(new_papers)} 篇论文")
+        index.merge(search_query, new_papers, now, harvested_until)
+    except Exception as e:
+        print(f"增量抓取 arXiv 论文时出错，使用索引中的论文: {e}")
+
+    papers = index.papers(search_query, limit)
+    if translate:
+        translate_arxiv_papers(papers, cache)
+    return papers
+
+
+def fetch_arxiv_ai_papers(limit=ARXIV_AI_PAPER_LIMIT, cache=None, translate=True):
+    """获取 AI、机器学习和自然语言处理的最新论文。"""
+    return fetch_arxiv_papers(
+        limit=limit,
+        cache=cache,
+        search_query=ARXIV_AI_SEARCH_QUERY,
+        translate=translate,
+    )
+
+
+def _strip_code_fence(text):
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", text)
+    return text
+
+
+def _translate_arxiv_batch(batch):
+    """翻译一批摘要，返回 {论文序号: 中文摘要}；单篇时直接返回译文。"""
+    if len(batch) == 1:
+        paper = batch[0]
+        translated = get_summary(
+            paper["summary_zh"],
+            prompt=ARXIV_TRANSLATION_PROMPT,
+            story_id=paper["id"],
+            profile="translation",
+        )
+        return {0: translated} if is_summary_available(translated) else {}
+
+    source = json.dumps(
+        [
+            {"index": index, "abstract": paper["summary_zh"]}
+            for index, paper in enumerate(batch)
+        ],
+        ensure_ascii=False,
+    )
+    raw_translations = get_summary(
+        source,
+        prompt=(
+            ARXIV_TRANSLATION_PROMPT
+            + "输入是 JSON 数组，请逐项翻译 abstract 字段。严格返回 JSON 数组，格式为"
+            '[{"index":0,"translation":"中文译文"}]，不要输出代码块或其他文字。'
+        ),
+        profile="translation_batch",
+    )
+    translations = {}
+    if not is_summary_available(raw_translations):
+        return translations
+    try:
+        for item in json.loads(_strip_code_fence(raw_translations)):
+            index = int(item.get("index", -1))
+            translation = " ".join(str(item.get("translation") or "").split())
+            if 0 <= index < len(batch) and translation:
+                translations[index] = translation
+    except (TypeError, ValueError, AttributeError, json.JSONDecodeError):
+        print("批量翻译结果不是有效的 JSON，将逐篇重试")
+    return translations
+
+
+def translate_arxiv_papers(
+    papers, cache, batch_size=ARXIV_TRANSLATION_BATCH_SIZE, max_workers=3
+):
+    """把尚未翻译的摘要按批次并发翻译，结果写回论文并存入翻译缓存。
+
+    每批一次模型调用、按序号返回 JSON；批量结果中缺失的论文再逐篇翻译。
+    翻译失败的论文保留英文摘要。
+    """
+    pending = []
+    for paper in papers:
+        if paper["translation_available"]:
+            continue
+        cached = cache.get(paper["id"], paper["updated"])
+        if cached:
+            paper["summary_zh"] = cached
+            paper["translation_available"] = True
+        else:
+            pending.append(paper)
+    if not pending:
+        return
+
+    def apply(batch, translations):
+        for index, paper in enumerate(batch):
+            if index in translations:
+                paper["summary_zh"] = translations[index]
+                paper["translation_available"] = True
+                cache.set(paper["id"], paper["updated"], translations[index])
+
+    def translate(batch):
+        translations = _translate_arxiv_batch(batch)
+        apply(batch, translations)
+        if len(batch) > 1:
+            for index, paper in enumerate(batch):
+                if index not in translations:
+                    apply([paper], _translate_arxiv_batch([paper]))
+
+    batches = [
+        pending[start : start + batch_size]
+        for start in range(0, len(pending), batch_size)
+    ]
+    print(f"正在翻译 {len(pending)} 篇 arXiv 摘要，共 {len(batches)} 批")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in [executor.submit(translate, batch) for batch in batches]:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"翻译 arXiv 摘要时出错: {e}")
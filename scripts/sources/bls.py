@@ -0,0 +1,165 @@
+"""BLS 宏观指标：CPI、失业率和非农就业。"""
+
+import math
+from datetime import datetime
+
+import requests
+
+from scripts.deadline import request_timeout
+from scripts.settings import getenv
+from scripts.sources.common import REQUEST_HEADERS
+from scripts.timeseries import (
+    MonthlySeriesStore,
+    difference,
+    month_index,
+    month_label,
+    moving_average,
+    pct_change,
+    sparkline_points,
+)
+
+BLS_SERIES = {
+    "CUSR0000SA0": "美国 CPI 同比",
+    "LNS14000000": "美国失业率",
+    "CES0000000001": "美国非农就业月增量",
+}
+# 序列的展示方式：(派生指标, 单位, 说明)；未列出的序列直接显示最新值
+BLS_SERIES_DISPLAY = {
+    "CUSR0000SA0": ("yoy", "%", "同比涨幅"),
+    "LNS14000000": ("level", "%", "最新公布值"),
+    "CES0000000001": ("mom_diff", "千人", "较上月变化"),
+}
+# BLS API v2 单次请求的序列数和年份上限，注册 API key 后放宽
+BLS_BATCH_SIZE = 25
+BLS_BATCH_SIZE_WITH_KEY = 50
+BLS_MAX_YEARS = 10
+BLS_MAX_YEARS_WITH_KEY = 20
+BLS_SPARKLINE_MONTHS = 24
+
+
+def _bls_series_ids():
+    """BLS_SERIES_IDS 环境变量（逗号分隔）可以替换默认的序列列表。"""
+    configured = [
+        series_id.strip()
+        for series_id in getenv("BLS_SERIES_IDS", "").split(",")
+        if series_id.strip()
+    ]
+    return configured or list(BLS_SERIES)
+
+
+def _bls_observations(series):
+    """把 BLS 返回的月度数据转换为 (月份序号, 数值)，跳过年度均值和缺失值。"""
+    for item in series.get("data", []):
+        period = item.get("period", "")
+        if not period.startswith("M") or period == "M13":
+            continue
+        try:
+            yield month_index(item["year"], period[1:]), float(item["value"])
+        except (KeyError, TypeError, ValueError):
+            continue
+
+
+def _request_bls_series(series_ids, start_year, end_year):
+    payload = {
+        "seriesid": series_ids,
+        "startyear": str(start_year),
+        "endyear": str(end_year),
+    }
+    api_key = getenv("BLS_API_KEY")
+    if api_key:
+        payload["registrationkey"] = api_key
+    response = requests.post(
+        "https://api.bls.gov/publicAPI/v2/timeseries/data/",
+        json=payload,
+        headers={**REQUEST_HEADERS, "Content-Type": "application/json"},
+        timeout=request_timeout(30),
+    )
+    response.raise_for_status()
+    result = response.json()
+    if result.get("status") != "REQUEST_SUCCEEDED":
+        raise ValueError("; ".join(result.get("message", [])) or "BLS 请求失败")
+    return result.get("Results", {}).get("series", [])
+
+
+def update_bls_store(store, series_ids):
+    """只请求每个序列本地尚未保存的年份，按起始年份分组、每批最多 50 个序列。
+
+    已有上个月数据的序列不再请求；其余序列从本地最后一个观测值所在年份开始请求，
+    以便同时拿到 BLS 对近期数据的修订。
+    """
+    now = datetime.now()
+    current_month = month_index(now.year, now.month)
+    has_key = bool(getenv("BLS_API_KEY"))
+    max_years = BLS_MAX_YEARS_WITH_KEY if has_key else BLS_MAX_YEARS
+    batch_size = BLS_BATCH_SIZE_WITH_KEY if has_key else BLS_BATCH_SIZE
+    earliest_year = now.year - max_years + 1
+
+    pending = {}
+    for series_id in series_ids:
+        last_month = store.last_month(series_id)
+        if last_month is not None and last_month >= current_month - 1:
+            continue
+        start_year = earliest_year if last_month is None else last_month // 12
+        pending.setdefault(max(start_year, earliest_year), []).append(series_id)
+    if not pending:
+        print("BLS 本地数据已是最新，跳过请求")
+        return
+
+    for start_year, group in sorted(pending.items()):
+        for start in range(0, len(group), batch_size):
+            batch = group[start : start + batch_size]
+            print(f"正在请求 {len(batch)} 个 BLS 序列 {start_year}-{now.year} 年的数据")
+            for series in _request_bls_series(batch, start_year, now.year):
+                store.merge(series.get("seriesID"), _bls_observations(series))
+    store.save()
+
+
+def fetch_bls_market_indicators(store=None):
+    """从 BLS Public Data API 获取月度 CPI、失业率和非农就业。
+
+    完整历史保存在本地存储中，每次只补充缺失的月份；请求失败时使用已保存的数据。
+    """
+    store = store or MonthlySeriesStore()
+    series_ids = _bls_series_ids()
+    try:
+        update_bls_store(store, series_ids)
+    except Exception as e:
+        print(f"获取 BLS 市场敏感指标时出错: {e}")
+
+    indicators = []
+    for series_id in series_ids:
+        months, values = store.columns(series_id)
+        if not months:
+            continue
+        transform, unit, detail = BLS_SERIES_DISPLAY.get(
+            series_id, ("level", "", "最新公布值")
+        )
+        if transform == "yoy":
+            derived = pct_change(months, values, 12)
+            value_format = "{:.1f}"
+        elif transform == "mom_diff":
+            derived = difference(months, values, 1)
+            value_format = "{:+.0f}"
+        else:
+            derived = values
+            value_format = "{:.1f}"
+        if math.isnan(derived[-1]):
+            continue
+        average = moving_average(derived, 3)[-1]
+        history = derived[-BLS_SPARKLINE_MONTHS:]
+        indicators.append(
+            {
+                "id": series_id,
+                "name": BLS_SERIES.get(series_id, series_id),
+                "value": value_format.format(derived[-1]),
+                "unit": unit,
+                "date": month_label(months[-1]),
+                "detail": detail,
+                "moving_average": (
+                    "" if math.isnan(average) else value_format.format(average)
+                ),
+                "sparkline": sparkline_points(history),
+                "url": f"https://data.bls.gov/timeseries/{series_id}",
+            }
+        )
+    return indicators
@@ -0,0 +1,50 @@
+"""各来源共用的请求头、Atom/XML 流式解析和 JSON 编码器。"""
+
+import json
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+ATOM_ENTRY_TAG = "{http://www.w3.org/2005/Atom}entry"
+XML_STREAM_CHUNK_SIZE = 64 * 1024
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; LiveNews/1.0; +https://github.com/wayhome/livenews)"
+}
+
+
+# 创建一个自定义的JSON编码器来处理datetime对象
+class DateTimeEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+def iter_xml_elements(response, tag, limit=None, chunk_size=XML_STREAM_CHUNK_SIZE):
+    """边下载边解析 XML，依次产出标签为 tag 的元素。
+
+    调用方需要在取下一个元素前处理完当前元素：产出后元素会被清空并从父节点移除，
+    内存占用不随文档增长；取到 limit 个元素后停止读取并关闭连接。
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    count = 0
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = element
+                    continue
+                if element.tag != tag:
+                    continue
+                yield element
+                element.clear()
+                if root is not None and element in root:
+                    root.remove(element)
+                count += 1
+                if limit and count >= limit:
+                    return
+        parser.close()
+    finally:
+        response.close()
@@ -0,0 +1,172 @@
+"""GitHub Trending 仓库与热门仓库的最新 Release。"""
+
+import concurrent.futures
+import re
+
+import requests
+
+from scripts.deadline import request_timeout
+from scripts.settings import getenv
+from scripts.sources.common import REQUEST_HEADERS
+
+GITHUB_TRENDING_LIMIT = 20
+# 默认抓取的 Trending 视图，"周期:语言" 表示按语言筛选
+GITHUB_TRENDING_VIEWS = ("daily", "weekly", "monthly")
+TRENDING_PERIOD_LABELS = {"daily": "今日", "weekly": "本周", "monthly": "本月"}
+GITHUB_RELEASE_LIMIT = 10
+GITHUB_API_HEADERS = {
+    **REQUEST_HEADERS,
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
+
+
+def _github_api_headers():
+    headers = dict(GITHUB_API_HEADERS)
+    if getenv("GITHUB_TOKEN"):
+        headers["Authorization"] = f"Bearer {getenv('GITHUB_TOKEN')}"
+    return headers
+
+
+def _parse_count(text):
+    """把 "1,234" 这样的计数转换为整数，无法解析时返回 0。"""
+    digits = re.sub(r"[^\d]", "", text or "")
+    return int(digits) if digits else 0
+
+
+def _trending_views():
+    """GITHUB_TRENDING_VIEWS 形如 "daily,weekly,daily:python"，冒号后为语言。"""
+    configured = getenv("GITHUB_TRENDING_VIEWS", "")
+    views = [view.strip() for view in configured.split(",") if view.strip()]
+    return views or list(GITHUB_TRENDING_VIEWS)
+
+
+def _trending_view_label(view):
+    since, _, language = view.partition(":")
+    label = TRENDING_PERIOD_LABELS.get(since, since)
+    return f"{language} {label}" if language else label
+
+
+def _fetch_trending_view(view):
+    """抓取一个 Trending 视图，只解析仓库行，按排名返回仓库。"""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    since, _, language = view.partition(":")
+    url = "https://github.com/trending" + (f"/{language}" if language else "")
+    response = requests.get(
+        url,
+        params={"since": since},
+        headers=REQUEST_HEADERS,
+        timeout=request_timeout(20),
+    )
+    response.raise_for_status()
+    soup = BeautifulSoup(
+        response.text,
+        "html.parser",
+        parse_only=SoupStrainer("article", class_="Box-row"),
+    )
+    repositories = []
+    for article in soup.find_all("article"):
+        link = article.select_one("h2 a[href]")
+        if not link:
+            continue
+
+        path = link.get("href", "").strip()
+        description = article.select_one("p")
+        language_tag = article.select_one('[itemprop="programmingLanguage"]')
+        stars = article.select_one('a[href$="/stargazers"]')
+        forks = article.select_one('a[href$="/forks"]')
+        gained = article.find(string=re.compile(r"stars? (today|this week|this month)"))
+        repositories.append(
+            {
+                "name": re.sub(r"\s*/\s*", "/", " ".join(link.stripped_strings)),
+                "url": f"https://github.com{path}",
+                "description": (
+                    description.get_text(" ", strip=True) if description else "暂无描述"
+                ),
+                "language": (
+                    language_tag.get_text(" ", strip=True) if language_tag else "未标注"
+                ),
+                "stars": _parse_count(stars.get_text() if stars else ""),
+                "forks": _parse_count(forks.get_text() if forks else ""),
+                "stars_gained": {view: _parse_count(gained)} if gained else {},
+                "views": [view],
+            }
+        )
+    return repositories
+
+
+def fetch_github_trending(limit=GITHUB_TRENDING_LIMIT, views=None):
+    """并发抓取多个 GitHub Trending 视图，并按仓库合并。
+
+    各视图按排名轮流取仓库，同一仓库只保留一条记录，记录它出现的视图和各视图的新增星数。
+    """
+    views = views or _trending_views()
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(views)) as executor:
+        futures = {executor.submit(_fetch_trending_view, view): view for view in views}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                print(f"获取 GitHub Trending（{futures[future]}）时出错: {e}")
+
+    merged = {}
+    ranked = [results.get(view, []) for view in views]
+    for rank in range(max(map(len, ranked), default=0)):
+        for repositories in ranked:
+            if rank >= len(repositories):
+                continue
+            repository = repositories[rank]
+            existing = merged.get(repository["url"])
+            if existing is None:
+                merged[repository["url"]] = repository
+                continue
+            existing["views"].extend(repository["views"])
+            existing["stars_gained"].update(repository["stars_gained"])
+            # 不同视图抓取时间略有差异，保留较新的计数
+            existing["stars"] = max(existing["stars"], repository["stars"])
+            existing["forks"] = max(existing["forks"], repository["forks"])
+    repositories = list(merged.values())[:limit]
+    for repository in repositories:
+        # 合并时按排名轮流加入，这里恢复为配置中的视图顺序
+        repository["views"].sort(key=views.index)
+        repository["stars_gained"] = {
+            view: repository["stars_gained"][view]
+            for view in repository["views"]
+            if view in repository["stars_gained"]
+        }
+        repository["stars_gained_text"] = " · ".join(
+            f"{_trending_view_label(view)} +{count:,}"
+            for view, count in repository["stars_gained"].items()
+        ) or "暂无新增星数据"
+    return repositories
+
+
+def fetch_github_releases(repositories, limit=GITHUB_RELEASE_LIMIT):
+    """获取 Trending 仓库的最新正式版本。"""
+    releases = []
+    for repository in repositories[:limit]:
+        try:
+            response = requests.get(
+                f"https://api.github.com/repos/{repository['name']}/releases/latest",
+                headers=_github_api_headers(),
+                timeout=request_timeout(20),
+            )
+            if response.status_code == 404:
+                continue
+            response.raise_for_status()
+            release = response.json()
+            releases.append(
+                {
+                    "repository": repository["name"],
+                    "name": release.get("name") or release.get("tag_name", "未命名版本"),
+                    "tag": release.get("tag_name", ""),
+                    "url": release.get("html_url", repository["url"]),
+                    "published": release.get("published_at", "")[:10],
+                    "prerelease": release.get("prerelease", False),
+                }
+            )
+        except Exception as e:
+            print(f"获取 {repository['name']} 最新版本时出错: {e}")
+    return releases
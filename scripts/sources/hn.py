@@ -0,0 +1,754 @@
+"""Hacker News 热门故事：文章正文、评论树、链接规范化与故事缓存。"""
+
+import concurrent.futures
+import json
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from scripts.blobs import BlobStore
+from scripts.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    expired as deadline_expired,
+    remaining as deadline_remaining,
+    request_timeout,
+)
+from scripts.domain_policy import DomainPolicy
+from scripts.html_extract import (
+    ARTICLE_TEXT_LIMIT,
+    clean_comment_batch,
+    declared_charset,
+    extract_article,
+)
+from scripts.llm import (
+    ARTICLE_CALL_TOKENS,
+    ChunkSummaryCache,
+    get_openai_config,
+    is_summary_available,
+    llm_enabled,
+    summarize_long,
+)
+from scripts.sources.common import REQUEST_HEADERS, DateTimeEncoder
+
+HN_STORY_LIMIT = 30
+# 没有取得文章正文（或故事没有链接）时的文章摘要占位文本
+ARTICLE_UNAVAILABLE_SUMMARY = "无法获取文章内容"
+# 评论树：顶层评论数、最大层数、总节点数和并发抓取数
+HN_COMMENT_TOP_LEVEL = 15
+HN_COMMENT_MAX_DEPTH = 3
+HN_COMMENT_BUDGET = 40
+HN_COMMENT_WORKERS = 8
+# 规范化链接时丢弃的跟踪参数，前缀匹配以 * 结尾的条目
+TRACKING_QUERY_PARAMS = (
+    "utm_*",
+    "fbclid",
+    "gclid",
+    "mc_cid",
+    "mc_eid",
+    "ref",
+    "ref_src",
+    "ref_url",
+    "smid",
+    "cmpid",
+    "__twitter_impression",
+)
+# 目标地址写在查询参数中的跳转服务：域名 -> 参数名
+URL_REDIRECT_PARAMS = {
+    "google.com": "q",
+    "l.facebook.com": "u",
+    "lm.facebook.com": "u",
+    "out.reddit.com": "url",
+    "href.li": None,
+    "l.messenger.com": "u",
+}
+# 需要请求一次才能得知目标地址的短链服务
+URL_SHORTENERS = {"t.co", "bit.ly", "buff.ly", "ow.ly", "lnkd.in", "tinyurl.com", "goo.gl"}
+
+
+def _process_html_content(response):
+    """处理 HTML 响应内容：原始字节交给 html_extract，大页面在进程池中解析"""
+    content_type = response.headers.get("content-type", "").lower()
+    if "text/html" not in content_type:
+        print(f"跳过非HTML内容: (Content-Type: {content_type})")
+        return None
+
+    return extract_article(
+        response.content,
+        declared_charset(content_type),
+        timeout=deadline_remaining(),
+    )
+
+
+def get_article_content(url, policy=None):
+    """获取文章内容；传入 DomainPolicy 时按域名统计决定超时和是否跳过，并记录本次结果"""
+    if policy and policy.is_blocked(url):
+        print(f"跳过付费墙网站: {url}")
+        return None
+    if policy and policy.should_skip(url):
+        print(f"跳过近期多次无法获取正文的网站: {url}")
+        return None
+
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+    }
+    timeout = policy.timeout_for(url) if policy else 10
+    outcome, seconds, content = "error", None, None
+    started = time.monotonic()
+    try:
+        try:
+            response = requests.get(
+                url, headers=headers, timeout=request_timeout(timeout), allow_redirects=True
+            )
+        except requests.exceptions.SSLError:
+            print(f"SSL错误，尝试不验证证书: {url}")
+            response = requests.get(
+                url, headers=headers, timeout=request_timeout(timeout), verify=False
+            )
+        seconds = time.monotonic() - started
+        response.raise_for_status()
+        content = _process_html_content(response)
+        outcome = "content" if content else "empty"
+        return content
+
+    except requests.exceptions.Timeout as e:
+        outcome = "timeout"
+        print(f"获取文章内容超时 ({timeout:.0f} 秒): {url} ({e})")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"获取文章内容失败: {e}")
+        return None
+    except (DeadlineExceeded, concurrent.futures.TimeoutError):
+        # 运行时限用尽（包括进程池解析等待超时）不说明网站有问题，不计入统计
+        policy = None
+        return None
+    except Exception as e:
+        print(f"处理文章内容时出错: {e}")
+        return None
+    finally:
+        if policy:
+            policy.record(url, outcome, seconds)
+
+
+def _is_tracking_param(name):
+    name = name.lower()
+    return any(
+        name.startswith(pattern[:-1]) if pattern.endswith("*") else name == pattern
+        for pattern in TRACKING_QUERY_PARAMS
+    )
+
+
+def _host_matches(host, domain):
+    return host == domain or host.endswith("." + domain)
+
+
+def _resolve_shortener(url):
+    """请求短链服务获取跳转目标，失败时保留原链接。"""
+    try:
+        response = requests.head(
+            url, headers=REQUEST_HEADERS, timeout=request_timeout(5), allow_redirects=True
+        )
+        return response.url or url
+    except (requests.exceptions.RequestException, DeadlineExceeded) as e:
+        print(f"解析短链失败: {url} ({e})")
+        return url
+
+
+def canonicalize_url(url, resolve_shorteners=True):
+    """生成用于跨来源去重的规范化链接。
+
+    去掉跟踪参数、片段和 www 前缀，展开已知跳转服务，并对剩余查询参数排序；
+    http 与 https 视为同一地址。
+    """
+    if not url:
+        return ""
+    for _ in range(3):  # 跳转服务可能嵌套
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or "").lower()
+        target = None
+        for domain, param in URL_REDIRECT_PARAMS.items():
+            if _host_matches(host, domain) and (
+                domain != "google.com" or parts.path == "/url"
+            ):
+                if param is None:
+                    target = parts.query
+                else:
+                    target = dict(parse_qsl(parts.query)).get(param)
+                break
+        if not target and resolve_shorteners and host in URL_SHORTENERS:
+            resolved = _resolve_shortener(url)
+            target = resolved if resolved != url else None
+        if not target or not target.startswith(("http://", "https://")):
+            break
+        url = target
+
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking_param(name)
+        )
+    )
+    return urlunsplit(("https", host, path, query, ""))
+
+
+class LinkRegistry:
+    """单次运行内的链接登记表，同一规范化链接只抓取和摘要一次。"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = Lock()
+
+    def resolve(self, url, loader):
+        """返回规范化链接对应的结果，首次访问时调用 loader 生成。
+
+        并发线程访问同一链接时只有一个线程执行 loader，其余线程等待并复用结果。
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"lock": Lock(), "loaded": False, "value": None}
+                self._entries[key] = entry
+        with entry["lock"]:
+            if not entry["loaded"]:
+                entry["value"] = loader()
+                entry["loaded"] = True
+            else:
+                print(f"复用同一链接的抓取结果: {key}")
+            return entry["value"]
+
+
+def cross_link_stories(stories, lobsters_stories):
+    """为 HN 与 Lobsters 中指向同一原文的条目互相补充讨论链接和摘要。"""
+    hn_by_url = {}
+    for story in stories or []:
+        key = canonicalize_url(story.get("url"), resolve_shorteners=False)
+        if key:
+            hn_by_url.setdefault(key, story)
+
+    for lobsters_story in lobsters_stories or []:
+        key = canonicalize_url(lobsters_story.get("url"), resolve_shorteners=False)
+        story = hn_by_url.get(key)
+        if not story:
+            continue
+        story["lobsters_url"] = lobsters_story.get("comments_url")
+        lobsters_story["hn_comments_url"] = story.get("comments_url")
+        # 只借用真实的模型摘要，失败提示和占位文本不展示；不覆盖已有的摘要
+        summary = story.get("article_summary")
+        if (
+            is_summary_available(summary)
+            and summary != ARTICLE_UNAVAILABLE_SUMMARY
+            and not lobsters_story.get("article_summary")
+        ):
+            lobsters_story["article_summary"] = summary
+
+
+def fetch_hn_item(item_id):
+    """获取 HN 单个项目的详细信息"""
+    try:
+        response = requests.get(
+            f"https://hacker-news.firebaseio.com/v0/item/{item_id}.json",
+            timeout=request_timeout(10),
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"获取项目 {item_id} 时出错: {e}")
+        return None
+
+
+def fetch_comment_tree(
+    kids,
+    max_depth=HN_COMMENT_MAX_DEPTH,
+    budget=HN_COMMENT_BUDGET,
+    top_level=HN_COMMENT_TOP_LEVEL,
+    max_workers=HN_COMMENT_WORKERS,
+):
+    """广度优先抓取评论树，返回 [{"by", "text", "replies"}] 形式的精简树。
+
+    每一层的评论并发抓取，耗时随层数而不是评论数增长。下一层按排名在各父评论之间
+    轮流选取，直到用完 budget 个节点；已删除、被标记为 dead 或内容为空的评论
+    连同其回复一起跳过。
+    """
+    roots = []
+    level = [(comment_id, roots) for comment_id in (kids or [])[:top_level]]
+    fetched = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in range(max_depth):
+            level = level[: budget - fetched]
+            if not level:
+                break
+            items = list(executor.map(fetch_hn_item, [item_id for item_id, _ in level]))
+            fetched += len(level)
+            alive = [
+                (item, siblings)
+                for item, (_, siblings) in zip(items, level)
+                if item and not item.get("deleted") and not item.get("dead")
+            ]
+            texts = clean_comment_batch([item.get("text", "") for item, _ in alive])
+            children = []
+            for (item, siblings), text in zip(alive, texts):
+                if not text:
+                    continue
+                node = {"by": item.get("by", "匿名"), "text": text, "replies": []}
+                siblings.append(node)
+                children.append([(kid, node["replies"]) for kid in item.get("kids", [])])
+            # 按排名轮流取各父评论的回复，避免预算被第一条评论的长串回复占满
+            level = []
+            for rank in range(max(map(len, children), default=0)):
+                for replies in children:
+                    if rank < len(replies):
+                        level.append(replies[rank])
+    return roots
+
+
+def format_comment_tree(nodes, depth=0):
+    """把评论树展开为摘要输入：顶层评论之间用分隔线隔开，回复按层级缩进。"""
+    blocks = []
+    for node in nodes:
+        indent = "  " * depth + ("↳ " if depth else "")
+        lines = [f"{indent}[{node['by']}]: {node['text']}"]
+        replies = format_comment_tree(node["replies"], depth + 1)
+        if replies:
+            lines.append(replies)
+        blocks.append("\n".join(lines))
+    return ("\n\n---\n\n" if depth == 0 else "\n").join(blocks)
+
+
+def clean_html_text(html_text):
+    """清理HTML文本，返回纯文本"""
+    if not html_text:
+        return ""
+    try:
+        # 使用BeautifulSoup清理HTML
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html_text, "html.parser")
+        # 获取纯文本
+        text = soup.get_text()
+        # 清理空白字符
+        text = " ".join(text.split())
+        return text
+    except Exception as e:
+        print(f"清理HTML文本时出错: {e}")
+        return html_text
+
+
+class StoryCache:
+    """故事摘要缓存。
+
+    索引文件只保存元数据和摘要；文章正文压缩后存入按内容寻址的 BlobStore，
+    条目里只记录哈希，需要重新生成摘要时才读取。两者都放在发布目录之外，
+    抓取到的文章正文不会随站点发布。
+    """
+
+    def __init__(
+        self, cache_file="cache/story_cache.json", max_age_hours=24, blob_dir=None
+    ):
+        self.cache_file = cache_file
+        self.max_age_hours = max_age_hours
+        self.blobs = BlobStore(
+            blob_dir
+            or os.path.join(os.path.dirname(cache_file) or ".", "article_blobs")
+        )
+        self.cache = self._load_cache()
+        self._migrate_inline_articles()
+        self._clean_expired()  # 初始化时清理过期缓存
+
+    def _migrate_inline_articles(self):
+        """把旧格式中内联的文章正文移入 BlobStore，并去掉重复的顶层摘要字段。"""
+        migrated = 0
+        for story in self.cache.values():
+            if not isinstance(story, dict):
+                continue
+            if "article_content" in story:
+                content = story.pop("article_content")
+                story["article_blob"] = self.blobs.put(content) if content else None
+                migrated += 1
+            for field in ("article_summary", "comments_summary"):
+                if field in story:
+                    story.pop(field)
+                    migrated += 1
+        if migrated:
+            print("已将缓存中的文章正文迁移到压缩存储")
+            self._save_cache()
+
+    def _clean_expired(self):
+        """清理所有过期的缓存条目"""
+        now = datetime.now()
+        expired_keys = []
+
+        for story_id, story in self.cache.items():
+            try:
+                cache_time = datetime.fromisoformat(story["cache_time"])
+                if now - cache_time > timedelta(hours=self.max_age_hours):
+                    expired_keys.append(story_id)
+            except Exception as e:
+                print(f"检查缓存条目 {story_id} 时出错: {e}")
+                expired_keys.append(story_id)  # 错误的条目也清理掉
+
+        # 删除过期条目，并清理不再被引用的文章正文
+        if expired_keys:
+            print(f"清理 {len(expired_keys)} 个过期缓存条目...")
+            for key in expired_keys:
+                del self.cache[key]
+            self._save_cache()
+            self.blobs.prune(
+                {
+                    story.get("article_blob")
+                    for story in self.cache.values()
+                    if story.get("article_blob")
+                }
+            )
+
+    def _load_cache(self):
+        """加载缓存文件"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    try:
+                        return json.load(f)
+                    except json.JSONDecodeError as e:
+                        print(f"缓存文件格式错误: {e}，将创建新缓存")
+                        # 备份损坏的缓存文件
+                        backup_file = f"{self.cache_file}.bak"
+                        try:
+                            os.rename(self.cache_file, backup_file)
+                            print(f"已将损坏的缓存文件备份为: {backup_file}")
+                        except Exception as rename_err:
+                            print(f"备份损坏的缓存文件失败: {rename_err}")
+            return {}
+        except Exception as e:
+            print(f"加载缓存文件失败: {e}")
+            return {}
+
+    def _save_cache(self):
+        """保存缓存文件"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    self.cache, f, ensure_ascii=False, indent=2, cls=DateTimeEncoder
+                )
+        except Exception as e:
+            print(f"保存缓存文件失败: {e}")
+
+    def get(self, story_id):
+        """获取缓存的故事，如果评论数量增加且原数量小于20，返回需要更新摘要的标志"""
+        if str(story_id) not in self.cache:
+            return None
+
+        story = self.cache[str(story_id)]
+        try:
+            cache_time = datetime.fromisoformat(story["cache_time"])
+
+            # 检查缓存是否过期
+            if datetime.now() - cache_time > timedelta(hours=self.max_age_hours):
+                del self.cache[str(story_id)]
+                self._save_cache()
+                return None
+
+            # 转换时间格式
+            if "data" in story and isinstance(story["data"].get("time"), str):
+                story["data"]["time"] = datetime.fromisoformat(story["data"]["time"])
+
+            # 添加一个标志，表示是否需要更新评论摘要
+            story["needs_comment_update"] = False
+
+            return story
+        except Exception as e:
+            print(f"处理缓存数据出错: {e}")
+            return None
+
+    def find_article(self, url):
+        """按规范化链接查找其他故事已缓存的文章内容和摘要。"""
+        key = canonicalize_url(url, resolve_shorteners=False)
+        for story in list(self.cache.values()):
+            data = story.get("data") or {}
+            if not data.get("article_summary") or not data.get("url"):
+                continue
+            if canonicalize_url(data["url"], resolve_shorteners=False) == key:
+                return self.article_content(story), data["article_summary"]
+        return None
+
+    def article_content(self, story):
+        """读取缓存条目对应的文章正文。"""
+        return self.blobs.get(story.get("article_blob"))
+
+    def set(
+        self,
+        story_id,
+        story_data,
+        article_content=None,
+        article_summary=None,
+        comments_summary=None,
+        comments_count=0,  # 新增参数：评论数量
+    ):
+        """缓存故事数据"""
+        # 设置新数据前先清理过期缓存
+        if len(self.cache) > 100:  # 如果缓存条目过多，触发清理
+            self._clean_expired()
+
+        # 确保story_data中的时间是字符串格式
+        if isinstance(story_data.get("time"), datetime):
+            story_data["time"] = story_data["time"].isoformat()
+
+        # 摘要保存在 story_data 中，正文存入 BlobStore
+        story_data.setdefault("article_summary", article_summary)
+        story_data.setdefault("comments_summary", comments_summary)
+        self.cache[str(story_id)] = {
+            "data": story_data,
+            "article_blob": self.blobs.put(article_content) if article_content else None,
+            "comments_count": comments_count,  # 保存评论数量
+            "cache_time": datetime.now().isoformat(),
+        }
+        self._save_cache()
+
+
+def fetch_top_stories(link_registry=None):
+    """获取 HN 热门故事"""
+    link_registry = link_registry or LinkRegistry()
+    try:
+        config = get_openai_config()
+        print("\n=== 环境信息 ===")
+        print(f"OpenAI API Base: {config['api_base']}")
+        print(f"OpenAI Model: {config['model']}")
+        print(f"API Key 长度: {len(config['api_key']) if config['api_key'] else 0}")
+        print("================\n")
+
+        if not config["api_key"] and llm_enabled():
+            raise ValueError("未设置 OPENAI_API_KEY")
+
+        # 初始化缓存
+        cache = StoryCache()
+        chunk_cache = ChunkSummaryCache()
+        domain_policy = DomainPolicy()
+
+        print("开始获取热门故事...")
+        response = requests.get(
+            "https://hacker-news.firebaseio.com/v0/topstories.json",
+            timeout=request_timeout(20),
+        )
+        response.raise_for_status()
+        story_ids = response.json()[:HN_STORY_LIMIT]
+        print(f"成功获取到 {len(story_ids)} 个故事ID")
+
+        comments_prompt = """请分析以下评论，总结出主要的不同观点和讨论要点。
+要求：
+1. 识别并区分不同的观点立场
+2. 保留重要的论据和例子
+3. 注意捕捉评论之间的讨论关系，以“↳”开头并缩进的是对上一层评论的回复
+4. 如果有争议，请指出争议的焦点
+5. 用中文输出，限制在500字以内
+6. 分点列出不同观点，使用"•"作为列表符号
+
+格式示例：
+主要讨论点：[概括讨论的核心主题]
+
+不同观点：
+• [第一种观点]
+• [第二种观点]
+• [其他重要观点]
+
+补充讨论：[其他值得注意的讨论点]"""
+
+        # 使用并发处理提高效率
+        stories = []
+        story_lock = Lock()  # 用于保护stories列表的线程锁
+
+        # 定义处理单个故事的函数
+        def process_story(story_id, index):
+            try:
+                check_deadline(f"故事 {story_id}")
+                print(
+                    f"正在处理第 {index}/{len(story_ids)} 个故事 (ID: {story_id})..."
+                )
+
+                # 获取故事数据（无论是否缓存）
+                story = fetch_hn_item(story_id)
+                if not story:
+                    return None
+
+                # 获取当前评论数量
+                current_comments_count = len(story.get("kids", []))
+
+                # 检查缓存
+                cached_data = cache.get(story_id)
+
+                # 判断是否需要更新评论摘要
+                need_update_comments = False
+
+                if cached_data:
+                    # 检查评论数量是否增加且原数量小于20
+                    cached_comments_count = cached_data.get("comments_count", 0)
+                    if (
+                        cached_comments_count < 20
+                        and current_comments_count > cached_comments_count
+                    ):
+                        print(
+                            f"评论数量从 {cached_comments_count} 增加到 {current_comments_count}，将重新生成摘要"
+                        )
+                        need_update_comments = True
+                    else:
+                        print(f"使用缓存的故事数据 (ID: {story_id})")
+                        # 确保缓存中取出的数据格式正确
+                        story_data = cached_data["data"]
+                        if isinstance(story_data.get("time"), str):
+                            story_data["time"] = datetime.fromisoformat(
+                                story_data["time"]
+                            )
+                        return story_data
+
+                # 获取文章内容并生成摘要
+                article_content = None
+                article_summary = ARTICLE_UNAVAILABLE_SUMMARY
+
+                # 如果有缓存且只需更新评论，复用文章内容和摘要
+                if cached_data and need_update_comments:
+                    article_content = cache.article_content(cached_data)
+                    article_summary = cached_data["data"].get(
+                        "article_summary", ARTICLE_UNAVAILABLE_SUMMARY
+                    )
+                # 否则获取新的文章内容和摘要，同一链接在本次运行和缓存中只处理一次
+                elif "url" in story:
+
+                    def load_article():
+                        cached_article = cache.find_article(story["url"])
+                        if cached_article:
+                            print(f"[故事 {index}/{story_id}] 复用同一链接的缓存摘要")
+                            return cached_article
+                        print(f"[故事 {index}/{story_id}] 获取文章内容: {story['url']}")
+                        content = get_article_content(story["url"], domain_policy)
+                        if not content:
+                            return None, ARTICLE_UNAVAILABLE_SUMMARY
+                        # 每次调用的正文不超过原来的单次上限，更长的正文分块摘要；缓存只保存开头部分
+                        return content[:ARTICLE_TEXT_LIMIT], summarize_long(
+                            content,
+                            "请用中文简明扼要地总结这篇文章的主要内容，限制在200字以内。",
+                            story_id=story_id,
+                            index=index,
+                            profile="article",
+                            cache=chunk_cache,
+                            threshold_tokens=ARTICLE_CALL_TOKENS,
+                            chunk_tokens=ARTICLE_CALL_TOKENS,
+                        )
+
+                    article_content, article_summary = link_registry.resolve(
+                        story["url"], load_article
+                    )
+
+                # 获取评论文本 - 如果缓存需要更新或无缓存
+                comments_summary = "暂无评论"
+                if need_update_comments or not cached_data:
+                    print(f"[故事 {index}/{story_id}] 获取评论内容...")
+                    comments_text = format_comment_tree(
+                        fetch_comment_tree(story.get("kids", []))
+                    )
+                    if comments_text:
+                        comments_summary = summarize_long(
+                            comments_text,
+                            comments_prompt,
+                            story_id=story_id,
+                            index=index,
+                            profile="comments",
+                            cache=chunk_cache,
+                        )
+                else:
+                    # 使用缓存的评论摘要
+                    comments_summary = cached_data["data"].get(
+                        "comments_summary", "暂无评论"
+                    )
+
+                story_data = {
+                    "title": story.get("title", "无标题"),
+                    "url": story.get(
+                        "url", f"https://news.ycombinator.com/item?id={story_id}"
+                    ),
+                    "author": story.get("by", "匿名"),
+                    "score": story.get("score", 0),
+                    "time": datetime.fromtimestamp(story.get("time", 0)).isoformat(),
+                    "comments_count": current_comments_count,
+                    "article_summary": article_summary,
+                    "comments_summary": comments_summary,
+                    "comments_url": f"https://news.ycombinator.com/item?id={story_id}",
+                }
+
+                # 缓存新数据，包括文章内容和摘要；跳过模型或超出时限时不缓存不完整的摘要
+                if llm_enabled() and not deadline_expired():
+                    cache.set(
+                        story_id,
+                        story_data,
+                        article_content=article_content,
+                        article_summary=article_summary,
+                        comments_summary=comments_summary,
+                        comments_count=current_comments_count,  # 保存当前评论数量
+                    )
+
+                # 转换时间格式以适应模板
+                story_data["time"] = datetime.fromisoformat(story_data["time"])
+                return story_data
+
+            except Exception as e:
+                print(f"处理故事 {story_id} 时出错: {e}")
+                return None
+
+        # 使用线程池并发处理故事
+        max_workers = 5  # 最大并发数
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            # 提交所有任务
+            future_to_story = {
+                executor.submit(process_story, story_id, i + 1): (story_id, i + 1)
+                for i, story_id in enumerate(story_ids)
+            }
+
+            # 处理结果，超出运行时限后不再等待剩余故事
+            try:
+                for future in concurrent.futures.as_completed(
+                    future_to_story, timeout=deadline_remaining()
+                ):
+                    story_id, index = future_to_story[future]
+                    try:
+                        story_data = future.result()
+                        if story_data:
+                            with story_lock:
+                                stories.append(story_data)
+                    except Exception as e:
+                        print(f"获取故事 {story_id} 的结果时出错: {e}")
+            except concurrent.futures.TimeoutError:
+                unfinished = sum(not future.done() for future in future_to_story)
+                print(f"超出运行时限，放弃 {unfinished} 个未完成的故事")
+        finally:
+            # 取消尚未开始的任务；进行中的请求受剩余预算限制，会很快结束
+            executor.shutdown(wait=False, cancel_futures=True)
+            domain_policy.save()
+            chunk_cache.save()
+
+        # 按原始顺序排序故事
+        stories.sort(
+            key=lambda x: story_ids.index(int(x["comments_url"].split("=")[-1]))
+        )
+
+        return stories
+    except Exception as e:
+        print(f"获取热门故事时出错: {e}")
+        return []
@@ -0,0 +1,226 @@
+"""Polymarket 金融与 AI 相关预测市场。"""
+
+import json
+
+import requests
+
+from scripts.deadline import request_timeout
+from scripts.llm import get_summary
+from scripts.sources.common import REQUEST_HEADERS
+
+POLYMARKET_LIMIT = 10
+POLYMARKET_CONTRACT_LIMIT = 3
+POLYMARKET_CRYPTO_MAX_SHARE = 0.2
+POLYMARKET_TAGS = {
+    "120": "金融",
+    "225": "宏观经济",
+    "21": "加密市场",
+    "439": "AI",
+}
+
+
+def _json_list(value):
+    if isinstance(value, list):
+        return value
+    try:
+        return json.loads(value or "[]")
+    except (TypeError, json.JSONDecodeError):
+        return []
+
+
+def _safe_float(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _polymarket_outcomes(market):
+    names = _json_list(market.get("outcomes"))
+    prices = _json_list(market.get("outcomePrices"))
+    labels = {"yes": "会", "no": "不会"}
+    return [
+        {
+            "name": str(name),
+            "label": labels.get(str(name).lower(), str(name)),
+            "probability": round(_safe_float(price) * 100, 1),
+        }
+        for name, price in zip(names, prices)
+    ]
+
+
+def _select_polymarket_contracts(event):
+    """选择最有信息量的具体合约，避免只展示事件标题中的填空。"""
+    contracts = []
+    seen_questions = set()
+    for market in event.get("markets", []):
+        if not market.get("active", True) or market.get("closed", False):
+            continue
+        question = " ".join(str(market.get("question") or "").split())
+        outcomes = _polymarket_outcomes(market)
+        if not question or not outcomes or question in seen_questions:
+            continue
+        seen_questions.add(question)
+        yes_probability = next(
+            (
+                outcome["probability"]
+                for outcome in outcomes
+                if outcome["name"].lower() == "yes"
+            ),
+            None,
+        )
+        contracts.append(
+            {
+                "question": question,
+                "outcomes": outcomes,
+                "volume_24h": round(_safe_float(market.get("volume24hr"))),
+                "distance_from_even": (
+                    abs(yes_probability - 50) if yes_probability is not None else 50
+                ),
+            }
+        )
+
+    contracts.sort(
+        key=lambda contract: (
+            contract["distance_from_even"],
+            -contract["volume_24h"],
+        )
+    )
+    for contract in contracts:
+        contract.pop("distance_from_even", None)
+    return contracts[:POLYMARKET_CONTRACT_LIMIT]
+
+
+def _select_polymarket_events(markets, limit):
+    """优先覆盖金融、宏观和 AI，并限制加密事件占比。"""
+    ranked = sorted(markets, key=lambda market: market["volume_24h"], reverse=True)
+    crypto_limit = max(1, int(limit * POLYMARKET_CRYPTO_MAX_SHARE))
+    selected = []
+    selected_ids = set()
+    crypto_count = 0
+
+    def add(market):
+        nonlocal crypto_count
+        market_id = market["id"]
+        is_crypto = "加密市场" in market["topics"]
+        if market_id in selected_ids or (is_crypto and crypto_count >= crypto_limit):
+            return False
+        selected.append(market)
+        selected_ids.add(market_id)
+        crypto_count += int(is_crypto)
+        return True
+
+    for topic in ("金融", "宏观经济", "AI"):
+        for market in ranked:
+            if topic in market["topics"] and add(market):
+                break
+
+    for market in ranked:
+        if len(selected) >= limit:
+            break
+        add(market)
+    return selected[:limit]
+
+
+def _summarize_polymarket_events(markets):
+    """一次模型调用批量生成事件说明，失败时保留确定性说明。"""
+    source = json.dumps(
+        [
+            {
+                "index": index,
+                "event": market["question"],
+                "contracts": [
+                    contract["question"] for contract in market["contracts"]
+                ],
+                "end_date": market["end_date"],
+            }
+            for index, market in enumerate(markets)
+        ],
+        ensure_ascii=False,
+    )
+    raw_summaries = get_summary(
+        source,
+        prompt=(
+            "请逐项把以下 Polymarket 事件改写成一句不超过60字的简体中文说明。"
+            "必须明确标的、判断条件和日期；只根据输入翻译和概括，不补充事实、"
+            "不预测结果、不复述概率。严格返回 JSON 数组，格式为"
+            '[{"index":0,"summary":"中文说明"}]，不要输出代码块或其他文字。'
+        ),
+        profile="polymarket",
+    )
+    summaries = {}
+    try:
+        for item in json.loads(raw_summaries):
+            index = int(item.get("index", -1))
+            summary = " ".join(str(item.get("summary") or "").split())
+            if 0 <= index < len(markets) and summary:
+                summaries[index] = summary
+    except (TypeError, ValueError, json.JSONDecodeError):
+        pass
+
+    fallback = "以下为该事件中交易活跃、概率较具参考性的具体合约。"
+    for index, market in enumerate(markets):
+        market["summary_zh"] = summaries.get(index, fallback)
+
+
+def fetch_polymarket_markets(limit=POLYMARKET_LIMIT):
+    """获取 Polymarket 金融、宏观、加密市场和 AI 活跃事件。"""
+    events = {}
+    for tag_id, topic in POLYMARKET_TAGS.items():
+        try:
+            response = requests.get(
+                "https://gamma-api.polymarket.com/events",
+                params={
+                    "active": "true",
+                    "closed": "false",
+                    "limit": limit,
+                    "order": "volume24hr",
+                    "ascending": "false",
+                    "tag_id": tag_id,
+                },
+                headers=REQUEST_HEADERS,
+                timeout=request_timeout(20),
+            )
+            response.raise_for_status()
+            for event in response.json():
+                event_id = str(event.get("id") or event.get("slug", ""))
+                if not event_id:
+                    continue
+                if event_id in events:
+                    events[event_id]["topics"].add(topic)
+                else:
+                    events[event_id] = {"data": event, "topics": {topic}}
+        except Exception as e:
+            print(f"获取 Polymarket {topic} 事件时出错: {e}")
+
+    markets = []
+    for item in events.values():
+        try:
+            event = item["data"]
+            active_markets = [
+                market
+                for market in event.get("markets", [])
+                if market.get("active", True) and not market.get("closed", False)
+            ]
+            contracts = _select_polymarket_contracts(event)
+            if not contracts:
+                continue
+            markets.append(
+                {
+                    "id": str(event.get("id") or event.get("slug", "")),
+                    "question": event.get("title", "未命名事件"),
+                    "url": f"https://polymarket.com/event/{event.get('slug', '')}",
+                    "topics": sorted(item["topics"]),
+                    "contracts": contracts,
+                    "outcomes": contracts[0]["outcomes"],
+                    "volume_24h": round(_safe_float(event.get("volume24hr"))),
+                    "liquidity": round(_safe_float(event.get("liquidity"))),
+                    "end_date": (event.get("endDate") or "")[:10],
+                }
+            )
+        except Exception as e:
+            print(f"处理 Polymarket 事件时出错: {e}")
+    selected = _select_polymarket_events(markets, limit)
+    if selected:
+        _summarize_polymarket_events(selected)
+    return selected
@@ -0,0 +1,60 @@
+"""Product Hunt 每日产品（Atom 订阅源）。"""
+
+import requests
+
+from scripts.deadline import request_timeout
+from scripts.sources.common import ATOM_ENTRY_TAG, REQUEST_HEADERS, iter_xml_elements
+
+PRODUCT_HUNT_LIMIT = 20
+
+
+def fetch_product_hunt(limit=PRODUCT_HUNT_LIMIT):
+    """从 Product Hunt 官方 Atom feed 获取热门产品。"""
+    from bs4 import BeautifulSoup
+
+    try:
+        response = requests.get(
+            "https://www.producthunt.com/feed",
+            headers=REQUEST_HEADERS,
+            timeout=request_timeout(20),
+            stream=True,
+        )
+        response.raise_for_status()
+        namespace = {"atom": "http://www.w3.org/2005/Atom"}
+        products = []
+
+        for entry in iter_xml_elements(response, ATOM_ENTRY_TAG, limit):
+            title = entry.findtext("atom:title", default="无标题", namespaces=namespace)
+            author = entry.findtext(
+                "atom:author/atom:name", default="匿名", namespaces=namespace
+            )
+            published = entry.findtext(
+                "atom:published", default="", namespaces=namespace
+            )
+            content = entry.findtext("atom:content", default="", namespaces=namespace)
+            content_soup = BeautifulSoup(content, "html.parser")
+            description = content_soup.find("p")
+            alternate_link = entry.find("atom:link[@rel='alternate']", namespace)
+
+            products.append(
+                {
+                    "name": title.strip(),
+                    "url": (
+                        alternate_link.get("href", "https://www.producthunt.com")
+                        if alternate_link is not None
+                        else "https://www.producthunt.com"
+                    ),
+                    "description": (
+                        description.get_text(" ", strip=True)
+                        if description
+                        else "暂无描述"
+                    ),
+                    "maker": author.strip(),
+                    "published": published[:10],
+                }
+            )
+
+        return products
+    except Exception as e:
+        print(f"获取 Product Hunt 时出错: {e}")
+        return []
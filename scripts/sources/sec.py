@@ -0,0 +1,61 @@
+"""SEC EDGAR 自选股公告。"""
+
+import time
+
+import requests
+
+from scripts.deadline import request_timeout
+from scripts.settings import getenv
+
+SEC_FILING_LIMIT = 10
+SEC_WATCHLIST = {
+    "AAPL": "0000320193",
+    "MSFT": "0000789019",
+    "NVDA": "0001045810",
+}
+SEC_DEFAULT_USER_AGENT = "livenews/1.0 wayhome@users.noreply.github.com"
+
+
+def _sec_request_headers():
+    return {
+        "User-Agent": getenv("SEC_USER_AGENT") or SEC_DEFAULT_USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+    }
+
+
+def fetch_sec_filings(limit=SEC_FILING_LIMIT):
+    """获取自选美股公司的最新 10-K、10-Q 和 8-K 公告。"""
+    filings = []
+    for index, (ticker, cik) in enumerate(SEC_WATCHLIST.items()):
+        try:
+            if index:
+                time.sleep(0.11)
+            response = requests.get(
+                f"https://data.sec.gov/submissions/CIK{cik}.json",
+                headers=_sec_request_headers(),
+                timeout=request_timeout(20),
+            )
+            response.raise_for_status()
+            recent = response.json().get("filings", {}).get("recent", {})
+            for index, form in enumerate(recent.get("form", [])):
+                if form not in {"8-K", "10-K", "10-Q"}:
+                    continue
+                accession = recent["accessionNumber"][index]
+                document = recent["primaryDocument"][index]
+                accession_path = accession.replace("-", "")
+                filings.append(
+                    {
+                        "ticker": ticker,
+                        "company": response.json().get("name", ticker),
+                        "form": form,
+                        "date": recent["filingDate"][index],
+                        "description": recent.get("primaryDocDescription", [""] * len(recent["form"]))[index],
+                        "url": (
+                            "https://www.sec.gov/Archives/edgar/data/"
+                            f"{int(cik)}/{accession_path}/{document}"
+                        ),
+                    }
+                )
+        except Exception as e:
+            print(f"获取 SEC 公告 {ticker} 时出错: {e}")
+    return sorted(filings, key=lambda filing: filing["date"], reverse=True)[:limit]
@@ -0,0 +1,158 @@
+"""美国财政部日度国债收益率曲线与期限利差。"""
+
+import math
+from array import array
+from datetime import datetime
+
+import requests
+
+from scripts.deadline import request_timeout
+from scripts.sources.common import ATOM_ENTRY_TAG, REQUEST_HEADERS, iter_xml_elements
+from scripts.timeseries import DailyCurveStore, month_index, sparkline_points
+
+# 财政部日度收益率曲线的期限字段
+TREASURY_TENORS = (
+    "BC_1MONTH",
+    "BC_1_5MONTH",
+    "BC_2MONTH",
+    "BC_3MONTH",
+    "BC_4MONTH",
+    "BC_6MONTH",
+    "BC_1YEAR",
+    "BC_2YEAR",
+    "BC_3YEAR",
+    "BC_5YEAR",
+    "BC_7YEAR",
+    "BC_10YEAR",
+    "BC_20YEAR",
+    "BC_30YEAR",
+)
+# (名称, (长端期限, 短端期限或 None), 单位, 说明)；有短端期限时输出两者之差
+TREASURY_INDICATORS = (
+    ("2 年期美债收益率", ("BC_2YEAR", None), "%", "政策利率预期"),
+    ("10 年期美债收益率", ("BC_10YEAR", None), "%", "长期折现率"),
+    ("10Y−2Y 期限利差", ("BC_10YEAR", "BC_2YEAR"), "百分点", "收益率曲线斜率"),
+    ("10Y−3M 期限利差", ("BC_10YEAR", "BC_3MONTH"), "百分点", "衰退预警指标"),
+    ("30Y−5Y 期限利差", ("BC_30YEAR", "BC_5YEAR"), "百分点", "长端期限溢价"),
+)
+TREASURY_MAX_BACKFILL_MONTHS = 12
+TREASURY_SPARKLINE_DAYS = 60
+
+
+def _treasury_months_to_fetch(last_date, today):
+    """返回需要请求的月份（YYYYMM）：从本地最后一个交易日所在月份到本月。
+
+    本地没有数据时同时请求上个月，月初（包括一月初跨年时）也有足够的历史。
+    """
+    current_month = month_index(today.year, today.month)
+    if last_date is None:
+        first_month = current_month - 1
+    else:
+        first_month = max(
+            month_index(last_date.year, last_date.month),
+            current_month - TREASURY_MAX_BACKFILL_MONTHS + 1,
+        )
+    return [
+        f"{month // 12}{month % 12 + 1:02d}"
+        for month in range(first_month, current_month + 1)
+    ]
+
+
+def _request_treasury_month(month):
+    """流式解析一个月的日度收益率曲线，逐行产出 (交易日, {期限: 收益率})。"""
+    response = requests.get(
+        "https://home.treasury.gov/resource-center/data-chart-center/interest-rates/pages/xml",
+        params={
+            "data": "daily_treasury_yield_curve",
+            "field_tdr_date_value_month": month,
+        },
+        headers=REQUEST_HEADERS,
+        timeout=request_timeout(30),
+        stream=True,
+    )
+    response.raise_for_status()
+    namespace = {
+        "atom": "http://www.w3.org/2005/Atom",
+        "d": "http://schemas.microsoft.com/ado/2007/08/dataservices",
+        "m": "http://schemas.microsoft.com/ado/2007/08/dataservices/metadata",
+    }
+    rows = []
+    for entry in iter_xml_elements(response, ATOM_ENTRY_TAG):
+        properties = entry.find("atom:content/m:properties", namespace)
+        if properties is None:
+            continue
+        day = properties.findtext("d:NEW_DATE", default="", namespaces=namespace)[:10]
+        curve = {}
+        for field in properties:
+            tenor = field.tag.rsplit("}", 1)[-1]
+            if tenor in TREASURY_TENORS and field.text:
+                curve[tenor] = float(field.text)
+        if day and curve:
+            rows.append((datetime.strptime(day, "%Y-%m-%d").date(), curve))
+    return rows
+
+
+def update_treasury_store(store):
+    """只请求本地缺失的月份并合并进收益率曲线存储。
+
+    某个月请求失败时停止（之后的月份留到下次，避免中间出现缺口），
+    已合并的月份仍然保存。
+    """
+    try:
+        for month in _treasury_months_to_fetch(store.last_date(), datetime.now().date()):
+            print(f"正在获取 {month} 的美债收益率曲线")
+            try:
+                rows = _request_treasury_month(month)
+            except Exception as e:
+                print(f"获取 {month} 的美债收益率曲线失败，下次继续: {e}")
+                break
+            store.merge(rows)
+    finally:
+        store.save()
+
+
+def fetch_treasury_yields(store=None):
+    """从美国财政部获取收益率曲线，输出关键期限收益率、期限利差和日变动。
+
+    完整的日度曲线保存在本地存储中，每次只请求缺失的月份；
+    请求失败时用已保存的历史计算。
+    """
+    store = store or DailyCurveStore()
+    try:
+        update_treasury_store(store)
+    except Exception as e:
+        print(f"获取美国国债收益率时出错: {e}")
+
+    if not store.dates:
+        return []
+    date = store.last_date().isoformat()
+    source_url = "https://home.treasury.gov/resource-center/data-chart-center/interest-rates/TextView"
+    yields = []
+    for name, (long_tenor, short_tenor), unit, detail in TREASURY_INDICATORS:
+        column = store.column(long_tenor)
+        if short_tenor:
+            column = array(
+                "d",
+                (
+                    long - short
+                    for long, short in zip(column, store.column(short_tenor))
+                ),
+            )
+        value = column[-1]
+        if math.isnan(value):
+            continue
+        change = column[-1] - column[-2] if len(column) > 1 else math.nan
+        if not math.isnan(change):
+            detail = f"{detail} · 日变动 {change:+.2f}"
+        yields.append(
+            {
+                "name": name,
+                "value": f"{value:+.2f}" if short_tenor else f"{value:.2f}",
+                "unit": unit,
+                "date": date,
+                "detail": detail,
+                "sparkline": sparkline_points(column[-TREASURY_SPARKLINE_DAYS:]),
+                "url": source_url,
+            }
+        )
+    return yields
@@ -0,0 +1,215 @@
+"""本地时间序列存储与派生指标。
+
+月度序列按列保存：月份序号（year * 12 + month - 1）和数值各是一个 array；
+收益率曲线按交易日保存，每个期限一列。派生指标对整段历史逐列计算，缺失值为 NaN。
+"""
+
+import json
+import math
+import os
+from array import array
+from datetime import date
+from itertools import accumulate
+
+NAN = float("nan")
+
+
+def month_index(year, month):
+    return int(year) * 12 + int(month) - 1
+
+
+def month_label(index):
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+class MonthlySeriesStore:
+    """持久化月度观测值，只保存原始数据，派生指标每次从完整历史重新计算。"""
+
+    def __init__(self, store_file="cache/bls_series.json"):
+        self.store_file = store_file
+        self.series = self._load()
+
+    def _load(self):
+        series = {}
+        try:
+            if os.path.exists(self.store_file):
+                with open(self.store_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for series_id, columns in (data if isinstance(data, dict) else {}).items():
+                    series[series_id] = (
+                        array("l", columns.get("months", [])),
+                        array("d", columns.get("values", [])),
+                    )
+        except (OSError, json.JSONDecodeError, TypeError, ValueError) as e:
+            print(f"加载时间序列存储失败: {e}")
+        return series
+
+    def columns(self, series_id):
+        """返回 (月份列, 数值列)，序列不存在时返回两个空 array。"""
+        return self.series.get(series_id, (array("l"), array("d")))
+
+    def last_month(self, series_id):
+        months, _ = self.columns(series_id)
+        return months[-1] if months else None
+
+    def merge(self, series_id, observations):
+        """合并 (月份序号, 数值) 观测值，同一月份以新数据为准（BLS 会修订历史值）。"""
+        months, values = self.columns(series_id)
+        merged = dict(zip(months, values))
+        merged.update(observations)
+        ordered = sorted(merged)
+        self.series[series_id] = (
+            array("l", ordered),
+            array("d", (merged[month] for month in ordered)),
+        )
+
+    def save(self):
+        try:
+            store_directory = os.path.dirname(self.store_file)
+            if store_directory:
+                os.makedirs(store_directory, exist_ok=True)
+            with open(self.store_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        series_id: {"months": list(months), "values": list(values)}
+                        for series_id, (months, values) in self.series.items()
+                    },
+                    f,
+                )
+        except OSError as e:
+            print(f"保存时间序列存储失败: {e}")
+
+
+def _lagged(months, values, lag):
+    """按月份对齐的滞后列：第 i 项是 months[i] - lag 月的值，缺失时为 NaN。"""
+    position = {month: i for i, month in enumerate(months)}
+    return array(
+        "d",
+        (
+            values[position[month - lag]] if month - lag in position else NAN
+            for month in months
+        ),
+    )
+
+
+def pct_change(months, values, lag=12):
+    """相对 lag 个月前的百分比变化；lag=12 即同比。"""
+    return array(
+        "d",
+        (
+            (value / previous - 1) * 100 if previous else NAN
+            for value, previous in zip(values, _lagged(months, values, lag))
+        ),
+    )
+
+
+def difference(months, values, lag=1):
+    """相对 lag 个月前的差值；lag=1 即环比变化量。"""
+    return array(
+        "d",
+        (
+            value - previous
+            for value, previous in zip(values, _lagged(months, values, lag))
+        ),
+    )
+
+
+def moving_average(values, window):
+    """窗口内的简单移动平均，跳过 NaN；前 window - 1 项或窗口内全为 NaN 时为 NaN。
+
+    同比、环比等派生列开头是 NaN，按有效值的累加和与计数计算，整列仍为 O(n)。
+    """
+    finite = [not math.isnan(value) for value in values]
+    sums = array(
+        "d", accumulate((value if ok else 0.0 for value, ok in zip(values, finite)), initial=0.0)
+    )
+    counts = array("l", accumulate(finite, initial=0))
+    result = array("d")
+    for i in range(len(values)):
+        if i + 1 < window:
+            result.append(NAN)
+            continue
+        count = counts[i + 1] - counts[i + 1 - window]
+        result.append((sums[i + 1] - sums[i + 1 - window]) / count if count else NAN)
+    return result
+
+
+def sparkline_points(values, width=100, height=24):
+    """把数值列转换为 SVG polyline 的 points，NaN 会被跳过。"""
+    points = [(i, value) for i, value in enumerate(values) if not math.isnan(value)]
+    if len(points) < 2:
+        return ""
+    low = min(value for _, value in points)
+    high = max(value for _, value in points)
+    span = (high - low) or 1.0
+    step = width / (len(values) - 1)
+    return " ".join(
+        f"{i * step:.1f},{height - (value - low) / span * height:.1f}"
+        for i, value in points
+    )
+
+
+class DailyCurveStore:
+    """按交易日保存收益率曲线：日期列（date.toordinal()）加每个期限一列，缺失为 NaN。"""
+
+    def __init__(self, store_file="cache/treasury_curve.json"):
+        self.store_file = store_file
+        self.dates = array("l")
+        self.tenors = {}
+        self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.store_file):
+                with open(self.store_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.dates = array("l", data.get("dates", []))
+                self.tenors = {
+                    tenor: array("d", (NAN if value is None else value for value in values))
+                    for tenor, values in data.get("tenors", {}).items()
+                }
+        except (OSError, json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+            print(f"加载收益率曲线存储失败: {e}")
+            self.dates, self.tenors = array("l"), {}
+
+    def last_date(self):
+        return date.fromordinal(self.dates[-1]) if self.dates else None
+
+    def column(self, tenor):
+        """与 dates 对齐的期限列，从未出现过的期限整列为 NaN。"""
+        return self.tenors.get(tenor, array("d", [NAN] * len(self.dates)))
+
+    def merge(self, rows):
+        """合并 (交易日, {期限: 收益率}) 行，同一交易日以新数据为准。"""
+        merged = {
+            day: {tenor: values[i] for tenor, values in self.tenors.items()}
+            for i, day in enumerate(self.dates)
+        }
+        for day, curve in rows:
+            merged.setdefault(day.toordinal(), {}).update(curve)
+        ordered = sorted(merged)
+        tenors = {tenor for curve in merged.values() for tenor in curve}
+        self.dates = array("l", ordered)
+        self.tenors = {
+            tenor: array("d", (merged[day].get(tenor, NAN) for day in ordered))
+            for tenor in sorted(tenors)
+        }
+
+    def save(self):
+        try:
+            store_directory = os.path.dirname(self.store_file)
+            if store_directory:
+                os.makedirs(store_directory, exist_ok=True)
+            with open(self.store_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "dates": list(self.dates),
+                        "tenors": {
+                            tenor: [None if math.isnan(value) else value for value in values]
+                            for tenor, values in self.tenors.items()
+                        },
+                    },
+                    f,
+                )
+        except OSError as e:
+            print(f"保存收益率曲线存储失败: {e}")
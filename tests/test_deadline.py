@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+import pytest
+
+from scripts.deadline import (
+    DeadlineExceeded,
+    clear_run_deadline,
+    expired,
+    remaining,
+    request_timeout,
+    start_run_deadline,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_deadline():
+    yield
+    clear_run_deadline()
+
+
+def test_request_timeout_is_capped_by_remaining_budget():
+    clock = [100.0]
+    with patch("time.monotonic", side_effect=lambda: clock[0]):
+        start_run_deadline(15)
+        assert request_timeout(30) == 15
+        clock[0] = 110.0
+        assert request_timeout(30) == 5
+        assert request_timeout(3) == 3
+        clock[0] = 116.0
+        assert expired()
+        with pytest.raises(DeadlineExceeded):
+            request_timeout(30, "测试请求")
+
+
+def test_no_deadline_keeps_default_timeouts():
+    start_run_deadline(None)
+    assert remaining() is None
+    assert not expired()
+    assert request_timeout(20) == 20
@@ -0,0 +1,125 @@
+import concurrent.futures
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from scripts.domain_policy import (
+    DEFAULT_TIMEOUT,
+    MIN_TIMEOUT,
+    PROBE_INTERVAL_HOURS,
+    DomainPolicy,
+    domain_of,
+)
+from scripts.sources.hn import get_article_content
+
+
+class _Clock:
+    def __init__(self):
+        self.value = 1_000_000.0
+
+    def __call__(self):
+        return self.value
+
+
+def test_domain_of_strips_www_and_case():
+    assert domain_of("https://WWW.Example.com/a?b=1") == "example.com"
+    assert domain_of("https://blog.example.com/") == "blog.example.com"
+    assert domain_of("not a url") == ""
+
+
+def test_timeout_tightens_with_latency_samples(tmp_path):
+    policy = DomainPolicy(str(tmp_path / "stats.json"))
+    url = "https://fast.example/post"
+
+    assert policy.timeout_for(url) == DEFAULT_TIMEOUT
+    for seconds in (0.5, 0.6, 0.7, 0.8, 2.0):
+        policy.record(url, "content", seconds)
+
+    assert policy.timeout_for(url) == 4.0
+    policy.record("https://instant.example/", "content", 0.01)
+    assert policy.timeout_for("https://instant.example/") == DEFAULT_TIMEOUT
+    for _ in range(5):
+        policy.record("https://instant.example/", "content", 0.01)
+    assert policy.timeout_for("https://instant.example/") == MIN_TIMEOUT
+
+
+def test_skips_failing_domain_until_probe_interval(tmp_path):
+    clock = _Clock()
+    policy = DomainPolicy(str(tmp_path / "stats.json"), now=clock)
+    url = "https://paywall.example/article"
+
+    for outcome in ("empty", "timeout", "error"):
+        policy.record(url, outcome)
+    assert not policy.should_skip(url)
+    policy.record(url, "empty", 0.3)
+    assert policy.should_skip(url)
+
+    clock.value += PROBE_INTERVAL_HOURS * 3600
+    assert not policy.should_skip(url)
+    policy.record(url, "content", 0.3)
+    assert not policy.should_skip(url)
+
+
+def test_stats_persist_across_runs(tmp_path):
+    stats_file = str(tmp_path / "stats.json")
+    policy = DomainPolicy(stats_file)
+    policy.record("https://example.com/a", "content", 1.0)
+    policy.record("https://example.com/b", "timeout")
+    policy.save()
+
+    stats = DomainPolicy(stats_file).stats("example.com")
+
+    assert stats["attempts"] == 2
+    assert stats["content_rate"] == 0.5
+    assert stats["success_rate"] == 0.5
+    assert stats["p90"] == 1.0
+
+
+def test_get_article_content_records_outcomes_and_skips(tmp_path):
+    policy = DomainPolicy(str(tmp_path / "stats.json"))
+    url = "https://slow.example/post"
+
+    with patch("requests.get", side_effect=requests.exceptions.Timeout("slow")) as get:
+        for _ in range(4):
+            assert get_article_content(url, policy) is None
+        assert get_article_content(url, policy) is None
+
+    assert get.call_count == 4
+    assert policy.stats("slow.example")["attempts"] == 4
+
+    body = b"<html><body><article>" + b"Readable article text. " * 10 + b"</article></body></html>"
+    response = MagicMock(headers={"content-type": "text/html"}, content=body)
+    with patch("requests.get", return_value=response) as get:
+        assert get_article_content("https://ok.example/", policy).startswith("Readable")
+
+    assert get.call_args.kwargs["timeout"] == DEFAULT_TIMEOUT
+    assert policy.stats("ok.example")["content_rate"] == 1.0
+
+
+def test_known_paywalls_are_always_skipped(tmp_path):
+    policy = DomainPolicy(str(tmp_path / "stats.json"))
+
+    with patch("requests.get") as get:
+        assert get_article_content("https://www.nytimes.com/2026/story.html", policy) is None
+        assert get_article_content("https://markets.ft.com/data", policy) is None
+
+    get.assert_not_called()
+    assert policy.should_skip("https://wsj.com/articles/x")
+    assert not policy.should_skip("https://notft.com/")
+    assert policy.stats("nytimes.com")["attempts"] == 0
+
+
+def test_pool_parse_timeout_is_not_recorded(tmp_path):
+    policy = DomainPolicy(str(tmp_path / "stats.json"))
+    response = MagicMock(headers={"content-type": "text/html"}, content=b"<html></html>")
+
+    with (
+        patch("requests.get", return_value=response),
+        patch(
+            "scripts.sources.hn.extract_article",
+            side_effect=concurrent.futures.TimeoutError(),
+        ),
+    ):
+        assert get_article_content("https://good.example/", policy) is None
+
+    assert policy.stats("good.example")["attempts"] == 0
@@ -0,0 +1,118 @@
+import json
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from unittest.mock import patch
+
+from scripts.feeds import (
+    ATOM_NAMESPACE,
+    FEED_MAX_ITEMS,
+    merge_items,
+    site_url,
+    write_feed,
+    write_feeds,
+)
+
+
+def _story(story_id, summary="文章摘要"):
+    return {
+        "title": f"Story {story_id}",
+        "url": f"https://example.com/{story_id}",
+        "author": "alice",
+        "time": datetime(2026, 10, 1, 8, 0),
+        "article_summary": summary,
+        "comments_summary": "评论摘要",
+        "comments_url": f"https://news.ycombinator.com/item?id={story_id}",
+    }
+
+
+def _read(feed_dir, name):
+    with open(os.path.join(feed_dir, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_merge_items_prepends_new_ids_and_caps_length():
+    existing = [{"id": str(i)} for i in range(FEED_MAX_ITEMS)]
+    items, added = merge_items(existing, [{"id": "new"}, {"id": "0"}, {"id": "new"}])
+
+    assert added == 1
+    assert [item["id"] for item in items[:2]] == ["new", "0"]
+    assert len(items) == FEED_MAX_ITEMS
+
+
+def test_write_feeds_appends_only_new_items(tmp_path):
+    feed_dir = str(tmp_path / "feeds")
+    write_feeds({"stories": [_story(1), _story(2, "摘要生成失败（网络错误）")]}, feed_dir)
+
+    first = _read(feed_dir, "hn")
+    assert [item["id"] for item in first["items"]] == [
+        "https://news.ycombinator.com/item?id=1"
+    ]
+    assert first["items"][0]["date_published"].startswith("2026-10-01T08:00:00")
+
+    json_path = os.path.join(feed_dir, "hn.json")
+    modified = os.path.getmtime(json_path)
+    os.utime(json_path, (modified - 100, modified - 100))
+    write_feeds({"stories": [_story(1, "更新后的摘要")]}, feed_dir)
+    assert os.path.getmtime(json_path) == modified - 100
+
+    write_feeds({"stories": [_story(3), _story(1)]}, feed_dir)
+    items = _read(feed_dir, "hn")["items"]
+    assert [item["id"][-1] for item in items] == ["3", "1"]
+    assert items[1]["content_text"].startswith("文章摘要：文章摘要")
+
+
+def test_write_feed_emits_valid_atom(tmp_path):
+    feed_dir = str(tmp_path / "feeds")
+    paper = {
+        "id": "2610.00001v2",
+        "title": "Paper & <Title>",
+        "url": "https://arxiv.org/abs/2610.00001v2",
+        "authors": ["Researcher"],
+        "categories": ["q-fin.TR"],
+        "published": "2026-10-01",
+        "summary_zh": "中文摘要",
+        "translation_available": True,
+    }
+    write_feeds({"arxiv_papers": [paper, {**paper, "id": "x", "translation_available": False}]}, feed_dir)
+
+    root = ET.parse(os.path.join(feed_dir, "arxiv.xml")).getroot()
+    entries = root.findall(f"{{{ATOM_NAMESPACE}}}entry")
+    assert len(entries) == 1
+    assert entries[0].findtext(f"{{{ATOM_NAMESPACE}}}id") == "https://arxiv.org/abs/2610.00001"
+    assert entries[0].findtext(f"{{{ATOM_NAMESPACE}}}title") == "Paper & <Title>"
+    assert write_feed("arxiv", "arXiv", [], feed_dir) == 0
+
+
+def test_site_url_prefers_setting_then_github_pages():
+    with patch.dict(os.environ, {"SITE_URL": "https://news.example", "GITHUB_REPOSITORY": "a/b"}):
+        assert site_url() == "https://news.example/"
+    with patch.dict(os.environ, {"SITE_URL": "", "GITHUB_REPOSITORY": "Wayhome/livenews"}):
+        assert site_url() == "https://wayhome.github.io/livenews/"
+
+
+def test_feeds_have_feed_level_author_and_absolute_links(tmp_path):
+    feed_dir = str(tmp_path / "feeds")
+    filing = {
+        "ticker": "AAPL",
+        "company": "Apple Inc.",
+        "form": "8-K",
+        "date": "2026-10-01",
+        "description": "Current report",
+        "url": "https://www.sec.gov/example",
+    }
+    with patch.dict(os.environ, {"SITE_URL": "https://news.example/"}):
+        write_feeds({"sec_filings": [filing]}, feed_dir)
+
+    root = ET.parse(os.path.join(feed_dir, "sec.xml")).getroot()
+    atom = f"{{{ATOM_NAMESPACE}}}"
+    assert root.find(f"{atom}author/{atom}name").text == "LiveNews"
+    links = {link.get("rel"): link.get("href") for link in root.findall(f"{atom}link")}
+    assert links == {
+        "alternate": "https://news.example/",
+        "self": "https://news.example/feeds/sec.xml",
+    }
+    feed = _read(feed_dir, "sec")
+    assert feed["home_page_url"] == "https://news.example/"
+    assert feed["feed_url"] == "https://news.example/feeds/sec.json"
@@ -1,8 +1,14 @@
+import json
 import os
-from datetime import datetime, timedelta
+import shutil
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 
 # 在导入模块前先模拟环境变量
 os.environ["OPENAI_API_KEY"] = "test_key"
@@ -10,29 +16,52 @@ os.environ["OPENAI_API_BASE"] = "https://api.test.com/v1"
 os.environ["OPENAI_MODEL"] = "test-model"
 
 # 导入要测试的模块
+from scripts.domain_policy import DomainPolicy
 from scripts.fetch_news import (
+    SourceCache,
+    fetch_source,
+    generate_html,
+    main,
+    run_daemon,
+    save_snapshot,
+)
+from scripts.sources.arxiv import (
     ARXIV_AI_SEARCH_QUERY,
     ARXIV_PAPER_LIMIT,
     ARXIV_SEARCH_QUERY,
+    ArxivPaperIndex,
     ArxivTranslationCache,
+    fetch_arxiv_ai_papers,
+    fetch_arxiv_papers,
+    harvest_arxiv_papers,
+    translate_arxiv_papers,
+)
+from scripts.sources.bls import fetch_bls_market_indicators
+from scripts.sources.common import ATOM_ENTRY_TAG, iter_xml_elements
+from scripts.sources.github import fetch_github_releases, fetch_github_trending
+from scripts.sources.hn import (
     HN_STORY_LIMIT,
+    LinkRegistry,
     StoryCache,
     _process_html_content,
+    canonicalize_url,
     clean_html_text,
-    fetch_arxiv_ai_papers,
-    fetch_arxiv_papers,
-    fetch_github_releases,
-    fetch_github_trending,
-    fetch_lobsters,
-    fetch_polymarket_markets,
-    fetch_product_hunt,
-    fetch_bls_market_indicators,
-    fetch_sec_filings,
-    fetch_treasury_yields,
-    generate_html,
+    cross_link_stories,
+    fetch_comment_tree,
+    format_comment_tree,
     get_article_content,
-    main,
 )
+from scripts.sources.lobsters import fetch_lobsters
+from scripts.sources.polymarket import fetch_polymarket_markets
+from scripts.sources.product_hunt import fetch_product_hunt
+from scripts.sources.sec import fetch_sec_filings
+from scripts.sources.treasury import (
+    _treasury_months_to_fetch,
+    fetch_treasury_yields,
+    update_treasury_store,
+)
+from scripts.llm import set_llm_enabled
+from scripts.timeseries import DailyCurveStore, MonthlySeriesStore
 
 # 测试数据
 MOCK_STORY = {
@@ -54,15 +83,20 @@ MOCK_STORY = {
 }
 
 
+def _streamed_response(body, chunk_size=64):
+    """模拟 stream=True 的响应，按小块返回内容以覆盖增量解析。"""
+    response = MagicMock(content=body)
+    response.iter_content.side_effect = lambda **kwargs: iter(
+        [body[start : start + chunk_size] for start in range(0, len(body), chunk_size)]
+    )
+    response.raise_for_status.return_value = None
+    return response
+
+
 @pytest.fixture
-def cache():
-    """创建临时缓存文件"""
-    cache_file = "tests/test_cache.json"
-    cache = StoryCache(cache_file=cache_file)
-    yield cache
-    # 清理测试文件
-    if os.path.exists(cache_file):
-        os.remove(cache_file)
+def cache(tmp_path):
+    """创建临时缓存文件，文章正文写入同目录下的 article_blobs"""
+    return StoryCache(cache_file=str(tmp_path / "test_cache.json"))
 
 
 @pytest.fixture(autouse=True)
@@ -114,29 +148,31 @@ def test_clean_html_text():
 
 
 @pytest.mark.parametrize(
-    "url,expected",
+    "url,expected,requested",
     [
-        ("https://example.com", None),  # 模拟请求失败
-        ("https://nytimes.com", None),  # 测试付费墙网站
+        ("https://example.com", None, True),  # 模拟请求失败
+        ("https://nytimes.com", None, False),  # 付费墙网站直接跳过，不发请求
     ],
 )
-def test_get_article_content(url, expected):
+def test_get_article_content(tmp_path, url, expected, requested):
     """测试文章内容获取"""
+    policy = DomainPolicy(str(tmp_path / "domain_stats.json"))
     with patch("requests.get") as mock_get:
         mock_get.return_value = MagicMock(
             status_code=200,
             headers={"content-type": "text/html"},
-            text="<html><body>Test content</body></html>",
+            content=b"<html><body>Test content</body></html>",
         )
-        result = get_article_content(url)
+        result = get_article_content(url, policy)
         assert result == expected
+        assert mock_get.called is requested
 
 
 def test_process_html_content():
     """测试HTML内容处理"""
     mock_response = MagicMock(
         headers={"content-type": "text/html"},
-        text="""
+        content=b"""
         <html>
             <body>
                 <article>
@@ -156,7 +192,7 @@ def test_process_html_content():
 def test_process_html_content_non_html():
     """测试非HTML内容处理"""
     mock_response = MagicMock(
-        headers={"content-type": "application/pdf"}, text="Test content"
+        headers={"content-type": "application/pdf"}, content=b"Test content"
     )
     result = _process_html_content(mock_response)
     assert result is None
@@ -177,36 +213,99 @@ def test_arxiv_is_limited_to_15_papers():
     assert ARXIV_PAPER_LIMIT == 15
 
 
-def test_fetch_github_trending():
-    html = """
+def _trending_row(name, stars, gained, period="today"):
+    return f"""
     <article class="Box-row">
-      <h2><a href="/octocat/hello-world">octocat   /\n hello-world</a></h2>
+      <h2><a href="/{name}">{name.replace("/", "   /\n ")}</a></h2>
       <p>A friendly repository</p>
       <span itemprop="programmingLanguage">Python</span>
-      <a href="/octocat/hello-world/stargazers">1,234</a>
-      <a href="/octocat/hello-world/forks">56</a>
-      <span>321 stars today</span>
+      <a href="/{name}/stargazers">{stars}</a>
+      <a href="/{name}/forks">56</a>
+      <span>{gained} stars {period}</span>
     </article>
     """
+
+
+def test_fetch_github_trending():
+    html = "<html><body><nav>ignored</nav>" + _trending_row("octocat/hello-world", "1,234", "321") + "</body></html>"
     response = MagicMock(text=html)
     response.raise_for_status.return_value = None
 
-    with patch("requests.get", return_value=response):
-        repositories = fetch_github_trending(limit=1)
+    with patch("requests.get", return_value=response) as mock_get:
+        repositories = fetch_github_trending(limit=1, views=["daily"])
 
+    assert mock_get.call_args.args[0] == "https://github.com/trending"
+    assert mock_get.call_args.kwargs["params"] == {"since": "daily"}
     assert repositories == [
         {
             "name": "octocat/hello-world",
             "url": "https://github.com/octocat/hello-world",
             "description": "A friendly repository",
             "language": "Python",
-            "stars": "1,234",
-            "forks": "56",
-            "stars_today": "321 stars today",
+            "stars": 1234,
+            "forks": 56,
+            "stars_gained": {"daily": 321},
+            "views": ["daily"],
+            "stars_gained_text": "今日 +321",
         }
     ]
 
 
+def test_fetch_github_trending_merges_views():
+    pages = {
+        ("https://github.com/trending", "daily"): _trending_row("a/one", "100", "10")
+        + _trending_row("b/two", "200", "20"),
+        ("https://github.com/trending", "weekly"): _trending_row("b/two", "1,205", "900", "this week")
+        + _trending_row("c/three", "300", "30", "this week"),
+        ("https://github.com/trending/rust", "daily"): "",
+    }
+
+    def get(url, params, **kwargs):
+        response = MagicMock(text=pages[(url, params["since"])])
+        response.raise_for_status.return_value = None
+        return response
+
+    with patch("requests.get", side_effect=get):
+        repositories = fetch_github_trending(views=["daily", "weekly", "daily:rust"])
+
+    assert [repository["name"] for repository in repositories] == ["a/one", "b/two", "c/three"]
+    merged = repositories[1]
+    assert merged["views"] == ["daily", "weekly"]
+    assert merged["stars"] == 1205
+    assert merged["stars_gained_text"] == "今日 +20 · 本周 +900"
+
+
+def test_fetch_comment_tree_walks_replies_within_budget():
+    items = {
+        1: {"id": 1, "by": "alice", "text": "Top <i>one</i>", "kids": [11, 12, 13]},
+        2: {"id": 2, "deleted": True, "kids": [21]},
+        3: {"id": 3, "by": "carol", "text": "Top three", "kids": [31]},
+        11: {"id": 11, "by": "dave", "text": "Reply &gt; one", "kids": [111]},
+        12: {"id": 12, "by": "erin", "text": "Reply two"},
+        13: {"id": 13, "by": "frank", "text": "Reply three"},
+        31: {"id": 31, "by": "grace", "dead": True, "kids": [311]},
+        111: {"id": 111, "by": "heidi", "text": "Too deep"},
+    }
+    requested = []
+
+    def fetch(item_id):
+        requested.append(item_id)
+        return items.get(item_id)
+
+    with patch("scripts.sources.hn.fetch_hn_item", side_effect=fetch):
+        tree = fetch_comment_tree([1, 2, 3], max_depth=2, budget=6)
+
+    # 已删除和 dead 的评论不会抓取其回复；第二层按排名轮流选取，预算用完即停
+    assert sorted(requested) == [1, 2, 3, 11, 12, 31]
+    assert [node["by"] for node in tree] == ["alice", "carol"]
+    assert [reply["text"] for reply in tree[0]["replies"]] == ["Reply > one", "Reply two"]
+    assert tree[1]["replies"] == []
+    assert format_comment_tree(tree) == (
+        "[alice]: Top one\n  ↳ [dave]: Reply > one\n  ↳ [erin]: Reply two"
+        "\n\n---\n\n[carol]: Top three"
+    )
+
+
 def test_fetch_product_hunt():
     feed = """<?xml version="1.0" encoding="UTF-8"?>
     <feed xmlns="http://www.w3.org/2005/Atom">
@@ -218,8 +317,7 @@ def test_fetch_product_hunt():
         <author><name>A Maker</name></author>
       </entry>
     </feed>"""
-    response = MagicMock(content=feed.encode())
-    response.raise_for_status.return_value = None
+    response = _streamed_response(feed.encode())
 
     with patch("requests.get", return_value=response):
         products = fetch_product_hunt(limit=1)
@@ -304,7 +402,7 @@ def test_fetch_github_releases_skips_repositories_without_releases():
     ]
 
 
-def test_fetch_bls_market_indicators_calculates_market_sensitive_values():
+def test_fetch_bls_market_indicators_calculates_market_sensitive_values(tmp_path):
     response = MagicMock()
     response.raise_for_status.return_value = None
     response.json.return_value = {
@@ -318,14 +416,68 @@ def test_fetch_bls_market_indicators_calculates_market_sensitive_values():
         },
     }
 
+    store = MonthlySeriesStore(store_file=str(tmp_path / "bls_series.json"))
+
     with patch("requests.post", return_value=response):
-        indicators = fetch_bls_market_indicators()
+        indicators = fetch_bls_market_indicators(store=store)
 
     assert [indicator["value"] for indicator in indicators] == ["2.9", "4.2", "+150"]
     assert indicators[2]["unit"] == "千人"
+    assert MonthlySeriesStore(store_file=store.store_file).last_month("LNS14000000") == (
+        2026 * 12 + 6
+    )
+
+
+def test_fetch_bls_market_indicators_requests_only_missing_periods(tmp_path):
+    now = datetime.now()
+    current_month = now.year * 12 + now.month - 1
+    store = MonthlySeriesStore(store_file=str(tmp_path / "bls_series.json"))
+    store.merge("CUSR0000SA0", [(current_month - 13, 300.0), (current_month - 1, 309.0)])
+    store.merge("LNS14000000", [(current_month - 1, 4.1)])
+    store.merge("CES0000000001", [(current_month - 26, 158000.0)])
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {
+        "status": "REQUEST_SUCCEEDED",
+        "Results": {
+            "series": [
+                {
+                    "seriesID": "CES0000000001",
+                    "data": [
+                        {"year": str(now.year), "period": "M13", "value": "1"},
+                        {
+                            "year": str((current_month - 3) // 12),
+                            "period": f"M{(current_month - 3) % 12 + 1:02d}",
+                            "value": "158850",
+                        },
+                        {
+                            "year": str((current_month - 2) // 12),
+                            "period": f"M{(current_month - 2) % 12 + 1:02d}",
+                            "value": "158900",
+                        },
+                        {
+                            "year": str((current_month - 1) // 12),
+                            "period": f"M{(current_month - 1) % 12 + 1:02d}",
+                            "value": "159000",
+                        },
+                    ],
+                }
+            ]
+        },
+    }
+
+    with patch("requests.post", return_value=response) as post:
+        indicators = fetch_bls_market_indicators(store=store)
 
+    post.assert_called_once()
+    assert post.call_args.kwargs["json"]["seriesid"] == ["CES0000000001"]
+    assert post.call_args.kwargs["json"]["startyear"] == str((current_month - 26) // 12)
+    assert [indicator["value"] for indicator in indicators] == ["3.0", "4.1", "+100"]
+    assert indicators[2]["sparkline"]
+    assert indicators[2]["moving_average"] == "+75"
 
-def test_fetch_treasury_yields_calculates_curve_spread():
+
+def test_fetch_treasury_yields_calculates_curve_spread(tmp_path):
     feed = """<feed xmlns="http://www.w3.org/2005/Atom"
       xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices"
       xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata">
@@ -334,15 +486,104 @@ def test_fetch_treasury_yields_calculates_curve_spread():
         <d:BC_2YEAR>4.20</d:BC_2YEAR><d:BC_10YEAR>4.68</d:BC_10YEAR>
       </m:properties></content></entry>
     </feed>"""
-    response = MagicMock(content=feed.encode())
-    response.raise_for_status.return_value = None
+    response = _streamed_response(feed.encode())
+
+    store = DailyCurveStore(store_file=str(tmp_path / "treasury_curve.json"))
 
     with patch("requests.get", return_value=response):
-        yields = fetch_treasury_yields()
+        yields = fetch_treasury_yields(store=store)
 
     assert [item["value"] for item in yields] == ["4.20", "4.68", "+0.48"]
 
 
+def test_iter_xml_elements_stops_at_limit_and_clears_entries():
+    entries = "".join(
+        f"<entry><title>Item {index}</title></entry>" for index in range(100)
+    )
+    response = _streamed_response(
+        f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'.encode(),
+        chunk_size=32,
+    )
+    chunks = response.iter_content()
+    response.iter_content.side_effect = lambda **kwargs: chunks
+
+    seen = []
+    for entry in iter_xml_elements(response, ATOM_ENTRY_TAG, limit=2):
+        seen.append(entry.findtext("{http://www.w3.org/2005/Atom}title"))
+        last_entry = entry
+
+    assert seen == ["Item 0", "Item 1"]
+    assert len(last_entry) == 0
+    assert next(chunks, None) is not None
+    response.close.assert_called_once()
+
+
+def test_fetch_treasury_yields_keeps_latest_row_from_stream(tmp_path):
+    rows = "".join(
+        f"""<entry><content type="application/xml"><m:properties>
+        <d:NEW_DATE>2026-08-{day:02d}T00:00:00</d:NEW_DATE>
+        <d:BC_2YEAR>4.{day:02d}</d:BC_2YEAR><d:BC_10YEAR>4.50</d:BC_10YEAR>
+      </m:properties></content></entry>"""
+        for day in (3, 12, 7)
+    )
+    feed = f"""<feed xmlns="http://www.w3.org/2005/Atom"
+      xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices"
+      xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata">{rows}</feed>"""
+
+    store = DailyCurveStore(store_file=str(tmp_path / "treasury_curve.json"))
+
+    with patch("requests.get", return_value=_streamed_response(feed.encode())) as mock_get:
+        yields = fetch_treasury_yields(store=store)
+
+    assert mock_get.call_args.kwargs["stream"] is True
+    assert [item["value"] for item in yields] == ["4.12", "4.50", "+0.38"]
+    assert yields[0]["date"] == "2026-08-12"
+    assert yields[0]["detail"] == "政策利率预期 · 日变动 +0.05"
+
+
+def test_treasury_months_to_fetch_handles_year_rollover():
+    assert _treasury_months_to_fetch(None, date(2027, 1, 2)) == ["202612", "202701"]
+    assert _treasury_months_to_fetch(date(2026, 12, 31), date(2027, 1, 5)) == [
+        "202612",
+        "202701",
+    ]
+    assert _treasury_months_to_fetch(date(2027, 1, 4), date(2027, 1, 5)) == ["202701"]
+
+
+def test_update_treasury_store_saves_months_merged_before_a_failure(tmp_path):
+    store = DailyCurveStore(store_file=str(tmp_path / "treasury_curve.json"))
+    rows = [(date(2026, 9, 30), {"BC_2YEAR": 3.50, "BC_10YEAR": 4.10})]
+
+    with patch(
+        "scripts.sources.treasury._request_treasury_month",
+        side_effect=[rows, requests.exceptions.ConnectionError("down"), rows],
+    ) as request:
+        update_treasury_store(store)
+
+    # 失败的月份之后不再请求，已合并的月份已写入文件
+    assert request.call_count == 2
+    reloaded = DailyCurveStore(store_file=store.store_file)
+    assert reloaded.last_date() == date(2026, 9, 30)
+
+
+def test_fetch_treasury_yields_derives_spreads_from_local_history(tmp_path):
+    store = DailyCurveStore(store_file=str(tmp_path / "treasury_curve.json"))
+    store.merge(
+        [
+            (date(2026, 10, 15), {"BC_3MONTH": 4.00, "BC_2YEAR": 3.50, "BC_5YEAR": 3.60, "BC_10YEAR": 4.10, "BC_30YEAR": 4.60}),
+            (date(2026, 10, 16), {"BC_3MONTH": 3.95, "BC_2YEAR": 3.55, "BC_5YEAR": 3.62, "BC_10YEAR": 4.20, "BC_30YEAR": 4.70}),
+        ]
+    )
+
+    with patch("requests.get", side_effect=requests.exceptions.ConnectionError("down")):
+        yields = fetch_treasury_yields(store=store)
+
+    assert [item["name"][:7] for item in yields[3:]] == ["10Y−3M ", "30Y−5Y "]
+    assert [item["value"] for item in yields] == ["3.55", "4.20", "+0.65", "+0.25", "+1.08"]
+    assert yields[3]["detail"].endswith("日变动 +0.15")
+    assert yields[3]["sparkline"]
+
+
 def test_fetch_sec_filings_filters_forms_and_sorts():
     response = MagicMock()
     response.raise_for_status.return_value = None
@@ -360,7 +601,7 @@ def test_fetch_sec_filings_filters_forms_and_sorts():
     }
 
     with (
-        patch.dict("scripts.fetch_news.SEC_WATCHLIST", {"EX": "0000000001"}, clear=True),
+        patch.dict("scripts.sources.sec.SEC_WATCHLIST", {"EX": "0000000001"}, clear=True),
         patch("requests.get", return_value=response),
     ):
         filings = fetch_sec_filings()
@@ -393,10 +634,10 @@ def test_fetch_polymarket_markets_parses_outcomes():
     ]
 
     with (
-        patch.dict("scripts.fetch_news.POLYMARKET_TAGS", {"120": "金融"}, clear=True),
+        patch.dict("scripts.sources.polymarket.POLYMARKET_TAGS", {"120": "金融"}, clear=True),
         patch("requests.get", return_value=response) as request,
         patch(
-            "scripts.fetch_news.get_summary",
+            "scripts.sources.polymarket.get_summary",
             return_value='[{"index": 0, "summary": "该事件是否会发生。"}]',
         ),
     ):
@@ -443,10 +684,10 @@ def test_fetch_polymarket_markets_keeps_concrete_contract_questions():
     ]
 
     with (
-        patch.dict("scripts.fetch_news.POLYMARKET_TAGS", {"21": "加密市场"}, clear=True),
+        patch.dict("scripts.sources.polymarket.POLYMARKET_TAGS", {"21": "加密市场"}, clear=True),
         patch("requests.get", return_value=response),
         patch(
-            "scripts.fetch_news.get_summary",
+            "scripts.sources.polymarket.get_summary",
             return_value=(
                 '[{"index": 0, "summary": '
                 '"比特币在 8 月 14 日能否站上不同价格关口。"}]'
@@ -497,13 +738,13 @@ def test_fetch_polymarket_markets_caps_crypto_at_twenty_percent():
 
     with (
         patch.dict(
-            "scripts.fetch_news.POLYMARKET_TAGS",
+            "scripts.sources.polymarket.POLYMARKET_TAGS",
             {"120": "金融", "225": "宏观经济", "439": "AI", "21": "加密市场"},
             clear=True,
         ),
         patch("requests.get", side_effect=responses),
         patch(
-            "scripts.fetch_news.get_summary",
+            "scripts.sources.polymarket.get_summary",
             return_value="[]",
         ),
     ):
@@ -552,12 +793,12 @@ def test_fetch_polymarket_markets_deduplicates_topics_and_prioritizes_coverage()
 
     with (
         patch.dict(
-            "scripts.fetch_news.POLYMARKET_TAGS",
+            "scripts.sources.polymarket.POLYMARKET_TAGS",
             {"120": "金融", "439": "AI", "21": "加密市场"},
             clear=True,
         ),
         patch("requests.get", side_effect=responses),
-        patch("scripts.fetch_news.get_summary", return_value="[]"),
+        patch("scripts.sources.polymarket.get_summary", return_value="[]"),
     ):
         markets = fetch_polymarket_markets(limit=10)
 
@@ -585,13 +826,12 @@ def test_fetch_arxiv_papers_translates_and_caches_abstract(tmp_path):
         <author><name>Bob Quant</name></author>
       </entry>
     </feed>"""
-    response = MagicMock(content=feed.encode())
-    response.raise_for_status.return_value = None
+    response = _streamed_response(feed.encode())
     cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
 
     with (
         patch("requests.get", return_value=response) as mock_get,
-        patch("scripts.fetch_news.get_summary", return_value="中文量化交易摘要") as translate,
+        patch("scripts.sources.arxiv.get_summary", return_value="中文量化交易摘要") as translate,
     ):
         papers = fetch_arxiv_papers(limit=1, cache=cache)
         cached_papers = fetch_arxiv_papers(limit=1, cache=cache)
@@ -608,6 +848,7 @@ def test_fetch_arxiv_papers_translates_and_caches_abstract(tmp_path):
             "categories": ["q-fin.TR"],
             "primary_category": "q-fin.TR",
             "published": "2026-08-13",
+            "submitted": "2026-08-13T10:00:00Z",
             "updated": "2026-08-13T10:00:00Z",
             "summary_zh": "中文量化交易摘要",
             "translation_available": True,
@@ -632,14 +873,13 @@ def test_fetch_arxiv_papers_falls_back_to_english_abstract(tmp_path):
         <arxiv:primary_category term="q-fin.TR" />
       </entry>
     </feed>"""
-    response = MagicMock(content=feed.encode())
-    response.raise_for_status.return_value = None
+    response = _streamed_response(feed.encode())
     cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
 
     with (
         patch("requests.get", return_value=response),
         patch(
-            "scripts.fetch_news.get_summary",
+            "scripts.sources.arxiv.get_summary",
             return_value="摘要生成失败（网络错误）",
         ),
     ):
@@ -652,7 +892,7 @@ def test_fetch_arxiv_papers_falls_back_to_english_abstract(tmp_path):
 
 def test_fetch_arxiv_ai_papers_uses_ai_categories(tmp_path):
     cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
-    with patch("scripts.fetch_news.fetch_arxiv_papers", return_value=[]) as fetch:
+    with patch("scripts.sources.arxiv.fetch_arxiv_papers", return_value=[]) as fetch:
         fetch_arxiv_ai_papers(limit=3, cache=cache)
 
     assert "cat:cs.AI" in ARXIV_AI_SEARCH_QUERY
@@ -660,21 +900,205 @@ def test_fetch_arxiv_ai_papers_uses_ai_categories(tmp_path):
         limit=3,
         cache=cache,
         search_query=ARXIV_AI_SEARCH_QUERY,
+        translate=True,
     )
 
 
-def test_generate_html_renders_topic_tabs_and_sources(tmp_path, monkeypatch):
-    template = os.path.join(os.path.dirname(__file__), "..", "templates", "index.html")
-    templates_dir = tmp_path / "templates"
-    templates_dir.mkdir()
-    (templates_dir / "index.html").write_text(
-        open(template, encoding="utf-8").read(), encoding="utf-8"
+def _arxiv_feed(*entries):
+    body = "".join(
+        f"""
+      <entry>
+        <id>http://arxiv.org/abs/{paper_id}</id>
+        <title>Paper {paper_id}</title>
+        <summary>Abstract {paper_id}</summary>
+        <published>{published}T10:00:00Z</published>
+        <updated>{published}T10:00:00Z</updated>
+        <arxiv:primary_category term="q-fin.TR" />
+      </entry>"""
+        for paper_id, published in entries
+    )
+    return _streamed_response(
+        (
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            f'xmlns:arxiv="http://arxiv.org/schemas/atom">{body}</feed>'
+        ).encode()
+    )
+
+
+def test_harvest_arxiv_papers_requests_only_new_submissions(tmp_path):
+    today = datetime.now().date()
+    recent = str(today - timedelta(days=1))
+    expired = str(today - timedelta(days=30))
+    cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
+    index_file = str(tmp_path / "arxiv_index.json")
+    index = ArxivPaperIndex(index_file=index_file)
+
+    with patch(
+        "requests.get",
+        side_effect=[
+            _arxiv_feed(("2601.00001v1", recent), ("2601.00000v1", expired)),
+            _arxiv_feed(("2601.00002v1", str(today)), ("2601.00001v1", recent)),
+        ],
+    ) as mock_get:
+        first = harvest_arxiv_papers(index, "cat:q-fin.TR", cache=cache, translate=False)
+        index.save()
+        index = ArxivPaperIndex(index_file=index_file)
+        second = harvest_arxiv_papers(index, "cat:q-fin.TR", cache=cache, translate=False)
+
+    assert [paper["id"] for paper in first] == ["2601.00001v1"]
+    assert [paper["id"] for paper in second] == ["2601.00002v1", "2601.00001v1"]
+    assert mock_get.call_args_list[0].kwargs["params"]["search_query"] == "cat:q-fin.TR"
+    incremental_query = mock_get.call_args_list[1].kwargs["params"]["search_query"]
+    assert incremental_query.startswith("(cat:q-fin.TR) AND submittedDate:[")
+    assert index.last_harvested("cat:q-fin.TR") is not None
+
+
+def test_arxiv_index_keeps_only_latest_version(tmp_path):
+    today = str(datetime.now().date())
+    index = ArxivPaperIndex(index_file=str(tmp_path / "arxiv_index.json"))
+    now = datetime.now(timezone.utc)
+    v1 = {"id": "2601.00001v1", "published": today, "updated": "2026-01-01T00:00:00Z"}
+    v2 = {"id": "2601.00001v2", "published": today, "updated": "2026-01-05T00:00:00Z"}
+
+    index.merge("q", [v2], now)
+    index.merge("q", [v1], now)
+
+    assert [paper["id"] for paper in index.papers("q")] == ["2601.00001v2"]
+
+
+def test_harvest_arxiv_papers_paginates_incremental_window(tmp_path):
+    today = str(datetime.now().date())
+    cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
+    index = ArxivPaperIndex(index_file=str(tmp_path / "arxiv_index.json"))
+    index.merge("cat:cs.AI", [], datetime.now(timezone.utc) - timedelta(days=1))
+    full_page = _arxiv_feed(("2601.00002v1", today), ("2601.00003v1", today))
+    last_page = _arxiv_feed(("2601.00001v1", today))
+
+    with (
+        patch("scripts.sources.arxiv.ARXIV_HARVEST_MAX_RESULTS", 2),
+        patch("scripts.sources.arxiv.time.sleep"),
+        patch("requests.get", side_effect=[full_page, last_page]) as mock_get,
+    ):
+        papers = harvest_arxiv_papers(index, "cat:cs.AI", cache=cache, translate=False)
+
+    assert len(papers) == 3
+    assert [call.kwargs["params"]["start"] for call in mock_get.call_args_list] == [0, 2]
+
+
+def test_harvest_arxiv_papers_advances_window_when_pages_run_out(tmp_path):
+    today = datetime.now().date()
+    yesterday = today - timedelta(days=1)
+    cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
+    index = ArxivPaperIndex(index_file=str(tmp_path / "arxiv_index.json"))
+    index.merge("cat:cs.AI", [], datetime.now(timezone.utc) - timedelta(days=3))
+
+    with (
+        patch("scripts.sources.arxiv.ARXIV_HARVEST_MAX_RESULTS", 1),
+        patch("scripts.sources.arxiv.ARXIV_HARVEST_MAX_PAGES", 2),
+        patch("scripts.sources.arxiv.time.sleep"),
+        patch(
+            "requests.get",
+            side_effect=[
+                _arxiv_feed(("2601.00002v1", str(today))),
+                _arxiv_feed(("2601.00001v1", str(yesterday))),
+            ],
+        ),
+    ):
+        papers = harvest_arxiv_papers(index, "cat:cs.AI", cache=cache, translate=False)
+
+    # 下次从已取到的最早投稿继续，区间不会逐次扩大
+    assert len(papers) == 2
+    assert index.last_harvested("cat:cs.AI") == datetime(
+        yesterday.year, yesterday.month, yesterday.day, 10, tzinfo=timezone.utc
     )
+
+
+def test_arxiv_index_keeps_only_newest_papers(tmp_path):
+    index = ArxivPaperIndex(index_file=str(tmp_path / "arxiv_index.json"), max_papers=2)
+    today = datetime.now().date()
+    papers = [
+        {"id": f"2601.0000{i}v1", "published": str(today - timedelta(days=i)), "updated": "v1"}
+        for i in range(4)
+    ]
+
+    index.merge("q", papers, datetime.now(timezone.utc))
+
+    assert [paper["id"] for paper in index.papers("q")] == ["2601.00000v1", "2601.00001v1"]
+
+
+def test_harvest_arxiv_papers_keeps_index_when_request_fails(tmp_path):
+    today = str(datetime.now().date())
+    cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
+    index = ArxivPaperIndex(index_file=str(tmp_path / "arxiv_index.json"))
+
+    with patch("requests.get", return_value=_arxiv_feed(("2601.00001v1", today))):
+        harvest_arxiv_papers(index, "cat:q-fin.TR", cache=cache, translate=False)
+    harvested_at = index.last_harvested("cat:q-fin.TR")
+    with patch("requests.get", side_effect=requests.exceptions.ConnectionError("down")):
+        papers = harvest_arxiv_papers(index, "cat:q-fin.TR", cache=cache, translate=False)
+
+    assert [paper["id"] for paper in papers] == ["2601.00001v1"]
+    assert index.last_harvested("cat:q-fin.TR") == harvested_at
+
+
+def test_translate_arxiv_papers_batches_and_retries_missing(tmp_path):
+    cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
+    papers = [
+        {
+            "id": f"2501.0000{i}",
+            "updated": "2025-01-01T00:00:00Z",
+            "summary_zh": f"Abstract {i}",
+            "translation_available": False,
+        }
+        for i in range(3)
+    ]
+    batch_output = (
+        '```json\n[{"index": 0, "translation": "摘要 0"},'
+        ' {"index": 2, "translation": "摘要 2"}]\n```'
+    )
+    with patch(
+        "scripts.sources.arxiv.get_summary", side_effect=[batch_output, "摘要 1"]
+    ) as summary:
+        translate_arxiv_papers(papers, cache, batch_size=5)
+
+    assert [paper["summary_zh"] for paper in papers] == ["摘要 0", "摘要 1", "摘要 2"]
+    assert all(paper["translation_available"] for paper in papers)
+    assert summary.call_args_list[0].kwargs["profile"] == "translation_batch"
+    assert summary.call_args_list[1].kwargs["profile"] == "translation"
+    assert cache.get("2501.00001", "2025-01-01T00:00:00Z") == "摘要 1"
+
+
+def test_translate_arxiv_papers_skips_cached_and_keeps_english_on_failure(tmp_path):
+    cache = ArxivTranslationCache(cache_file=str(tmp_path / "arxiv_cache.json"))
+    cache.set("2501.00000", "v1", "已缓存")
+    papers = [
+        {"id": "2501.00000", "updated": "v1", "summary_zh": "A", "translation_available": False},
+        {"id": "2501.00001", "updated": "v1", "summary_zh": "B", "translation_available": False},
+    ]
+    with patch(
+        "scripts.sources.arxiv.get_summary", return_value="摘要生成失败（网络错误）"
+    ) as summary:
+        translate_arxiv_papers(papers, cache)
+
+    summary.assert_called_once()
+    assert papers[0]["summary_zh"] == "已缓存"
+    assert papers[1]["summary_zh"] == "B"
+    assert not papers[1]["translation_available"]
+
+
+def _copy_template(tmp_path):
+    shutil.copytree(
+        os.path.join(os.path.dirname(__file__), "..", "templates"), tmp_path / "templates"
+    )
+
+
+def test_generate_html_renders_topic_tabs_and_sources(tmp_path, monkeypatch):
+    _copy_template(tmp_path)
     monkeypatch.chdir(tmp_path)
 
     generate_html(
         [],
-        github_repositories=[{"name": "octocat/hello-world", "url": "https://github.com/octocat/hello-world", "description": "Hello", "language": "Python", "stars": "1", "forks": "0", "stars_today": "1 star today"}],
+        github_repositories=[{"name": "octocat/hello-world", "url": "https://github.com/octocat/hello-world", "description": "Hello", "language": "Python", "stars": 1, "forks": 0, "stars_gained": {"daily": 1}, "views": ["daily"], "stars_gained_text": "今日 +1"}],
         product_hunt_products=[{"name": "Useful Product", "url": "https://example.com", "description": "Useful", "maker": "Maker", "published": "2026-08-13"}],
         arxiv_papers=[{"id": "2608.12345v1", "title": "Quant Paper", "url": "https://arxiv.org/abs/2608.12345v1", "html_url": "https://arxiv.org/html/2608.12345v1", "pdf_url": "https://arxiv.org/pdf/2608.12345v1", "authors": ["Researcher"], "categories": ["q-fin.TR"], "primary_category": "q-fin.TR", "published": "2026-08-13", "updated": "2026-08-13T10:00:00Z", "summary_zh": "中文摘要", "translation_available": True}],
         lobsters_stories=[{"title": "Lobsters Story", "url": "https://example.com/lobsters", "comments_url": "https://lobste.rs/s/test", "score": 10, "comment_count": 2, "submitter": "alice", "tags": ["python"], "created_at": "2026-08-14"}],
@@ -701,6 +1125,13 @@ def test_generate_html_renders_topic_tabs_and_sources(tmp_path, monkeypatch):
     )
 
     html = (tmp_path / "public" / "index.html").read_text(encoding="utf-8")
+    assert (tmp_path / "public" / "feeds" / "polymarket.xml").exists()
+    manifest = json.loads((tmp_path / "public" / "manifest.json").read_text(encoding="utf-8"))
+    assert "index.html" in manifest["files"]
+    assert manifest["assets"][0] in html
+    assert "Current report" in (tmp_path / "public" / "feeds" / "sec.json").read_text(
+        encoding="utf-8"
+    )
     assert 'id="tech-community-tab"' in html
     assert 'id="open-source-tab"' in html
     assert 'id="new-products-tab"' in html
@@ -722,3 +1153,414 @@ def test_generate_html_renders_topic_tabs_and_sources(tmp_path, monkeypatch):
     assert 'href="https://arxiv.org/html/2608.12345v1"' in html
     assert "HTML 在线版" in html
     assert not (tmp_path / "public" / "page").exists()
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        (
+            "http://www.Example.com/post/?utm_source=hn&b=2&a=1#comments",
+            "https://example.com/post?a=1&b=2",
+        ),
+        (
+            "https://www.google.com/url?q=https://example.com/post/%3Fref%3Dhn",
+            "https://example.com/post",
+        ),
+        ("https://example.com", "https://example.com/"),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_canonicalize_url_resolves_shorteners():
+    with patch(
+        "requests.head",
+        return_value=MagicMock(url="https://example.com/post?utm_medium=social"),
+    ) as head:
+        assert canonicalize_url("https://t.co/abc") == "https://example.com/post"
+        assert canonicalize_url("https://t.co/abc", resolve_shorteners=False) == (
+            "https://t.co/abc"
+        )
+    assert head.call_count == 1
+
+
+def test_link_registry_loads_each_canonical_link_once():
+    registry = LinkRegistry()
+    loader = MagicMock(return_value=("content", "摘要"))
+
+    first = registry.resolve("https://example.com/post?utm_source=hn", loader)
+    second = registry.resolve("http://www.example.com/post/", loader)
+
+    assert first == second == ("content", "摘要")
+    assert loader.call_count == 1
+
+
+def test_cross_link_stories_shares_summary_between_sources():
+    stories = [
+        {
+            "url": "https://example.com/post?utm_source=hn",
+            "comments_url": "https://news.ycombinator.com/item?id=1",
+            "article_summary": "HN 摘要",
+        }
+    ]
+    lobsters_stories = [
+        {"url": "https://www.example.com/post/", "comments_url": "https://lobste.rs/s/abc"},
+        {"url": "https://example.com/other", "comments_url": "https://lobste.rs/s/def"},
+    ]
+
+    cross_link_stories(stories, lobsters_stories)
+
+    assert stories[0]["lobsters_url"] == "https://lobste.rs/s/abc"
+    assert lobsters_stories[0]["hn_comments_url"] == stories[0]["comments_url"]
+    assert lobsters_stories[0]["article_summary"] == "HN 摘要"
+    assert "hn_comments_url" not in lobsters_stories[1]
+
+
+def test_cross_link_stories_skips_placeholder_and_existing_summaries():
+    stories = [
+        {"url": "https://a.example/", "comments_url": "hn-1", "article_summary": "无法获取文章内容"},
+        {"url": "https://b.example/", "comments_url": "hn-2", "article_summary": "摘要生成失败（网络错误）"},
+        {"url": "https://c.example/", "comments_url": "hn-3", "article_summary": "HN 摘要"},
+    ]
+    lobsters_stories = [
+        {"url": "https://a.example/", "comments_url": "lob-1"},
+        {"url": "https://b.example/", "comments_url": "lob-2"},
+        {"url": "https://c.example/", "comments_url": "lob-3", "article_summary": "Lobsters 摘要"},
+    ]
+
+    cross_link_stories(stories, lobsters_stories)
+
+    assert "article_summary" not in lobsters_stories[0]
+    assert "article_summary" not in lobsters_stories[1]
+    assert lobsters_stories[2]["article_summary"] == "Lobsters 摘要"
+    assert all(story["hn_comments_url"] for story in lobsters_stories)
+
+
+def test_story_cache_finds_article_by_canonical_url(cache):
+    cache.set(
+        "1",
+        {"url": "https://example.com/post?utm_source=hn", "article_summary": "摘要"},
+        article_content="正文",
+    )
+
+    assert cache.find_article("https://www.example.com/post/") == ("正文", "摘要")
+    assert cache.find_article("https://example.com/other") is None
+
+
+def test_story_cache_keeps_article_bodies_in_blob_store(cache):
+    cache.set("1", dict(MOCK_STORY["data"]), article_content="正文" * 100)
+    cache.set("2", dict(MOCK_STORY["data"]), article_content="正文" * 100)
+
+    with open(cache.cache_file, encoding="utf-8") as f:
+        index = json.load(f)
+
+    assert "article_content" not in index["1"]
+    assert "article_summary" not in index["1"]
+    assert index["1"]["article_blob"] == index["2"]["article_blob"]
+    assert cache.article_content(cache.get("2")) == "正文" * 100
+
+
+def test_story_cache_keeps_article_bodies_out_of_published_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = StoryCache()
+    cache.set("1", dict(MOCK_STORY["data"]), article_content="正文")
+
+    assert not (tmp_path / "public").exists()
+    assert list((tmp_path / "cache" / "article_blobs").rglob("*"))
+
+
+def test_story_cache_migrates_inline_article_content(tmp_path):
+    cache_file = tmp_path / "story_cache.json"
+    cache_file.write_text(json.dumps({"123": MOCK_STORY}, default=str), encoding="utf-8")
+
+    cache = StoryCache(cache_file=str(cache_file))
+    migrated = json.loads(cache_file.read_text(encoding="utf-8"))["123"]
+
+    assert set(migrated) == {"data", "article_blob", "cache_time"}
+    assert cache.article_content(cache.get("123")) == "Test content"
+    assert cache.get("123")["data"]["article_summary"] == "Test summary"
+
+
+def test_story_cache_prunes_unreferenced_blobs(tmp_path):
+    cache = StoryCache(cache_file=str(tmp_path / "story_cache.json"))
+    cache.set("1", dict(MOCK_STORY["data"]), article_content="旧正文")
+    cache.cache["1"]["cache_time"] = (datetime.now() - timedelta(hours=25)).isoformat()
+    cache.set("2", dict(MOCK_STORY["data"]), article_content="新正文")
+    blob = cache.cache["1"]["article_blob"]
+
+    cache._clean_expired()
+
+    assert cache.blobs.get(blob) is None
+    assert cache.article_content(cache.get("2")) == "新正文"
+
+
+def test_run_daemon_refreshes_only_due_sources(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    clock = [0.0]
+    calls = []
+
+    def source(name):
+        def fetch():
+            calls.append((name, clock[0]))
+            return {name: clock[0]}
+
+        return (f"fetch {name}", fetch)
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    with (
+        patch.dict(
+            "scripts.fetch_news.SOURCES",
+            {"stories": source("stories"), "polymarket": source("polymarket")},
+            clear=True,
+        ),
+        patch("time.monotonic", side_effect=lambda: clock[0]),
+        patch("time.sleep", side_effect=sleep),
+        patch("scripts.fetch_news.render_results") as render,
+    ):
+        run_daemon(intervals={"stories": 3600, "polymarket": 300}, max_cycles=3)
+
+    assert calls == [("stories", 0.0), ("polymarket", 0.0), ("polymarket", 300.0), ("polymarket", 600.0)]
+    assert render.call_count == 3
+    assert render.call_args.args[0]["polymarket"] == 600.0
+    metrics = json.loads((tmp_path / "cache" / "metrics.json").read_text(encoding="utf-8"))
+    assert set(metrics["sources"]) == {"stories", "polymarket"}
+
+
+def test_main_daemon_without_llm_keeps_source_cache_read_only():
+    with (
+        patch("scripts.fetch_news.run_daemon") as daemon,
+        patch("scripts.fetch_news.set_llm_enabled"),
+    ):
+        main(["--daemon", "--no-llm"])
+
+    assert daemon.call_args.kwargs["read_only_cache"] is True
+
+
+def test_fetch_source_serves_fresh_results_from_cache(tmp_path):
+    source_cache = SourceCache(
+        cache_file=str(tmp_path / "source_cache.json"), ttl_hours={"bls": 12}
+    )
+    fetch = MagicMock(return_value={"bls_indicators": [{"id": "LNS14000000"}]})
+    metrics = {}
+
+    with patch.dict("scripts.fetch_news.SOURCES", {"bls": ("BLS", fetch)}):
+        first = fetch_source("bls", source_cache, metrics)
+        assert metrics["bls"]["cached"] is False
+        second = fetch_source("bls", SourceCache(
+            cache_file=str(tmp_path / "source_cache.json"), ttl_hours={"bls": 12}
+        ), metrics)
+
+    assert first == second
+    assert fetch.call_count == 1
+    assert metrics["bls"] == {
+        "cached": True,
+        "partial": False,
+        "stale_since": None,
+        "seconds": metrics["bls"]["seconds"],
+        "items": 1,
+    }
+
+
+def test_source_cache_expires_but_keeps_last_good_results(tmp_path):
+    source_cache = SourceCache(
+        cache_file=str(tmp_path / "source_cache.json"), ttl_hours={"bls": 12}
+    )
+    source_cache.set("bls", {"bls_indicators": [1]})
+    source_cache.set("polymarket", {"polymarket_markets": [1]})
+    source_cache.set("hn", {"stories": [1]})
+    source_cache.cache["bls"]["cache_time"] = (
+        datetime.now() - timedelta(hours=13)
+    ).isoformat()
+
+    assert source_cache.get("bls") is None
+    assert source_cache.get("polymarket") is None
+    assert source_cache.get_last_good("bls")[0] == {"bls_indicators": [1]}
+    assert source_cache.get_last_good("polymarket")[0] == {"polymarket_markets": [1]}
+    assert source_cache.get_last_good("hn") == (None, None)
+
+
+def test_fetch_source_falls_back_to_last_good_result(tmp_path):
+    source_cache = SourceCache(cache_file=str(tmp_path / "source_cache.json"), ttl_hours={})
+    good = [{"title": "Deep modules"}]
+    fetch = MagicMock(side_effect=[{"lobsters_stories": good}, {"lobsters_stories": []}])
+    metrics = {}
+
+    with patch.dict("scripts.fetch_news.SOURCES", {"lobsters": ("Lobsters", fetch)}):
+        fetch_source("lobsters", source_cache, metrics)
+        stored_time = source_cache.cache["lobsters"]["cache_time"]
+        fields = fetch_source("lobsters", source_cache, metrics)
+
+    assert fields == {"lobsters_stories": good}
+    assert metrics["lobsters"]["stale_since"] == stored_time
+    assert source_cache.cache["lobsters"]["cache_time"] == stored_time
+
+
+def test_fetch_source_keeps_legitimately_empty_fields_and_saves_success(tmp_path):
+    source_cache = SourceCache(cache_file=str(tmp_path / "source_cache.json"), ttl_hours={})
+    source_cache.set("trending", {"github_repositories": [1], "github_releases": [2]})
+    fresh = {"github_repositories": [3], "github_releases": []}
+    metrics = {}
+
+    with patch.dict(
+        "scripts.fetch_news.SOURCES", {"trending": ("GitHub", MagicMock(return_value=fresh))}
+    ):
+        fields = fetch_source("trending", source_cache, metrics)
+
+    assert fields == {"github_repositories": [3], "github_releases": []}
+    assert metrics["trending"]["stale_since"] is None
+    assert source_cache.get_last_good("trending")[0] == fresh
+
+
+def test_fetch_source_falls_back_when_fetcher_raises(tmp_path):
+    source_cache = SourceCache(cache_file=str(tmp_path / "source_cache.json"), ttl_hours={})
+    source_cache.set("lobsters", {"lobsters_stories": [1]})
+    fetch = MagicMock(side_effect=RuntimeError("down"))
+    metrics = {}
+
+    with patch.dict("scripts.fetch_news.SOURCES", {"lobsters": ("Lobsters", fetch)}):
+        fields = fetch_source("lobsters", source_cache, metrics)
+
+    assert fields == {"lobsters_stories": [1]}
+    assert metrics["lobsters"]["stale_since"]
+
+
+def _import_in_subprocess(module):
+    """在新解释器中导入 module，返回 (耗时秒数, 已加载的模块名集合)。"""
+    code = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - started)\n"
+        "print(','.join(sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+    )
+    elapsed, loaded = (result.stdout.splitlines() + [""])[:2]
+    print(f"导入 {module} 耗时 {float(elapsed) * 1000:.1f} ms")
+    return float(elapsed), set(loaded.split(","))
+
+
+def test_import_is_fast_and_defers_heavy_dependencies():
+    elapsed, loaded = _import_in_subprocess("scripts.fetch_news")
+
+    assert not loaded & {"openai", "bs4", "jinja2", "pytz", "dotenv"}
+    assert elapsed < 1.0
+
+
+def test_importing_single_source_skips_other_sources():
+    _, loaded = _import_in_subprocess("scripts.sources.lobsters")
+
+    assert "scripts.fetch_news" not in loaded
+    assert not loaded & {"scripts.llm", "scripts.html_extract", "scripts.sources.hn"}
+
+
+def test_main_renders_snapshot_and_refreshes_only_selected_sources(tmp_path, monkeypatch):
+    _copy_template(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    save_snapshot(
+        {
+            "stories": [dict(MOCK_STORY["data"], title="Snapshot Story")],
+            "lobsters_stories": [],
+        },
+        str(tmp_path / "snapshot.json"),
+    )
+    lobsters = [{"title": "Fresh Lobsters", "url": "https://example.com/fresh", "comments_url": "https://lobste.rs/s/new", "score": 1, "comment_count": 0, "submitter": "bob", "tags": [], "created_at": "2026-08-14"}]
+
+    try:
+        with (
+            patch("scripts.fetch_news.fetch_top_stories") as fetch_stories,
+            patch("scripts.fetch_news.fetch_lobsters", return_value=lobsters),
+        ):
+            main([
+                "--snapshot", str(tmp_path / "snapshot.json"),
+                "--sources", "lobsters",
+                "--no-llm",
+                "--save-snapshot", str(tmp_path / "next.json"),
+            ])
+    finally:
+        set_llm_enabled(True)
+
+    fetch_stories.assert_not_called()
+    html = (tmp_path / "public" / "index.html").read_text(encoding="utf-8")
+    assert "Snapshot Story" in html
+    assert "Fresh Lobsters" in html
+    assert (tmp_path / "next.json").exists()
+
+
+def test_main_profile_writes_stage_reports(tmp_path, monkeypatch):
+    _copy_template(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    save_snapshot({"stories": [dict(MOCK_STORY["data"])]}, str(tmp_path / "snapshot.json"))
+
+    try:
+        with patch("scripts.fetch_news.fetch_lobsters", return_value=[]):
+            main([
+                "--snapshot", str(tmp_path / "snapshot.json"),
+                "--sources", "lobsters",
+                "--no-llm",
+                "--profile", str(tmp_path / "profile"),
+            ])
+    finally:
+        set_llm_enabled(True)
+
+    report = (tmp_path / "profile" / "report.txt").read_text(encoding="utf-8")
+    assert "阶段 fetch:lobsters" in report
+    assert "阶段 render" in report
+    assert (tmp_path / "profile" / "stacks.collapsed").exists()
+
+
+def test_main_rejects_unknown_sources():
+    with pytest.raises(SystemExit):
+        main(["--sources", "hn,unknown"])
+
+
+def test_main_marks_sources_partial_when_deadline_expires(tmp_path, monkeypatch):
+    _copy_template(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    save_snapshot({"stories": [dict(MOCK_STORY["data"])]}, str(tmp_path / "snapshot.json"))
+
+    def slow_lobsters():
+        time.sleep(0.2)
+        return []
+
+    with (
+        patch("scripts.fetch_news.fetch_lobsters", side_effect=slow_lobsters),
+        patch("scripts.fetch_news.fetch_polymarket_markets") as fetch_markets,
+    ):
+        main([
+            "--snapshot", str(tmp_path / "snapshot.json"),
+            "--sources", "lobsters,polymarket",
+            "--deadline", "0.1",
+        ])
+
+    fetch_markets.assert_not_called()
+    metrics = json.loads((tmp_path / "cache" / "metrics.json").read_text(encoding="utf-8"))
+    assert metrics["sources"]["lobsters"]["partial"] is True
+    assert metrics["sources"]["polymarket"]["partial"] is True
+    # 运行指标和缓存不在发布目录中，清单只包含页面、静态资源和订阅源
+    manifest = json.loads((tmp_path / "public" / "manifest.json").read_text(encoding="utf-8"))
+    assert all(
+        path in ("index.html", "_headers") or path.startswith(("static/", "feeds/"))
+        for path in manifest["files"]
+    )
+    html = (tmp_path / "public" / "index.html").read_text(encoding="utf-8")
+    assert "未能在本次运行时限内完成" in html
+    assert "Lobsters、Polymarket 预测市场" in html
+
+
+def test_generate_html_marks_stale_sources(tmp_path, monkeypatch):
+    _copy_template(tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    generate_html([], stale_sources={"Lobsters": "2026-08-14 07:00"})
+
+    html = (tmp_path / "public" / "index.html").read_text(encoding="utf-8")
+    assert "Lobsters（数据时间 2026-08-14 07:00）" in html
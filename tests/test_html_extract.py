@@ -0,0 +1,91 @@
+import json
+import os
+from unittest.mock import patch
+
+from scripts import html_extract
+from scripts.html_extract import (
+    clean_comment_batch,
+    clean_comment_html,
+    declared_charset,
+    extract_article,
+    extract_article_text,
+)
+from scripts.sources.hn import clean_html_text
+
+ARTICLE = (
+    "<html><head><meta charset='gbk'><script>var x = 1;</script></head><body>"
+    "<nav>菜单</nav><article>{}</article><footer>版权</footer></body></html>"
+)
+
+
+def test_extract_article_text_detects_meta_charset_from_bytes():
+    body = ARTICLE.format("这是一段足够长的中文正文，用来检查编码识别是否正确。" * 3).encode("gbk")
+
+    text = extract_article_text(body)
+
+    assert text.startswith("这是一段足够长的中文正文")
+    assert "菜单" not in text and "版权" not in text
+
+
+def test_declared_charset():
+    assert declared_charset("text/html; charset=UTF-8") == "UTF-8"
+    assert declared_charset("text/html") is None
+
+
+def test_extract_article_uses_process_pool_for_large_pages(monkeypatch):
+    monkeypatch.setenv("HTML_EXTRACT_WORKERS", "1")
+    paragraph = "<p>" + "Large page paragraph with plenty of words. " * 20 + "</p>"
+    body = ARTICLE.replace("gbk", "utf-8").format(paragraph * 100).encode()
+    html_extract.shutdown_pool()
+
+    try:
+        with patch.object(html_extract, "POOL_MIN_BYTES", 1024):
+            text = extract_article(body, timeout=60)
+            pool = html_extract._pool
+    finally:
+        html_extract.shutdown_pool()
+
+    assert pool is not None
+    assert text == extract_article_text(body)
+
+
+def test_extract_article_parses_small_pages_inline(monkeypatch):
+    monkeypatch.setenv("HTML_EXTRACT_WORKERS", "1")
+    body = ARTICLE.replace("gbk", "utf-8").format("Short article body. " * 5).encode()
+
+    with patch.object(html_extract, "get_pool") as get_pool:
+        text = extract_article(body)
+
+    get_pool.assert_not_called()
+    assert text.startswith("Short article body.")
+
+
+def _comment_corpus():
+    fixture = os.path.join(os.path.dirname(__file__), "fixtures", "hn_comments.json")
+    with open(fixture, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_comment_cleaner_matches_beautifulsoup_on_corpus():
+    corpus = _comment_corpus()
+    expected = [clean_html_text(text) for text in corpus]
+
+    assert [clean_comment_html(text) for text in corpus] == expected
+    assert clean_comment_batch(corpus) == expected
+
+
+def test_comment_batch_keeps_items_when_tag_spans_separator():
+    texts = ["a <i", "b> c", "d"]
+
+    cleaned = clean_comment_batch(texts)
+
+    assert len(cleaned) == len(texts)
+    assert cleaned == [clean_comment_html(text) for text in texts]
+
+
+def test_comment_cleaner_falls_back_on_unusual_markup():
+    texts = ["<!-- note -->visible", "broken <a href='x'", "has\x00separator", None]
+
+    assert clean_comment_batch(texts) == [
+        clean_html_text(text) if text else "" for text in texts
+    ]
@@ -0,0 +1,361 @@
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scripts.html_extract import ARTICLE_TEXT_LIMIT
+from scripts.llm import (
+    ARTICLE_CALL_TOKENS,
+    LLM_DISABLED_SUMMARY,
+    MAX_RETRY_DELAY,
+    CHUNK_PROMPT,
+    ChunkSummaryCache,
+    CircuitBreaker,
+    ModelEndpoint,
+    ModelRouter,
+    ModelUnavailable,
+    backoff_delay,
+    estimate_tokens,
+    get_model_profile,
+    get_summary,
+    set_llm_enabled,
+    split_into_chunks,
+    summarize_long,
+)
+
+
+@pytest.fixture(autouse=True)
+def mock_env():
+    with patch.dict(
+        os.environ,
+        {
+            "OPENAI_API_KEY": "test_key",
+            "OPENAI_API_BASE": "https://api.test.com/v1",
+            "OPENAI_MODEL": "test-model",
+        },
+    ), patch("scripts.llm.model_circuit", CircuitBreaker()):
+        yield
+
+
+def _completion(content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+def test_get_summary_skips_model_when_llm_disabled():
+    set_llm_enabled(False)
+    try:
+        with patch("scripts.llm.get_client") as get_client:
+            assert get_summary("Some text") == LLM_DISABLED_SUMMARY
+        get_client.assert_not_called()
+    finally:
+        set_llm_enabled(True)
+
+
+def test_get_model_profile_merges_defaults_and_env_override():
+    with patch.dict(os.environ, {"OPENAI_MODEL_ARTICLE": "fast-model"}):
+        article = get_model_profile("article")
+    comments = get_model_profile("comments")
+
+    assert article["model"] == "fast-model"
+    assert article["max_tokens"] < get_model_profile()["max_tokens"]
+    assert comments["max_retries"] == get_model_profile()["max_retries"]
+    with pytest.raises(ValueError, match="未知的模型配置"):
+        get_model_profile("missing")
+
+
+def test_get_summary_uses_profile_settings():
+    client = MagicMock()
+    client.chat.completions.create.return_value = _completion("摘要")
+
+    with (
+        patch.dict(os.environ, {"OPENAI_MODEL_TRANSLATION": "translate-model"}),
+        patch("scripts.llm.get_client", return_value=client),
+    ):
+        assert get_summary("Abstract", profile="translation") == "摘要"
+
+    kwargs = client.chat.completions.create.call_args.kwargs
+    profile = get_model_profile("translation")
+    assert kwargs["model"] == "translate-model"
+    assert kwargs["max_tokens"] == profile["max_tokens"]
+    assert kwargs["timeout"] == profile["timeout"]
+    assert kwargs["temperature"] == profile["temperature"]
+
+
+def test_get_summary_follows_profile_retry_policy():
+    client = MagicMock()
+    client.chat.completions.create.side_effect = RuntimeError("down")
+
+    with (
+        patch("scripts.llm.get_client", return_value=client),
+        patch("time.sleep") as sleep,
+    ):
+        assert get_summary("Events", profile="polymarket").startswith("摘要生成失败")
+
+    assert client.chat.completions.create.call_count == 1
+    sleep.assert_not_called()
+
+
+class _RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__("rate limited")
+        self.response = MagicMock(headers={"retry-after": retry_after})
+
+
+def test_circuit_breaker_opens_and_fails_fast():
+    client = MagicMock()
+    client.chat.completions.create.side_effect = RuntimeError("down")
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    with (
+        patch("scripts.llm.model_circuit", breaker),
+        patch("scripts.llm.get_client", return_value=client),
+        patch("time.sleep"),
+    ):
+        assert get_summary("Text", max_retries=3) == "摘要生成失败（模型服务暂不可用）"
+        assert get_summary("Text") == "摘要生成失败（模型服务暂不可用）"
+
+    assert breaker.state == "open"
+    assert client.chat.completions.create.call_count == 2
+
+
+def test_circuit_breaker_half_open_probe_closes_on_success():
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+
+    with patch("time.monotonic", side_effect=lambda: clock[0]):
+        breaker.record_failure()
+        assert breaker.allow() is False
+        clock[0] = 31.0
+        assert breaker.allow() is True
+        assert breaker.allow() is False  # 只放行一个探测请求
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow() is True
+
+
+def test_get_summary_honors_retry_after():
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [_RateLimited("7"), _completion("摘要")]
+
+    with (
+        patch("scripts.llm.get_client", return_value=client),
+        patch("time.sleep") as sleep,
+    ):
+        assert get_summary("Text") == "摘要"
+
+    sleep.assert_called_once_with(7.0)
+
+
+def test_backoff_delay_grows_exponentially_with_jitter():
+    delays = [backoff_delay(attempt, 2) for attempt in range(5)]
+
+    assert 1 <= delays[0] <= 2
+    assert 4 <= delays[2] <= 8
+    assert delays[4] <= MAX_RETRY_DELAY
+    assert backoff_delay(0, 2, retry_after=120) == MAX_RETRY_DELAY
+
+
+def test_get_summary_gives_up_when_run_deadline_expired():
+    with (
+        patch("scripts.deadline.expired", return_value=True),
+        patch("scripts.llm.get_client") as get_client,
+    ):
+        assert get_summary("Text") == "摘要生成失败（超出运行时限）"
+
+    get_client.assert_not_called()
+
+
+def test_estimate_tokens_counts_cjk_characters_individually():
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("中文摘要") == 4
+
+
+def test_split_into_chunks_respects_token_budget():
+    paragraphs = [f"Paragraph {i} " + "word " * 60 for i in range(20)]
+    text = "\n\n".join(paragraphs) + "\n\n" + "x" * 2000
+
+    chunks = split_into_chunks(text, max_tokens=200)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+    assert chunks[0].startswith("Paragraph 0")
+    assert "".join(chunks).count("x") == 2000
+
+
+def _fake_summary(text, prompt, profile="default", **kwargs):
+    if profile == "chunk":
+        return f"chunk-{text.split()[1]}"
+    return f"汇总:{text.count('chunk-')}"
+
+
+def test_summarize_long_passes_short_text_through():
+    with patch("scripts.llm.get_summary", return_value="摘要") as summary:
+        assert summarize_long("short text", "prompt", profile="comments") == "摘要"
+
+    summary.assert_called_once_with(
+        "short text", "prompt", story_id=None, index=None, profile="comments"
+    )
+
+
+def test_summarize_long_maps_chunks_and_reduces(tmp_path):
+    text = "\n\n".join(f"Part {i} " + "word " * 100 for i in range(6))
+    cache = ChunkSummaryCache(str(tmp_path / "chunks.json"))
+
+    with patch("scripts.llm.get_summary", side_effect=_fake_summary) as summary:
+        result = summarize_long(
+            text, "prompt", cache=cache, threshold_tokens=300, chunk_tokens=200
+        )
+
+    chunk_calls = [c for c in summary.call_args_list if c.kwargs["profile"] == "chunk"]
+    assert result == f"汇总:{len(chunk_calls)}"
+    assert len(chunk_calls) > 1
+    assert all(c.args[1] == CHUNK_PROMPT for c in chunk_calls)
+    # 分块摘要只在内存中累积，save 时才写入文件
+    assert not (tmp_path / "chunks.json").exists()
+    cache.save()
+
+    # 未变化的分块直接读缓存，只重新调用汇总
+    reloaded = ChunkSummaryCache(str(tmp_path / "chunks.json"))
+    with patch("scripts.llm.get_summary", side_effect=_fake_summary) as summary:
+        assert summarize_long(
+            text, "prompt", cache=reloaded, threshold_tokens=300, chunk_tokens=200
+        ) == result
+
+    assert [c.kwargs["profile"] for c in summary.call_args_list] == ["default"]
+
+
+def test_summarize_long_keeps_article_calls_near_text_limit():
+    text = "\n\n".join(f"Part {i} " + "word " * 300 for i in range(20))
+
+    with patch("scripts.llm.get_summary", side_effect=_fake_summary) as summary:
+        summarize_long(
+            text,
+            "prompt",
+            profile="article",
+            threshold_tokens=ARTICLE_CALL_TOKENS,
+            chunk_tokens=ARTICLE_CALL_TOKENS,
+        )
+
+    assert len(summary.call_args_list) > 2
+    assert all(
+        len(c.args[0]) <= ARTICLE_TEXT_LIMIT * 1.5 for c in summary.call_args_list
+    )
+
+
+def test_summarize_long_skips_failed_chunks_without_caching(tmp_path):
+    text = "\n\n".join(f"Part {i} " + "word " * 100 for i in range(3))
+    cache = ChunkSummaryCache(str(tmp_path / "chunks.json"))
+
+    def flaky(text, prompt, profile="default", **kwargs):
+        if profile == "chunk" and text.startswith("Part 1"):
+            return "摘要生成失败（网络错误）"
+        return _fake_summary(text, prompt, profile=profile)
+
+    with patch("scripts.llm.get_summary", side_effect=flaky):
+        result = summarize_long(
+            text, "prompt", cache=cache, threshold_tokens=100, chunk_tokens=150
+        )
+
+    assert result == "汇总:2"
+    assert len(cache.cache) == 2
+
+
+def _endpoint(name, create, model=None):
+    endpoint = ModelEndpoint(name, f"https://{name}.test/v1", "key", model)
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    endpoint.client = lambda: client
+    return endpoint, client
+
+
+def _request():
+    return {"model": "profile-model", "messages": [], "timeout": 10}
+
+
+def test_router_fails_over_to_backup_endpoint():
+    primary, _ = _endpoint("primary", RuntimeError("down"))
+    backup, backup_client = _endpoint("backup", [_completion("备用")], model="backup-model")
+    router = ModelRouter([primary, backup])
+
+    response = router.complete(_request())
+
+    assert response.choices[0].message.content == "备用"
+    assert backup_client.chat.completions.create.call_args.kwargs["model"] == "backup-model"
+    assert primary.error_rate() == 1.0
+    assert backup.error_rate() == 0.0
+
+
+def test_router_skips_open_circuits_and_demotes_failing_endpoints():
+    primary, _ = _endpoint("primary", [_completion("主")])
+    backup, _ = _endpoint("backup", [_completion("备用")] * 10)
+    router = ModelRouter([primary, backup])
+
+    for _ in range(6):
+        primary.outcomes.append(False)
+    assert [endpoint.name for endpoint in router.ordered()] == ["backup", "primary"]
+
+    for endpoint in (primary, backup):
+        endpoint.circuit.state = "open"
+        endpoint.circuit.opened_at = float("inf")
+    with pytest.raises(ModelUnavailable):
+        router.complete(_request())
+
+
+def test_router_hedges_slow_primary_after_p90_latency():
+    release = threading.Event()
+
+    def slow(**kwargs):
+        release.wait(5)
+        return _completion("主")
+
+    primary, _ = _endpoint("primary", slow)
+    backup, backup_client = _endpoint("backup", [_completion("备用")])
+    for _ in range(10):
+        primary.record_success(0.01, "article")
+    router = ModelRouter([primary, backup], hedge=True)
+
+    try:
+        response = router.complete(_request(), profile="article")
+    finally:
+        release.set()
+
+    assert response.choices[0].message.content == "备用"
+    assert backup_client.chat.completions.create.call_count == 1
+
+
+def test_router_does_not_hedge_without_latency_samples():
+    primary, _ = _endpoint("primary", [_completion("主")])
+    backup, backup_client = _endpoint("backup", [_completion("备用")])
+    router = ModelRouter([primary, backup], hedge=True)
+
+    for _ in range(10):
+        primary.record_success(0.01, "translation")
+
+    # 其他任务配置的延迟样本不会触发对冲
+    assert router.complete(_request(), profile="article").choices[0].message.content == "主"
+    backup_client.chat.completions.create.assert_not_called()
+    assert primary.latency_p90("article") is None
+    assert primary.latency_p90("translation") == 0.01
+
+
+def test_half_open_probe_is_released_when_call_never_reaches_model():
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [ValueError("bad config"), _completion("摘要")]
+
+    with (
+        patch("time.monotonic", side_effect=lambda: clock[0]),
+        patch("scripts.llm.model_circuit", breaker),
+        patch("scripts.llm.get_client", return_value=client),
+    ):
+        breaker.record_failure()
+        clock[0] = 31.0
+        assert get_summary("Text") == "摘要生成失败（配置错误）"
+        assert breaker.state == "half_open"
+        assert get_summary("Text") == "摘要"
+
+    assert breaker.state == "closed"
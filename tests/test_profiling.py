@@ -0,0 +1,36 @@
+import threading
+import time
+
+from scripts.profiling import StageProfiler
+
+
+def _busy_worker(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        sum(range(1000))
+
+
+def test_stage_profiler_writes_report_and_collapsed_stacks(tmp_path):
+    profiler = StageProfiler(str(tmp_path / "profile"), sample_interval=0.001)
+    profiler.start()
+    with profiler.stage("fetch:demo"):
+        worker = threading.Thread(target=_busy_worker, args=(0.05,))
+        worker.start()
+        data = [str(i) * 10 for i in range(10000)]
+        worker.join()
+    with profiler.stage("render"):
+        "".join(data)
+    report_file = profiler.stop()
+
+    report = (tmp_path / "profile" / "report.txt").read_text(encoding="utf-8")
+    stacks = (tmp_path / "profile" / "stacks.collapsed").read_text(encoding="utf-8")
+    assert report_file.endswith("report.txt")
+    assert "阶段 fetch:demo" in report and "阶段 render" in report
+    assert "峰值内存" in report
+    assert (tmp_path / "profile" / "fetch_demo.prof").exists()
+    # 线程池中的工作也会出现在折叠栈中
+    assert any(
+        line.startswith("fetch:demo;") and "test_profiling:_busy_worker" in line
+        for line in stacks.splitlines()
+    )
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks.splitlines())
@@ -0,0 +1,75 @@
+import hashlib
+import os
+
+from scripts.publish import (
+    HEADERS_FILE,
+    MANIFEST_FILE,
+    hashed_asset,
+    load_manifest,
+    write_if_changed,
+    write_manifest,
+)
+
+
+def test_write_if_changed_skips_identical_content(tmp_path):
+    path = str(tmp_path / "out" / "index.html")
+
+    assert write_if_changed(path, "<p>一</p>")
+    modified = os.stat(path).st_mtime_ns
+    assert not write_if_changed(path, "<p>一</p>".encode("utf-8"))
+    assert os.stat(path).st_mtime_ns == modified
+    assert write_if_changed(path, "<p>二</p>")
+
+
+def test_hashed_asset_names_follow_content(tmp_path):
+    source = tmp_path / "site.css"
+    source.write_text("body { color: red; }", encoding="utf-8")
+    output = str(tmp_path / "public")
+
+    first = hashed_asset(str(source), output)
+    assert first.startswith("static/site.") and first.endswith(".css")
+    assert hashed_asset(str(source), output) == first
+
+    source.write_text("body { color: blue; }", encoding="utf-8")
+    second = hashed_asset(str(source), output)
+    assert second != first
+    assert os.path.exists(os.path.join(output, second))
+
+
+def test_write_manifest_reports_changes_and_prunes_old_assets(tmp_path):
+    output = str(tmp_path / "public")
+    source = tmp_path / "site.css"
+    write_if_changed(os.path.join(output, "index.html"), "v1")
+    write_if_changed(os.path.join(output, "old.json"), "{}")
+    source.write_text("a", encoding="utf-8")
+    first_asset = hashed_asset(str(source), output)
+
+    added, modified, removed = write_manifest(output, [first_asset])
+    assert set(added) == {"index.html", "old.json", first_asset, HEADERS_FILE}
+    assert not modified and not removed
+
+    # 第二次发布：页面修改，旧资源保留一轮
+    write_if_changed(os.path.join(output, "index.html"), "v2")
+    os.remove(os.path.join(output, "old.json"))
+    source.write_text("b", encoding="utf-8")
+    second_asset = hashed_asset(str(source), output)
+    added, modified, removed = write_manifest(output, [second_asset])
+    assert added == [second_asset]
+    assert modified == ["index.html"]
+    assert removed == ["old.json"]
+    assert os.path.exists(os.path.join(output, first_asset))
+
+    # 第三次发布：不再被引用的资源被删除，清单内容不变时不重写
+    assert write_manifest(output, [second_asset]) == ([], [], [first_asset])
+    assert not os.path.exists(os.path.join(output, first_asset))
+    manifest_path = os.path.join(output, MANIFEST_FILE)
+    modified_at = os.stat(manifest_path).st_mtime_ns
+    assert write_manifest(output, [second_asset]) == ([], [], [])
+    assert os.stat(manifest_path).st_mtime_ns == modified_at
+
+    manifest = load_manifest(output)
+    assert manifest["assets"] == [second_asset]
+    assert manifest["files"]["index.html"] == {
+        "sha256": hashlib.sha256(b"v2").hexdigest(),
+        "size": 2,
+    }
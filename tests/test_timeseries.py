@@ -0,0 +1,50 @@
+import math
+
+from scripts.timeseries import (
+    MonthlySeriesStore,
+    difference,
+    month_index,
+    month_label,
+    moving_average,
+    pct_change,
+    sparkline_points,
+)
+
+
+def test_store_merges_revisions_and_round_trips(tmp_path):
+    store = MonthlySeriesStore(store_file=str(tmp_path / "series.json"))
+    store.merge("A", [(month_index(2026, 2), 2.0), (month_index(2026, 1), 1.0)])
+    store.merge("A", [(month_index(2026, 2), 2.5), (month_index(2026, 3), 3.0)])
+    store.save()
+
+    months, values = MonthlySeriesStore(store_file=store.store_file).columns("A")
+
+    assert [month_label(month) for month in months] == ["2026-01", "2026-02", "2026-03"]
+    assert list(values) == [1.0, 2.5, 3.0]
+
+
+def test_derived_metrics_align_by_month_and_leave_gaps_as_nan():
+    months = [month_index(2025, 1), month_index(2025, 2), month_index(2026, 1), month_index(2026, 3)]
+    values = [100.0, 101.0, 103.0, 104.0]
+
+    yoy = pct_change(months, values, 12)
+    mom = difference(months, values, 1)
+
+    assert math.isnan(yoy[0]) and math.isnan(yoy[3])
+    assert round(yoy[2], 6) == 3.0
+    assert mom[1] == 1.0
+    assert math.isnan(mom[0]) and math.isnan(mom[2]) and math.isnan(mom[3])
+
+
+def test_moving_average_and_sparkline():
+    average = moving_average([1.0, 2.0, 3.0, 4.0], 3)
+
+    assert math.isnan(average[1])
+    assert list(average[2:]) == [2.0, 3.0]
+    nan = float("nan")
+    derived = moving_average([nan, nan, 1.0, nan, 3.0, 5.0], 3)
+    assert math.isnan(derived[1])
+    assert list(derived[2:]) == [1.0, 1.0, 2.0, 4.0]
+    assert math.isnan(moving_average([nan, nan, nan], 3)[2])
+    assert sparkline_points([1.0, float("nan"), 3.0], width=10, height=10) == "0.0,10.0 10.0,0.0"
+    assert sparkline_points([1.0]) == ""